@@ -0,0 +1,106 @@
+"""
+Compares the convergence rate and run time of the inverse kinematics backends on the positioning stacks of the
+bundled instruments. The targets are generated from random joint configurations within the joint limits so every
+target is reachable.
+
+Usage: python benchmark_ik.py [--targets N] [--backends nlopt multistart dls] [--decoupled]
+"""
+import argparse
+import pathlib
+import time
+import numpy as np
+from sscanss.config import settings
+from sscanss.core.instrument import read_instrument_description_file, IKSolver
+
+INSTRUMENTS_PATH = pathlib.Path(__file__).parent / 'instruments'
+
+
+def generate_targets(instrument, count, rng):
+    """Generates reachable targets for the active positioning stack of the instrument by moving random
+    measurement points and vectors from the pose of random joint configurations to the gauge volume
+
+    :param instrument: instrument
+    :type instrument: Instrument
+    :param count: number of targets
+    :type count: int
+    :param rng: random number generator
+    :type rng: numpy.random.RandomState
+    :return: current and target pose of each target
+    :rtype: List[Tuple[Tuple[numpy.ndarray, numpy.ndarray], Tuple[numpy.ndarray, numpy.ndarray]]]
+    """
+    positioner = instrument.positioning_stack
+    chain = positioner.compile()
+    limits = np.array([(link.lower_limit, link.upper_limit) for link in positioner.links])
+    gauge_volume = np.array(instrument.gauge_volume)
+    q_vector = np.atleast_2d(instrument.q_vectors[0])
+
+    targets = []
+    for _ in range(count):
+        q = rng.uniform(limits[:, 0], limits[:, 1])
+        pose = chain.pose(q) @ chain.tool_link
+        inverse = np.linalg.inv(pose)
+        point = inverse[0:3, 0:3] @ gauge_volume + inverse[0:3, 3]
+        vector = q_vector @ pose[0:3, 0:3]
+        targets.append(((point, vector), (gauge_volume, q_vector)))
+
+    return targets
+
+
+def benchmark(positioner, targets, backend, decoupled=False):
+    """Solves the inverse kinematics of the targets with the given backend
+
+    :param positioner: positioning stack
+    :type positioner: PositioningStack
+    :param targets: current and target pose of each target
+    :type targets: List[Tuple[Tuple[numpy.ndarray, numpy.ndarray], Tuple[numpy.ndarray, numpy.ndarray]]]
+    :param backend: name of the optimization backend
+    :type backend: str
+    :param decoupled: indicates the orientation and position should be solved separately when possible
+    :type decoupled: bool
+    :return: fraction of converged targets, mean evaluations and mean time in milliseconds
+    :rtype: Tuple[float, float, float]
+    """
+    start_configuration = positioner.set_points
+    kwargs = {'local_max_eval': settings.value(settings.Key.Local_Max_Eval),
+              'global_max_eval': settings.value(settings.Key.Global_Max_Eval),
+              'tol': (settings.value(settings.Key.Position_Stop_Val), settings.value(settings.Key.Angular_Stop_Val))}
+    converged = 0
+    evaluations = 0
+    start = time.perf_counter()
+    for current_pose, target_pose in targets:
+        positioner.set_points = start_configuration
+        result = positioner.ikine(current_pose, target_pose, backend=backend, decoupled=decoupled, **kwargs)
+        converged += result.status == IKSolver.Status.Converged
+        evaluations += result.evaluations
+    elapsed = time.perf_counter() - start
+    positioner.set_points = start_configuration
+
+    return converged / len(targets), evaluations / len(targets), 1000 * elapsed / len(targets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares the inverse kinematics backends on the bundled '
+                                                 'instruments.')
+    parser.add_argument('--targets', type=int, default=50, help='number of targets for each positioning stack')
+    parser.add_argument('--backends', nargs='+', choices=[backend.value for backend in IKSolver.Backend],
+                        default=[backend.value for backend in IKSolver.Backend], help='backends to compare')
+    parser.add_argument('--decoupled', action='store_true', help='solve orientation and position separately when '
+                                                                 'possible')
+    args = parser.parse_args()
+
+    print(f'{"Instrument":<12}{"Positioning Stack":<34}{"Backend":<12}{"Converged":>10}{"Evaluations":>13}'
+          f'{"Time (ms)":>11}')
+    for filename in sorted(INSTRUMENTS_PATH.glob('*/instrument.json')):
+        instrument = read_instrument_description_file(filename)
+        for name in instrument.positioning_stacks:
+            instrument.loadPositioningStack(name)
+            targets = generate_targets(instrument, args.targets, np.random.RandomState(0))
+            for backend in args.backends:
+                rate, evaluations, elapsed = benchmark(instrument.positioning_stack, targets, backend,
+                                                       args.decoupled)
+                print(f'{instrument.name:<12}{name:<34}{backend:<12}{rate:>10.0%}{evaluations:>13.1f}'
+                      f'{elapsed:>11.1f}')
+
+
+if __name__ == '__main__':
+    main()
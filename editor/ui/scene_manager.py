@@ -5,7 +5,7 @@ Class for the Editor's Scene Manager
 from PyQt5 import QtCore
 from sscanss.core.scene import InstrumentEntity, BeamEntity, Scene
 from sscanss.core.util import Attributes
-from sscanss.core.instrument import Sequence
+from sscanss.ui.util import Sequence
 
 
 class SceneManager(QtCore.QObject):
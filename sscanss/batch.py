@@ -0,0 +1,306 @@
+"""
+Command line interface for simulating many projects. The simulations of the projects are run concurrently
+on a bounded number of simulation servers in order of priority. Failed or timed out simulations are retried,
+and a summary table is written as each project completes so an interrupted batch can be resumed.
+
+Usage: python -m sscanss.batch projects/ other.h5 [options]
+"""
+import argparse
+import csv
+import heapq
+import logging
+import multiprocessing
+import pathlib
+import sys
+import time
+from sscanss.config import settings, setup_logging, MemorySettings
+from sscanss.core.instrument import SimulationServer, IKSolver
+from sscanss.simulate import (ExitCode, POLL_INTERVAL, add_simulation_arguments, configure_logging,
+                              configure_simulation, exit_code, load_project, summarize, write_outputs)
+
+SUMMARY_FILENAME = 'summary.csv'
+TIMEOUT = 'Timeout'
+SUMMARY_HEADER = ['Project', 'Result', 'Attempts', 'Runtime (s)', 'Total', 'Skipped',
+                  *[status.name for status in IKSolver.Status], 'Collision']
+
+
+class BatchJob:
+    """Simulation of a project in the batch
+
+    :param filename: path of the project file
+    :type filename: pathlib.Path
+    :param priority: priority of the job. Jobs with higher priority are started first
+    :type priority: int
+    :param index: position of the job in the batch
+    :type index: int
+    """
+    def __init__(self, filename, priority=0, index=0):
+        self.filename = filename
+        self.priority = priority
+        self.index = index
+        self.attempts = 0
+        self.runtime = 0.0
+        self.start_time = 0.0
+        self.name = ''
+        self.instrument = None
+        self.simulation = None
+        self.errors = []
+
+    def __lt__(self, other):
+        return (-self.priority, self.attempts, self.index) < (-other.priority, other.attempts, other.index)
+
+    def start(self, server, args):
+        """Loads the project and starts the simulation on the given server. The simulation continues from
+        the checkpoint of the project unless the batch is restarted
+
+        :param server: simulation server
+        :type server: SimulationServer
+        :param args: parsed arguments
+        :type args: argparse.Namespace
+        :raises: ValueError
+        """
+        self.attempts += 1
+        self.errors = []
+        self.start_time = time.perf_counter()
+        self.name, self.instrument, self.simulation = load_project(self.filename, server)
+        configure_simulation(self.simulation, args)
+        self.simulation.result_updated.connect(self.errors.append)
+        self.simulation.start(resume=self.attempts > 1 or not args.restart)
+
+    def poll(self, timeout=None):
+        """Checks the results of the simulation and aborts the simulation if the time limit is exceeded
+
+        :param timeout: time limit in seconds
+        :type timeout: Union[float, None]
+        :return: result of the simulation or None if the simulation is running
+        :rtype: Union[str, None]
+        """
+        self.simulation.checkResult()
+        elapsed = time.perf_counter() - self.start_time
+        if self.simulation.isRunning():
+            if timeout is None or elapsed < timeout:
+                return None
+            self.simulation.abort()
+            self.runtime += elapsed
+            return TIMEOUT
+
+        self.runtime += elapsed
+        error = any(self.errors) or len(self.simulation.results) < self.simulation.count
+        return exit_code(summarize(self.simulation.results), error).name
+
+
+def find_projects(paths, list_file=None):
+    """Creates jobs for the project files in the given paths and list file. A directory path adds the
+    project (.h5) files in the directory. Each line of the list file contains a project path optionally
+    followed by a comma and the priority of the project
+
+    :param paths: paths of project files or directories
+    :type paths: List[str]
+    :param list_file: path of file listing the projects
+    :type list_file: Union[str, None]
+    :return: batch jobs
+    :rtype: List[BatchJob]
+    :raises: ValueError
+    """
+    entries = []
+    for path in map(pathlib.Path, paths):
+        if path.is_dir():
+            entries.extend((filename, 0) for filename in sorted(path.glob('*.h5')))
+        else:
+            entries.append((path, 0))
+
+    if list_file is not None:
+        with open(list_file) as text_file:
+            for line in text_file:
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                path, _, priority = line.partition(',')
+                try:
+                    entries.append((pathlib.Path(path.strip()), int(priority) if priority.strip() else 0))
+                except ValueError as e:
+                    raise ValueError(f'Invalid priority in the project list ({line})') from e
+
+    jobs = {}
+    for filename, priority in entries:
+        key = filename.resolve()
+        if key not in jobs:
+            jobs[key] = BatchJob(filename, priority, len(jobs))
+
+    return list(jobs.values())
+
+
+def read_summary(filename):
+    """Reads the projects completed in a previous run from the summary table
+
+    :param filename: path of the summary table
+    :type filename: pathlib.Path
+    :return: summary rows keyed by resolved project path
+    :rtype: Dict[pathlib.Path, List[str]]
+    """
+    completed = {}
+    if not filename.is_file():
+        return completed
+
+    with open(filename, newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        if next(reader, None) != SUMMARY_HEADER:
+            return completed
+        for row in reader:
+            if len(row) == len(SUMMARY_HEADER):
+                completed[pathlib.Path(row[0]).resolve()] = row
+
+    return completed
+
+
+def batch_exit_code(results):
+    """Gets the exit code of the batch from the results of the jobs. The most severe result is used
+
+    :param results: results of the jobs
+    :type results: Iterable[str]
+    :return: exit code
+    :rtype: ExitCode
+    """
+    results = set(results)
+    for code in (ExitCode.Error, ExitCode.NotConverged, ExitCode.Collision):
+        if code.name in results or (code == ExitCode.Error and TIMEOUT in results):
+            return code
+
+    return ExitCode.Success
+
+
+def create_parser():
+    """Creates the argument parser of the batch simulation runner
+
+    :return: argument parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog='python -m sscanss.batch',
+                                     description='Runs the simulations of many SScanSS 2 projects without the '
+                                                 'graphical user interface.',
+                                     epilog='The exit code is the most severe result of the projects, see '
+                                            '"python -m sscanss.simulate --help".')
+    parser.add_argument('projects', nargs='*', help='paths of project (.h5) files or directories of project files')
+    parser.add_argument('-l', '--list', help='file with a project path on each line optionally followed by a comma '
+                                             'and the priority of the project. Higher priorities run first')
+    parser.add_argument('-o', '--output-dir', default='batch_output',
+                        help='directory of the result files and summary table (default: batch_output)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='number of projects simulated concurrently '
+                                                                  '(default: 1)')
+    parser.add_argument('--retries', type=int, default=1, help='number of times a failed or timed out simulation '
+                                                               'is retried (default: 1)')
+    parser.add_argument('--timeout', type=float, help='time limit of each simulation attempt in seconds')
+    parser.add_argument('--restart', action='store_true', help='simulate all projects instead of resuming from '
+                                                               'the summary table of a previous run')
+    add_simulation_arguments(parser)
+
+    return parser
+
+
+def main(argv=None):
+    """Runs the batch simulation runner
+
+    :param argv: command line arguments
+    :type argv: Union[List[str], None]
+    :return: exit code
+    :rtype: ExitCode
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    configure_logging(args.quiet)
+    settings.system = MemorySettings()
+    if not args.projects and args.list is None:
+        parser.error('no projects are given')
+
+    try:
+        jobs = find_projects(args.projects, args.list)
+        output_dir = pathlib.Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+    except (OSError, ValueError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return ExitCode.Error
+
+    summary_path = output_dir / SUMMARY_FILENAME
+    completed = {} if args.restart else read_summary(summary_path)
+    results = [row[1] for key, row in completed.items() if key in {job.filename.resolve() for job in jobs}]
+    queue = [job for job in jobs if job.filename.resolve() not in completed]
+    heapq.heapify(queue)
+    if not args.quiet and results:
+        print(f'Resuming batch: {len(results)} of {len(jobs)} projects already simulated')
+
+    with open(summary_path, 'w' if args.restart or not completed else 'a', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        if args.restart or not completed:
+            writer.writerow(SUMMARY_HEADER)
+
+        def finish(job, result):
+            summary = summarize(job.simulation.results) if job.simulation is not None else {}
+            writer.writerow([job.filename, result, job.attempts, f'{job.runtime:.3f}',
+                             *[summary.get(key, '') for key in SUMMARY_HEADER[4:]]])
+            csv_file.flush()
+            results.append(result)
+            if not args.quiet:
+                print(f'[{len(results)}/{len(jobs)}] {job.filename}: {result} in {job.runtime:.1f} s')
+
+        start_time = time.perf_counter()
+        servers = [SimulationServer() for _ in range(max(args.jobs, 1))]
+        running = {}
+        try:
+            while queue or running:
+                for slot in [slot for slot in range(len(servers)) if slot not in running]:
+                    if not queue:
+                        break
+                    job = heapq.heappop(queue)
+                    try:
+                        job.start(servers[slot], args)
+                        running[slot] = job
+                    except (OSError, KeyError, ValueError) as e:
+                        logging.exception(f'An error occurred while loading the project ({job.filename})')
+                        print(f'error: could not load the project ({job.filename}): {e}', file=sys.stderr)
+                        job.simulation = None
+                        finish(job, ExitCode.Error.name)
+
+                for slot, job in list(running.items()):
+                    result = job.poll(args.timeout)
+                    if result is None:
+                        continue
+
+                    del running[slot]
+                    if result in (ExitCode.Error.name, TIMEOUT) and job.attempts <= args.retries:
+                        logging.info(f'Retrying the simulation of {job.filename} ({result})')
+                        heapq.heappush(queue, job)
+                        continue
+
+                    try:
+                        prefix = output_dir / job.filename.stem
+                        write_outputs(str(job.filename), job.name, job.instrument, job.simulation, prefix,
+                                      args.format, not args.no_script, args.mu_amps)
+                    except OSError as e:
+                        logging.exception(f'An error occurred while writing the results of {job.filename}')
+                        print(f'error: could not write the results of {job.filename}: {e}', file=sys.stderr)
+                        result = ExitCode.Error.name
+                    finish(job, result)
+
+                time.sleep(POLL_INTERVAL)
+        except KeyboardInterrupt:
+            for job in running.values():
+                job.simulation.abort()
+            print('Batch interrupted, run the same command again to resume', file=sys.stderr)
+            return ExitCode.Error
+        finally:
+            for server in servers:
+                server.stop()
+
+    if not args.quiet:
+        print(f'Simulated {len(results)} projects in {time.perf_counter() - start_time:.1f} s. '
+              f'Summary written to {summary_path}')
+
+    return batch_exit_code(results)
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    setup_logging('batch.log')
+    exit_status = main()
+    logging.shutdown()
+    sys.exit(exit_status)
@@ -2,12 +2,10 @@ from contextlib import suppress
 from enum import Enum, unique
 import logging
 import logging.config
+import os
 import pathlib
 import sys
-from OpenGL.plugins import FormatHandler
-from PyQt5 import QtCore
 from sscanss.__config_data import log_config
-import sscanss.__resource
 from sscanss.__version import __version__, __editor_version__
 
 
@@ -24,10 +22,11 @@ INSTRUMENTS_PATH = SOURCE_PATH / 'instruments'
 CUSTOM_INSTRUMENTS_PATH = pathlib.Path.home() / 'Documents' / 'SScanSS 2' / 'instruments'
 STATIC_PATH = SOURCE_PATH / 'static'
 IMAGES_PATH = STATIC_PATH / 'images'
-
-
-# Tells OpenGL to use the NumpyHandler for the Matrix44 objects
-FormatHandler('sscanss', 'OpenGL.arrays.numpymodule.NumpyHandler', ['sscanss.core.math.matrix.Matrix44'])
+# Same directory as the user scope INI file of QSettings
+if sys.platform == 'win32':
+    CONFIG_PATH = pathlib.Path(os.environ.get('APPDATA', pathlib.Path.home() / 'AppData' / 'Roaming')) / 'SScanSS 2'
+else:
+    CONFIG_PATH = pathlib.Path(os.environ.get('XDG_CONFIG_HOME', pathlib.Path.home() / '.config')) / 'SScanSS 2'
 
 
 def path_for(filename):
@@ -51,7 +50,19 @@ class Key(Enum):
     Angular_Stop_Val = f'{Group.Simulation.value}/Angular_Stop_Val'
     Local_Max_Eval = f'{Group.Simulation.value}/Local_Max_Eval'
     Global_Max_Eval = f'{Group.Simulation.value}/Global_Max_Eval'
+    Adaptive_Budget = f'{Group.Simulation.value}/Adaptive_Budget'
+    IK_Backend = f'{Group.Simulation.value}/IK_Backend'
+    Decoupled_IK = f'{Group.Simulation.value}/Decoupled_IK'
+    Reachability_Map = f'{Group.Simulation.value}/Reachability_Map'
+    Path_Collision = f'{Group.Simulation.value}/Path_Collision'
+    Clearance = f'{Group.Simulation.value}/Clearance'
+    Clearance_Margin = f'{Group.Simulation.value}/Clearance_Margin'
+    Time_Budget = f'{Group.Simulation.value}/Time_Budget'
     Skip_Zero_Vectors = f'{Group.Simulation.value}/Skip_Zero_Vectors'
+    Worker_Count = f'{Group.Simulation.value}/Worker_Count'
+    Collision_Threads = f'{Group.Simulation.value}/Collision_Threads'
+    Warm_Start = f'{Group.Simulation.value}/Warm_Start'
+    Server_Address = f'{Group.Simulation.value}/Server_Address'
     Sample_Colour = f'{Group.Graphics.value}/Sample_Colour'
     Fiducial_Colour = f'{Group.Graphics.value}/Fiducial_Colour'
     Fiducial_Disabled_Colour = f'{Group.Graphics.value}/Fiducial_Disabled_Colour'
@@ -72,8 +83,8 @@ class SettingItem:
 
     :param default: default value for the setting item
     :type default: Any
-    :param limits: lower and upper bounds of item
-    :type limits: Union[(Any, Any), None]
+    :param limits: lower and upper bounds of item or the allowed values of a string item
+    :type limits: Union[(Any, Any), Tuple[str, ...], None]
     :param sub_type: type of the contents of iterable items
     :type sub_type: type object
     :param fixed_size: indicates if iterable item size is fixed
@@ -95,6 +106,14 @@ __defaults__ = {Key.Geometry: SettingItem(bytearray(b'')), Key.Check_Update: Set
                 Key.Recent_Projects: SettingItem([], sub_type=str),
                 Key.Local_Max_Eval: SettingItem(1000, limits=(500, 5000)),
                 Key.Global_Max_Eval: SettingItem(200, limits=(50, 500)),
+                Key.Adaptive_Budget: SettingItem(False), Key.Time_Budget: SettingItem(0, limits=(0, 86400)),
+                Key.IK_Backend: SettingItem('nlopt', limits=('nlopt', 'multistart', 'dls')),
+                Key.Decoupled_IK: SettingItem(False), Key.Reachability_Map: SettingItem(False),
+                Key.Path_Collision: SettingItem(False), Key.Clearance: SettingItem(False),
+                Key.Clearance_Margin: SettingItem(5.0, limits=(0.000, 1000.000)),
+                Key.Worker_Count: SettingItem(1, limits=(1, 64)), Key.Warm_Start: SettingItem(False),
+                Key.Collision_Threads: SettingItem(1, limits=(1, 64)),
+                Key.Server_Address: SettingItem(''),
                 Key.Angular_Stop_Val: SettingItem(1.00, limits=(0.000, 360.000)),
                 Key.Position_Stop_Val: SettingItem(1e-2, limits=(0.000, 100.000)),
                 Key.Custom_Instruments_Path: SettingItem(str(CUSTOM_INSTRUMENTS_PATH)),
@@ -111,6 +130,28 @@ __defaults__ = {Key.Geometry: SettingItem(bytearray(b'')), Key.Check_Update: Set
                 Key.Vector_Size: SettingItem(10, limits=(10, 50))}
 
 
+class MemorySettings:
+    """Stores settings in memory with the same interface as QSettings so that headless runs such as the
+    command line simulation runner do not import Qt or read the .INI file of the user. The default
+    value is returned for keys that have not been set.
+    """
+    def __init__(self):
+        self.values = {}
+
+    def value(self, key, default=None):
+        return self.values.get(key, default)
+
+    def setValue(self, key, value):
+        self.values[key] = value
+
+    def remove(self, group):
+        for key in [key for key in self.values if key == group or key.startswith(f'{group}/')]:
+            del self.values[key]
+
+    def fileName(self):
+        return ''
+
+
 class Setting:
     """Class handles storage and retrieval of application settings as Key-Value pairs.
     A key could belong to a group e.g Graphics (Graphics/Colour) or be generic like the
@@ -121,8 +162,25 @@ class Setting:
 
     def __init__(self):
         self.local = {}
-        self.system = QtCore.QSettings(QtCore.QSettings.IniFormat, QtCore.QSettings.UserScope,
-                                       'SScanSS 2', 'SScanSS 2')
+        self._system = None
+
+    @property
+    def system(self):
+        """Gets the QSettings object which stores the settings in the .INI file. Qt is imported when the
+        .INI file is first accessed so the core package can be used without Qt
+
+        :return: settings file
+        :rtype: Union[QtCore.QSettings, MemorySettings]
+        """
+        if self._system is None:
+            from PyQt5 import QtCore
+            self._system = QtCore.QSettings(QtCore.QSettings.IniFormat, QtCore.QSettings.UserScope,
+                                            'SScanSS 2', 'SScanSS 2')
+        return self._system
+
+    @system.setter
+    def system(self, value):
+        self._system = value
 
     @staticmethod
     def default(key):
@@ -194,6 +252,12 @@ class Setting:
 
                 return value
 
+            elif item.type is str:
+                value = str(value)
+                if item.limits is not None and value not in item.limits:
+                    return item.default
+                return value
+
             else:
                 return item.type(value)
 
@@ -235,12 +299,6 @@ class Setting:
         return self.system.fileName()
 
 
-def set_locale():
-    locale = QtCore.QLocale(QtCore.QLocale.C)
-    locale.setNumberOptions(QtCore.QLocale.RejectGroupSeparator)
-    QtCore.QLocale.setDefault(locale)
-
-
 def log_uncaught_exceptions(exc_type, exc_value, exc_traceback):
     """
     Qt slots swallows exceptions but this ensures exceptions are logged
@@ -250,24 +308,29 @@ def log_uncaught_exceptions(exc_type, exc_value, exc_traceback):
     sys.exit(1)
 
 
-def setup_logging(filename):
+def setup_logging(filename, level=logging.INFO):
     """
     Configure of logging file handler.
 
     :param filename: name of log file
     :type filename: str
+    :param level: level of the root logger
+    :type level: int
     """
     try:
         LOG_PATH.mkdir(parents=True, exist_ok=True)
         log_config['handlers']['file_handler']['filename'] = LOG_PATH / filename
         logging.config.dictConfig(log_config)
+        logging.getLogger().setLevel(level)
     except OSError:
-        logging.basicConfig(level=logging.ERROR)
+        logging.basicConfig(level=max(level, logging.ERROR))
         logging.exception('Could not initialize logging to file')
 
     sys.excepthook = log_uncaught_exceptions
 
 
-set_locale()
 settings = Setting()
-LOG_PATH = pathlib.Path(settings.filename()).parent / 'logs'
+LOG_PATH = CONFIG_PATH / 'logs'
+CHECKPOINT_PATH = CONFIG_PATH / 'checkpoints'
+REACHABILITY_PATH = CONFIG_PATH / 'reachability'
+MESH_CACHE_PATH = CONFIG_PATH / 'collision_meshes'
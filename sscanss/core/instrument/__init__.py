@@ -2,5 +2,6 @@ from .calibration import circle_point_analysis, generate_description, robot_worl
 from .create import (read_instrument_description_file, read_detector_description, read_jaw_description,
                      read_instrument_description)
 from .instrument import Instrument
-from .robotics import Sequence, Link, IKSolver
-from .simulation import Simulation
+from .robotics import Link, IKSolver
+from .simulation import Simulation, SimulationServer, Checkpoint, checkpoint_path, render_script
+from .remote import RemoteSimulationServer, run_worker
@@ -137,15 +137,12 @@ def circle_point_analysis(data, joint_types, joint_offsets, joint_homes):
 
     model_errors = []
     for i in range(number_of_joints):
-        q = np.zeros(number_of_joints)
         axis_data = data[i]
-        offsets = joint_offsets[i]
-        error = []
-        for j in range(len(axis_data)):
-            q[i] = math.radians(offsets[j]) if joint_types[i] == Link.Type.Revolute else offsets[j]
-            matrix = s.fkine(q)
-            error.append(axis_data[j, :] - matrix[:3, 3].transpose())
-        model_errors.append(np.vstack(error))
+        offsets = np.array(joint_offsets[i], dtype=float)
+        q = np.zeros((len(axis_data), number_of_joints))
+        q[:, i] = np.radians(offsets) if joint_types[i] == Link.Type.Revolute else offsets
+        matrices = s.fkineMany(q)
+        model_errors.append(axis_data - matrices[:, :3, 3])
 
     return CPAResult(joint_axes, joint_origins, s.base, s.tool, fit_errors, model_errors)
 
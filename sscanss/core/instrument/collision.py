@@ -1,14 +1,301 @@
 """
 Classes for collision detection
 """
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from enum import Enum, unique
-from bitarray import bitarray
+import hashlib
+import heapq
+import logging
+import os
+import pathlib
 import gimpact
 import numpy as np
 
+# Number of pairs of leaves whose triangles are compared together in a distance query
+LEAF_BATCH_SIZE = 64
+
+
+class MeshCache:
+    """Content-addressed disk cache of decimated collision geometry. The decimated geometry is stored as the
+    vertices of its triangles in a file named by a digest of the original vertices, indices and the decimation
+    target, so the geometry is only decimated once for a given mesh and target. The vertices are loaded as a
+    memory-mapped array.
+
+    :param path: directory of the cache
+    :type path: Union[str, pathlib.Path]
+    """
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+
+    def filename(self, vertices, indices, target):
+        """Gets the path of the cache file for a mesh and decimation target
+
+        :param vertices: N x 3 array of vertices
+        :type vertices: numpy.ndarray
+        :param indices: N X 1 array of indices
+        :type indices: numpy.ndarray
+        :param target: maximum number of triangles in the decimated geometry
+        :type target: int
+        :return: path of the cache file
+        :rtype: pathlib.Path
+        """
+        digest = hashlib.md5()
+        for array in (np.asarray(vertices, dtype=float), np.asarray(indices, dtype=np.int64), np.array([target])):
+            array = np.ascontiguousarray(array)
+            digest.update(str((array.dtype, array.shape)).encode())
+            digest.update(array.data)
+
+        return self.path / f'{digest.hexdigest()}.npy'
+
+    def decimate(self, vertices, indices, target):
+        """Gets the decimated geometry of a mesh from the cache. The geometry is decimated and written to
+        the cache if it is not in the cache
+
+        :param vertices: N x 3 array of vertices
+        :type vertices: numpy.ndarray
+        :param indices: N X 1 array of indices
+        :type indices: numpy.ndarray
+        :param target: maximum number of triangles in the decimated geometry
+        :type target: int
+        :return: decimated geometry
+        :rtype: gimpact.TriMesh
+        """
+        filename = self.filename(vertices, indices, target)
+        try:
+            # The copy-on-write mode is used because gimpact does not accept read-only buffers
+            cached_vertices = np.load(filename, mmap_mode='c')
+            if cached_vertices.ndim == 2 and cached_vertices.shape[1] == 3 and len(cached_vertices) % 3 == 0:
+                return gimpact.TriMesh(cached_vertices, np.arange(len(cached_vertices)))
+            logging.warning(f'The collision mesh ({filename}) is invalid and will be rebuilt')
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            logging.warning(f'The collision mesh ({filename}) could not be read and will be rebuilt')
+
+        geometry = gimpact.TriMesh(vertices, indices).decimate(target)
+        decimated_vertices = np.array([geometry.triangle(i) for i in range(geometry.triangle_count)]).reshape(-1, 3)
+        try:
+            filename.parent.mkdir(parents=True, exist_ok=True)
+            temp_filename = filename.with_suffix(f'.{os.getpid()}.tmp')
+            with open(temp_filename, 'wb') as mesh_file:
+                np.save(mesh_file, decimated_vertices)
+            temp_filename.replace(filename)
+        except OSError:
+            logging.exception(f'The collision mesh could not be saved to {filename}')
+
+        return geometry
+
+
+def closest_segment_points(start_a, stop_a, start_b, stop_b):
+    """Computes the closest points between pairs of line segments. The inputs are broadcast together
+
+    :param start_a: start points of the first segments with shape (... x 3)
+    :type start_a: numpy.ndarray
+    :param stop_a: end points of the first segments with shape (... x 3)
+    :type stop_a: numpy.ndarray
+    :param start_b: start points of the second segments with shape (... x 3)
+    :type start_b: numpy.ndarray
+    :param stop_b: end points of the second segments with shape (... x 3)
+    :type stop_b: numpy.ndarray
+    :return: closest points on the first and second segments
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+    """
+    eps = 1e-12
+    d1 = stop_a - start_a
+    d2 = stop_b - start_b
+    r = start_a - start_b
+    a = np.einsum('...i,...i', d1, d1)
+    e = np.einsum('...i,...i', d2, d2)
+    b = np.einsum('...i,...i', d1, d2)
+    c = np.einsum('...i,...i', d1, r)
+    f = np.einsum('...i,...i', d2, r)
+
+    denom = a * e - b * b
+    safe_a = np.where(a > eps, a, 1.0)
+    safe_e = np.where(e > eps, e, 1.0)
+    s = np.where(denom > eps, np.clip((b * f - c * e) / np.where(denom > eps, denom, 1.0), 0, 1), 0.0)
+    t = (b * s + f) / safe_e
+    # The parameter of the first segment is recomputed when the second is clamped to an end point
+    s = np.where(t < 0, np.clip(-c / safe_a, 0, 1), np.where(t > 1, np.clip((b - c) / safe_a, 0, 1), s))
+    t = np.clip(t, 0, 1)
+
+    # Segments that are points
+    s = np.where(e > eps, s, np.clip(-c / safe_a, 0, 1))
+    t = np.where(e > eps, t, 0.0)
+    s = np.where(a > eps, s, 0.0)
+    t = np.where((a > eps) | (e <= eps), t, np.clip(f / safe_e, 0, 1))
+
+    return start_a + d1 * s[..., None], start_b + d2 * t[..., None]
+
+
+def barycentric_inside(points, triangles):
+    """Checks if points that lie in the plane of triangles are inside the triangles. The inputs are
+    broadcast together and degenerate triangles contain no points
+
+    :param points: points with shape (... x 3)
+    :type points: numpy.ndarray
+    :param triangles: triangles with shape (... x 3 x 3)
+    :type triangles: numpy.ndarray
+    :return: flags indicating the point is inside the triangle
+    :rtype: numpy.ndarray[bool]
+    """
+    v0 = triangles[..., 1, :] - triangles[..., 0, :]
+    v1 = triangles[..., 2, :] - triangles[..., 0, :]
+    v2 = points - triangles[..., 0, :]
+    d00 = np.einsum('...i,...i', v0, v0)
+    d01 = np.einsum('...i,...i', v0, v1)
+    d11 = np.einsum('...i,...i', v1, v1)
+    d20 = np.einsum('...i,...i', v2, v0)
+    d21 = np.einsum('...i,...i', v2, v1)
+    denom = d00 * d11 - d01 * d01
+    valid = np.abs(denom) > 1e-12 * np.maximum(d00 * d11, 1e-30)
+    denom = np.where(valid, denom, 1.0)
+    v = (d11 * d20 - d01 * d21) / denom
+    w = (d00 * d21 - d01 * d20) / denom
+
+    return valid & (v >= 0) & (w >= 0) & (v + w <= 1)
+
+
+def triangle_distance(first, second):
+    """Computes the distance and closest points between pairs of triangles. The closest points of two
+    triangles that do not intersect are either a vertex and its projection on the other triangle or the
+    closest points of two edges. Intersecting triangles have a distance of zero and both closest points are
+    at a point where an edge of one triangle crosses the other.
+
+    :param first: first triangles with shape (N x 3 x 3)
+    :type first: numpy.ndarray
+    :param second: second triangles with shape (N x 3 x 3)
+    :type second: numpy.ndarray
+    :return: distances and closest points on the first and second triangles
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+    first_edges = np.roll(first, -1, axis=1)
+    second_edges = np.roll(second, -1, axis=1)
+
+    # Closest points of the 9 pairs of edges
+    point_a, point_b = closest_segment_points(first[:, :, None], first_edges[:, :, None], second[:, None],
+                                              second_edges[:, None])
+    candidates_a = [point_a.reshape(-1, 9, 3)]
+    candidates_b = [point_b.reshape(-1, 9, 3)]
+    distances = [np.linalg.norm(candidates_a[0] - candidates_b[0], axis=2)]
+
+    for vertices, edges, triangles, swap in ((first, first_edges, second, False),
+                                             (second, second_edges, first, True)):
+        normal = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        length = np.linalg.norm(normal, axis=1)
+        normal = normal / np.where(length > 0, length, 1.0)[:, None]
+
+        # Vertices whose projection is outside the triangle are never closer than the edges
+        height = np.einsum('nvi,ni->nv', vertices - triangles[:, None, 0], normal)
+        projection = vertices - height[..., None] * normal[:, None]
+        inside = barycentric_inside(projection, triangles[:, None]) & (length > 0)[:, None]
+        vertex_distance = np.where(inside, np.abs(height), np.inf)
+
+        # Edges that cross the triangle are intersections
+        edge_height = np.einsum('nvi,ni->nv', edges - triangles[:, None, 0], normal)
+        crossing = (height * edge_height <= 0) & (height != edge_height)
+        t = height / np.where(crossing, height - edge_height, 1.0)
+        crossing_point = vertices + t[..., None] * (edges - vertices)
+        crossing &= barycentric_inside(crossing_point, triangles[:, None]) & (length > 0)[:, None]
+
+        for distance, point, other in ((vertex_distance, vertices, projection),
+                                       (np.where(crossing, 0.0, np.inf), crossing_point, crossing_point)):
+            distances.append(distance)
+            candidates_a.append(other if swap else point)
+            candidates_b.append(point if swap else other)
+
+    distances = np.concatenate(distances, axis=1)
+    index = np.argmin(distances, axis=1)
+    rows = np.arange(len(index))
+    point_a = np.concatenate(candidates_a, axis=1)[rows, index]
+    point_b = np.concatenate(candidates_b, axis=1)[rows, index]
+
+    return distances[rows, index], point_a, point_b
+
+
+class BoundingVolumeHierarchy:
+    """Binary tree of axis aligned bounding boxes over the triangles of a geometry which is used to find
+    the distance between geometries without testing every pair of triangles. The tree is built top-down by
+    splitting the triangles at the median centroid along the longest axis of the node's box.
+
+    :param triangles: triangles with shape (N x 3 x 3)
+    :type triangles: numpy.ndarray
+    :param leaf_size: maximum number of triangles in a leaf
+    :type leaf_size: int
+    """
+    def __init__(self, triangles, leaf_size=8):
+        triangles = np.asarray(triangles, dtype=float)
+        centroids = triangles.mean(axis=1)
+        order = np.arange(len(triangles))
+        lower, upper, children, ranges = [], [], [], []
+
+        stack = [(0, len(triangles), -1, 0)]
+        while stack:
+            start, stop, parent, side = stack.pop()
+            node = len(lower)
+            if parent >= 0:
+                children[parent][side] = node
+
+            vertices = triangles[order[start:stop]].reshape(-1, 3)
+            lower.append(vertices.min(axis=0))
+            upper.append(vertices.max(axis=0))
+            children.append([-1, -1])
+            ranges.append((start, stop))
+            if stop - start <= leaf_size:
+                continue
+
+            points = centroids[order[start:stop]]
+            axis = np.argmax(np.ptp(points, axis=0))
+            middle = (stop - start) // 2
+            order[start:stop] = order[start:stop][np.argpartition(points[:, axis], middle)]
+            stack.append((start + middle, stop, node, 1))
+            stack.append((start, start + middle, node, 0))
+
+        self.triangles = triangles[order]
+        self.lower = np.array(lower).reshape(-1, 3)
+        self.upper = np.array(upper).reshape(-1, 3)
+        self.children = np.array(children, dtype=np.int64).reshape(-1, 2)
+        self.ranges = np.array(ranges, dtype=np.int64).reshape(-1, 2)
+
+    def transformedBounds(self, transform):
+        """Computes the bounding boxes of the nodes after the geometry is transformed. The boxes
+        bound the transformed boxes of the nodes
+
+        :param transform: transformation matrix
+        :type transform: numpy.ndarray
+        :return: lower and upper bounds of the boxes
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+        """
+        transform = np.asarray(transform, dtype=float)
+        centre = (self.lower + self.upper) / 2 @ transform[0:3, 0:3].T + transform[0:3, 3]
+        extent = (self.upper - self.lower) / 2 @ np.abs(transform[0:3, 0:3]).T
+        return centre - extent, centre + extent
+
+
+def box_distance(lower_a, upper_a, lower_b, upper_b):
+    """Computes the distance between axis aligned boxes. The inputs are broadcast together
+
+    :param lower_a: lower bounds of the first boxes with shape (... x 3)
+    :type lower_a: numpy.ndarray
+    :param upper_a: upper bounds of the first boxes with shape (... x 3)
+    :type upper_a: numpy.ndarray
+    :param lower_b: lower bounds of the second boxes with shape (... x 3)
+    :type lower_b: numpy.ndarray
+    :param upper_b: upper bounds of the second boxes with shape (... x 3)
+    :type upper_b: numpy.ndarray
+    :return: distances
+    :rtype: Union[numpy.ndarray, float]
+    """
+    gap = np.maximum(np.maximum(lower_b - upper_a, lower_a - upper_b), 0)
+    return np.sqrt(np.sum(gap ** 2, axis=-1))
+
 
 class Collider:
-    """Represents a geometry that can be collided with.
+    """Represents a geometry that can be collided with. The geometry is transformed lazily i.e. when the
+    collider is moved only its bounding box is updated, from the bounding box of the original geometry, and
+    the geometry is transformed when it is needed for a narrow phase collision test. Geometry with more
+    triangles than the decimation target is decimated, the decimated geometry is read from the mesh cache
+    if one is given.
 
     :param identifier: unique identifier
     :type identifier: int
@@ -20,37 +307,254 @@ class Collider:
     :type mask_size: int
     :param transform: transformation matrix
     :type transform: Union[None, Matrix44]
+    :param decimation: maximum number of triangles. Uses Collider.decimation if None
+    :type decimation: Union[int, None]
+    :param cache: cache of decimated geometry
+    :type cache: Union[MeshCache, None]
     """
-    def __init__(self, identifier, vertices, indices, mask_size=32, transform=None):
+    decimation = 50000
+
+    def __init__(self, identifier, vertices, indices, mask_size=32, transform=None, decimation=None, cache=None):
 
         self.id = identifier
-        self.geometry = gimpact.TriMesh(vertices, indices).decimate(50000)
-        self.excludes = bitarray(mask_size)
-        self.excludes.setall(False)
+        decimation = Collider.decimation if decimation is None else decimation
+        if cache is None or len(indices) <= 3 * decimation:
+            self.geometry = gimpact.TriMesh(vertices, indices).decimate(decimation)
+        else:
+            self.geometry = cache.decimate(vertices, indices, decimation)
+        self.excludes = np.zeros(mask_size, bool)
         self.excludes[identifier] = True
 
+        aabb = self.geometry.bounds
+        self.bounds = (aabb.min_x, aabb.max_x, aabb.min_y, aabb.max_y, aabb.min_z, aabb.max_z)
+        self.corners = np.array(np.meshgrid(self.bounds[0:2], self.bounds[2:4], self.bounds[4:6])).reshape(3, -1)
+        self.transform = np.identity(4, np.float32)
+        self.__inverse = None
+        self.__hierarchy = None
+        self.__node_bounds = None
+        self.__geometry_transform = self.transform
+        self.version = 0
+        self.stale = False
+
         if transform is not None:
-            self.geometry.transform(np.array(transform, np.float32))
+            self.move(transform)
+
+    def move(self, transform):
+        """Moves the collider to the pose given by the transformation matrix, the matrix is applied to the
+        original geometry. The collider is not moved if the matrix is the same as the current transform
+
+        :param transform: transformation matrix
+        :type transform: Union[Matrix44, numpy.ndarray]
+        :return: indicates if the collider was moved
+        :rtype: bool
+        """
+        transform = np.array(transform, np.float32)
+        if np.array_equal(transform, self.transform):
+            return False
+
+        corners = transform[0:3, 0:3] @ self.corners + transform[0:3, 3:4]
+        lower, upper = corners.min(axis=1), corners.max(axis=1)
+        self.bounds = (lower[0], upper[0], lower[1], upper[1], lower[2], upper[2])
+        self.transform = transform
+        self.__inverse = None
+        self.version += 1
+        self.stale = True
+        return True
+
+    @property
+    def inverse(self):
+        """Gets the inverse of the transformation matrix
+
+        :return: inverse transformation matrix
+        :rtype: numpy.ndarray
+        """
+        if self.__inverse is None:
+            self.__inverse = np.linalg.inv(self.transform.astype(np.float64))
+        return self.__inverse
+
+    def update(self):
+        """Transforms the geometry to the current pose if the collider has moved since the geometry was
+        last transformed"""
+        if self.stale:
+            self.geometry.transform(self.transform)
+            self.__geometry_transform = self.transform
+            self.stale = False
+
+    @property
+    def hierarchy(self):
+        """Gets the bounding volume hierarchy of the geometry in its original pose. The hierarchy is
+        built when first needed
+
+        :return: bounding volume hierarchy
+        :rtype: BoundingVolumeHierarchy
+        """
+        if self.__hierarchy is None:
+            triangles = np.array([self.geometry.triangle(i) for i in range(self.geometry.triangle_count)], float)
+            # The triangles are read from the transformed geometry so are moved back to the original pose
+            inverse = np.linalg.inv(self.__geometry_transform.astype(np.float64))
+            triangles = triangles.reshape(-1, 3) @ inverse[0:3, 0:3].T + inverse[0:3, 3]
+            self.__hierarchy = BoundingVolumeHierarchy(triangles.reshape(-1, 3, 3))
+        return self.__hierarchy
+
+    @property
+    def node_bounds(self):
+        """Gets the bounding boxes of the hierarchy nodes at the current pose
+
+        :return: version of the collider, lower and upper bounds of the boxes
+        :rtype: Tuple[int, numpy.ndarray, numpy.ndarray]
+        """
+        if self.__node_bounds is None or self.__node_bounds[0] != self.version:
+            self.__node_bounds = (self.version, *self.hierarchy.transformedBounds(self.transform))
+        return self.__node_bounds
+
+
+class Clearance:
+    """Data class for the clearance between a pair of colliders
+
+    :param ids: ids of the colliders
+    :type ids: Tuple[int, int]
+    :param distance: distance between the colliders
+    :type distance: float
+    :param points: closest points on the colliders
+    :type points: Tuple[numpy.ndarray, numpy.ndarray]
+    """
+    def __init__(self, ids, distance, points):
+        self.ids = ids
+        self.distance = distance
+        self.points = points
+
+
+def collider_distance(first, second, bound=None, early_out=False):
+    """Computes the distance between colliders by traversing their bounding volume hierarchies. Pairs of
+    nodes are visited in order of the distance between their boxes, and pairs that are farther apart than
+    the bound or the closest triangles found so far are pruned. The triangles of consecutive pairs of leaves
+    are compared together to reduce the overhead of the vectorised distance computation.
+
+    :param first: first collider
+    :type first: Collider
+    :param second: second collider
+    :type second: Collider
+    :param bound: distance above which pairs are pruned
+    :type bound: Union[float, None]
+    :param early_out: indicates the traversal stops at the first pair of triangles closer than the bound
+    :type early_out: bool
+    :return: distance and closest points or None if the colliders are not closer than the bound
+    :rtype: Union[Tuple[float, numpy.ndarray, numpy.ndarray], None]
+    """
+    first_tree, second_tree = first.hierarchy, second.hierarchy
+    _, first_lower, first_upper = first.node_bounds
+    _, second_lower, second_upper = second.node_bounds
+    first_transform = first.transform.astype(np.float64)
+    second_transform = second.transform.astype(np.float64)
+    first_size = np.linalg.norm(first_upper - first_lower, axis=1)
+    second_size = np.linalg.norm(second_upper - second_lower, axis=1)
+    first_leaf = first_tree.children[:, 0] < 0
+    second_leaf = second_tree.children[:, 0] < 0
+
+    best = np.inf if bound is None else bound
+    closest = None
+    batch = []
+    heap = [(box_distance(first_lower[0], first_upper[0], second_lower[0], second_upper[0]), 0, 0)]
+    while heap or batch:
+        if heap and heap[0][0] < best and len(batch) < LEAF_BATCH_SIZE:
+            _, i, j = heapq.heappop(heap)
+            if first_leaf[i] and second_leaf[j]:
+                batch.append((i, j))
+                continue
+
+            # The larger node is split so the boxes of the visited pairs shrink evenly
+            if second_leaf[j] or (not first_leaf[i] and first_size[i] >= second_size[j]):
+                children = first_tree.children[i]
+                distances = box_distance(first_lower[children], first_upper[children], second_lower[j],
+                                         second_upper[j])
+                pairs = [(child, j) for child in children]
+            else:
+                children = second_tree.children[j]
+                distances = box_distance(first_lower[i], first_upper[i], second_lower[children],
+                                         second_upper[children])
+                pairs = [(i, child) for child in children]
+
+            for distance, (child_i, child_j) in zip(distances, pairs):
+                if distance < best:
+                    heapq.heappush(heap, (distance, child_i, child_j))
+            continue
+
+        # The triangles of the leaves are compared when the batch is full or no other pair can be closer
+        if not batch:
+            break
+
+        index_a, index_b = [], []
+        for i, j in batch:
+            range_a = np.arange(*first_tree.ranges[i])
+            range_b = np.arange(*second_tree.ranges[j])
+            index_a.append(np.repeat(range_a, len(range_b)))
+            index_b.append(np.tile(range_b, len(range_a)))
+        batch.clear()
+
+        triangles_a = first_tree.triangles[np.concatenate(index_a)]
+        triangles_b = second_tree.triangles[np.concatenate(index_b)]
+        triangles_a = triangles_a @ first_transform[0:3, 0:3].T + first_transform[0:3, 3]
+        triangles_b = triangles_b @ second_transform[0:3, 0:3].T + second_transform[0:3, 3]
+        distances, points_a, points_b = triangle_distance(triangles_a, triangles_b)
+        index = np.argmin(distances)
+        if distances[index] < best:
+            best = distances[index]
+            closest = (float(best), points_a[index], points_b[index])
+            if early_out:
+                break
+
+    return closest
+
+
+def narrow_phase(collider, query):
+    """Checks if the geometry of two colliders intersect. The geometry must have been transformed to the
+    current pose of the colliders
+
+    :param collider: first collider
+    :type collider: Collider
+    :param query: second collider
+    :type query: Collider
+    :return: indicates the colliders intersect
+    :rtype: bool
+    """
+    # The bounding boxes of the transformed geometry are tighter than the broad phase boxes
+    return (collider.geometry.bounds.intersects(query.geometry.bounds) and
+            bool(gimpact.trimesh_trimesh_collision(collider.geometry, query.geometry, True)))
 
 
 class CollisionManager:
-    """Manages the collision objects and handles collision queries
+    """Manages the collision objects and handles collision queries. The exclusion masks of the colliders
+    are rows of a boolean matrix so the candidate pairs of a query can be filtered together. The narrow
+    phase tests can be run on a thread pool, which is only faster if the collision backend releases the
+    GIL during a test.
 
     :param max_size: maximum number of colliders
     :type max_size: int
+    :param workers: number of threads for the narrow phase tests
+    :type workers: int
     """
+    tolerance = 1e-5
+
     @unique
     class Exclude(Enum):
         All = 0
         Consecutive = 1
         Nothing = 2
 
-    def __init__(self, max_size=32):
+    def __init__(self, max_size=32, workers=1):
+        self.executor = None
         self.max_size = max_size
+        self.workers = workers
+        self.excludes = np.zeros((max_size, max_size), bool)
+        self.movable = np.zeros(max_size, bool)
+        self.query_ids = np.zeros(0, np.int64)
         self.colliders = []
         self.collider_aabbs = None
         self.queries = []
         self.query_aabbs = None
+        self.query_index = {}
+        self.contacts = {}
+        self.clearances = {}
 
     def createAABBSets(self):
         """
@@ -60,13 +564,13 @@ class CollisionManager:
             self.collider_aabbs = gimpact.AABBSet(len(self.colliders))
 
         for i, c in enumerate(self.colliders):
-            self.collider_aabbs[i] = c.geometry.bounds
+            self.collider_aabbs[i] = c.bounds
 
         if self.query_aabbs is None:
             self.query_aabbs = gimpact.AABBSet(len(self.queries))
 
         for i, c in enumerate(self.queries):
-            self.query_aabbs[i] = c.geometry.bounds
+            self.query_aabbs[i] = c.bounds
 
     def clear(self):
         """
@@ -76,8 +580,24 @@ class CollisionManager:
         self.colliders.clear()
         self.collider_aabbs = None
         self.query_aabbs = None
+        self.query_index.clear()
+        self.contacts.clear()
+        self.clearances.clear()
+        self.excludes[:] = False
+        self.movable[:] = False
+        self.query_ids = np.zeros(0, np.int64)
+
+    def close(self):
+        """Shuts down the thread pool of the narrow phase tests"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def __del__(self):
+        self.close()
 
-    def addColliders(self, geometry, transform=None, exclude=Exclude.Nothing, movable=False):
+    def addColliders(self, geometry, transform=None, exclude=Exclude.Nothing, movable=False, decimation=None,
+                     cache=None):
         """Adds collider geometry to the manager. This function creates a collider from
         a list of scene nodes, specifies how they should collide (e.g. Exclude.Consecutive
         indicates that consecutive nodes cannot collide with each other), and indicates if the
@@ -91,12 +611,19 @@ class CollisionManager:
         :type exclude: CollisionManager.Exclude
         :param movable: flag indicating the collider can move
         :type movable: bool
+        :param decimation: maximum number of triangles in each collider. Uses Collider.decimation if None
+        :type decimation: Union[int, None]
+        :param cache: cache of decimated geometry
+        :type cache: Union[MeshCache, None]
         """
         object_count = len(self.colliders)
         node_count = len(geometry)
         for index, geom in enumerate(geometry):
             t_matrix = None if transform is None else transform[index]
-            obj = Collider(index + object_count, geom.vertices, geom.indices, self.max_size, t_matrix)
+            obj = Collider(index + object_count, geom.vertices, geom.indices, self.max_size, t_matrix, decimation,
+                           cache)
+            self.excludes[obj.id] = obj.excludes
+            obj.excludes = self.excludes[obj.id]
             if exclude == CollisionManager.Exclude.All:
                 for i in range(object_count, object_count + node_count):
                     obj.excludes[i] = True
@@ -108,26 +635,353 @@ class CollisionManager:
 
             self.colliders.append(obj)
             if movable:
+                self.query_index[obj.id] = len(self.queries)
                 self.queries.append(obj)
+                self.movable[obj.id] = True
+                self.query_ids = np.append(self.query_ids, obj.id)
+
+    def moveColliders(self, ids, transforms):
+        """Moves the colliders with the given ids and updates their bounding boxes. Colliders whose
+        transform has not changed are skipped so only the bounding boxes of the moved colliders are updated.
+        The bounding box sets must have been created with createAABBSets
+
+        :param ids: collider ids
+        :type ids: List[int]
+        :param transforms: transformation matrices of the colliders
+        :type transforms: List[Union[Matrix44, numpy.ndarray]]
+        :return: number of colliders that moved
+        :rtype: int
+        """
+        moved = 0
+        for i, transform in zip(ids, transforms):
+            collider = self.colliders[i]
+            if not collider.move(transform):
+                continue
+
+            moved += 1
+            self.__setBounds(i, collider.bounds)
+
+        return moved
+
+    def sweep(self, ids, start_transforms, stop_transforms, distances):
+        """Checks if the boxes swept by the colliders with the given ids, when moving from the start to the
+        stop transforms, intersect the bounding box of any collider they can collide with. The swept box of
+        a collider bounds the corners of its box at both poses and is padded by half the travelled distance.
+        A point on a path is at most half the path length from one end of the path, so the swept box contains
+        the collider during the motion if the distance bounds the path length of every point of the collider
+        (see ``path_length_bound``). The colliders are not moved.
+
+        :param ids: collider ids
+        :type ids: List[int]
+        :param start_transforms: transformation matrices of the colliders at the start of the motion
+        :type start_transforms: List[Union[Matrix44, numpy.ndarray]]
+        :param stop_transforms: transformation matrices of the colliders at the end of the motion
+        :type stop_transforms: List[Union[Matrix44, numpy.ndarray]]
+        :param distances: upper bound of the distance travelled by any point of each collider
+        :type distances: List[float]
+        :return: flag indicating the swept boxes intersect
+        :rtype: bool
+        """
+        boxes = {}
+        for i, start, stop, distance in zip(ids, start_transforms, stop_transforms, distances):
+            corners = self.colliders[i].corners
+            start, stop = np.asarray(start), np.asarray(stop)
+            start_corners = start[0:3, 0:3] @ corners + start[0:3, 3:4]
+            stop_corners = stop[0:3, 0:3] @ corners + stop[0:3, 3:4]
+            lower = np.minimum(start_corners.min(axis=1), stop_corners.min(axis=1)) - distance / 2
+            upper = np.maximum(start_corners.max(axis=1), stop_corners.max(axis=1)) + distance / 2
+            boxes[i] = (lower[0], upper[0], lower[1], upper[1], lower[2], upper[2])
+
+        for i, box in boxes.items():
+            self.__setBounds(i, box)
+
+        swept = len(self.__candidates()) > 0
+
+        for i in boxes:
+            self.__setBounds(i, self.colliders[i].bounds)
+
+        return swept
+
+    def __setBounds(self, index, bounds):
+        """Sets the box of a collider in the bounding box sets
+
+        :param index: collider id
+        :type index: int
+        :param bounds: bounds of the box
+        :type bounds: Tuple[float, float, float, float, float, float]
+        """
+        self.collider_aabbs[index] = bounds
+        query_index = self.query_index.get(index)
+        if query_index is not None:
+            self.query_aabbs[query_index] = bounds
+
+    def __pairs(self, first, second):
+        """Filters the pairs of colliders that are excluded from collision checks. A pair of movable
+        colliders is only excluded if each collider excludes the other, and is only kept once with the
+        lower id first
+
+        :param first: ids of the first colliders
+        :type first: numpy.ndarray
+        :param second: ids of the second colliders which must be movable
+        :type second: numpy.ndarray
+        :return: pairs of collider ids
+        :rtype: numpy.ndarray
+        """
+        keep = ~self.excludes[first, second]
+        first, second = first[keep], second[keep]
+        swap = self.movable[first] & (first > second)
+        pairs = np.stack((np.where(swap, second, first), np.where(swap, first, second)), axis=1)
+
+        return np.unique(pairs, axis=0)
+
+    def __candidates(self):
+        """Gets the pairs of colliders whose bounding boxes intersect and that are not excluded
+
+        :return: pairs of collider ids
+        :rtype: numpy.ndarray
+        """
+        intersecting = np.array(self.collider_aabbs.find_intersections(self.query_aabbs), np.int64).reshape(-1, 2)
+        return self.__pairs(intersecting[:, 0], self.query_ids[intersecting[:, 1]])
+
+    def __narrowPhase(self, tests, first_hit):
+        """Runs the narrow phase tests, on the thread pool if there is more than one worker. The geometry of
+        the colliders is transformed before the tests are dispatched
+
+        :param tests: pairs of colliders
+        :type tests: List[Tuple[Collider, Collider]]
+        :param first_hit: indicates the tests stop at the first pair that intersects
+        :type first_hit: bool
+        :return: results of the tests that were run keyed by the index of the pair
+        :rtype: Dict[int, bool]
+        """
+        for collider, query in tests:
+            collider.update()
+            query.update()
+
+        results = {}
+        if self.workers <= 1 or len(tests) <= 1:
+            for index, (collider, query) in enumerate(tests):
+                results[index] = narrow_phase(collider, query)
+                if first_hit and results[index]:
+                    break
+            return results
 
-    def collide(self):
-        """Checks for colliding object
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.workers)
+        futures = {self.executor.submit(narrow_phase, *pair): index for index, pair in enumerate(tests)}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]] = future.result()
+            if first_hit and any(results.values()):
+                # Tests that have started are completed so their results can be cached
+                for future in pending:
+                    future.cancel()
+                for future in wait(pending)[0]:
+                    if not future.cancelled():
+                        results[futures[future]] = future.result()
+                break
 
+        return results
+
+    def collide(self, first_hit=False):
+        """Checks for colliding object. Only movable colliders are tested against other colliders so pairs
+        of static colliders are never tested, and the result of a pair is reused if neither collider has
+        moved since the pair was last tested. The geometry of a collider is only transformed if the collider
+        is in a pair that needs a narrow phase test. If only the first hit is needed, the check stops at the
+        first colliding pair so other colliding pairs may not be marked.
+
+        :param first_hit: indicates the check stops at the first colliding pair
+        :type first_hit: bool
         :return: indicates which colliders are colliding
         :rtype: List[bool]
         """
         collisions = [False] * len(self.colliders)
-        intersecting = self.collider_aabbs.find_intersections(self.query_aabbs)
-        for i, j in intersecting:
+        tests = []
+        for i, j in self.__candidates().tolist():
             collider = self.colliders[i]
-            query = self.queries[j]
+            query = self.colliders[j]
 
-            if collider.excludes[query.id]:
-                continue
+            # The result only depends on the relative pose of the pair which does not change when
+            # neither collider moved or both moved together e.g. links above a moving stage
+            versions = (collider.version, query.version)
+            cached = self.contacts.get((i, j))
+            if cached is not None and cached[0] == versions:
+                contacts = cached[2]
+            else:
+                relative = collider.inverse @ query.transform
+                if cached is None or np.abs(relative - cached[1]).max() >= self.tolerance:
+                    tests.append((collider, query, versions, relative))
+                    continue
+                contacts = cached[2]
+                self.contacts[(i, j)] = (versions, relative, contacts)
+
+            if contacts:
+                collisions[i] = collisions[j] = True
+                if first_hit:
+                    return collisions
 
-            contacts = gimpact.trimesh_trimesh_collision(collider.geometry, query.geometry, True)
+        results = self.__narrowPhase([test[0:2] for test in tests], first_hit)
+        for index, contacts in results.items():
+            collider, query, versions, relative = tests[index]
+            self.contacts[(collider.id, query.id)] = (versions, relative, contacts)
             if contacts:
-                collisions[query.id] = True
-                collisions[collider.id] = True
+                collisions[collider.id] = collisions[query.id] = True
 
         return collisions
+
+    def __clearancePairs(self, ids=None):
+        """Gets the pairs of colliders whose clearance can be computed i.e. pairs that are not excluded and
+        have a movable collider
+
+        :param ids: ids of colliders whose pairs are included. All pairs are included if None
+        :type ids: Union[List[int], None]
+        :return: pairs of colliders
+        :rtype: List[Tuple[Collider, Collider]]
+        """
+        first, second = np.meshgrid(np.arange(len(self.colliders)), self.query_ids)
+        pairs = self.__pairs(first.ravel(), second.ravel())
+        if ids is not None:
+            pairs = pairs[np.any(np.isin(pairs, list(ids)), axis=1)]
+
+        return [(self.colliders[i], self.colliders[j]) for i, j in pairs.tolist()]
+
+    def __cachedClearance(self, collider, query, threshold):
+        """Gets the cached clearance of a pair if the relative pose of the colliders has not changed since
+        the clearance was computed
+
+        :param collider: first collider
+        :type collider: Collider
+        :param query: second collider
+        :type query: Collider
+        :param threshold: threshold of the query
+        :type threshold: Union[float, None]
+        :return: flag indicating the cache is valid, the cached clearance and the relative pose of the pair
+        :rtype: Tuple[bool, Union[Clearance, None], Union[numpy.ndarray, None]]
+        """
+        key = (collider.id, query.id, threshold)
+        versions = (collider.version, query.version)
+        cached = self.clearances.get(key)
+        if cached is None:
+            return False, None, None
+
+        relative = None
+        if cached[0] != versions:
+            relative = collider.inverse @ query.transform
+            if np.abs(relative - cached[1]).max() >= self.tolerance:
+                return False, None, relative
+
+        self.clearances[key] = (versions, cached[1], cached[2])
+        if cached[2] is None:
+            return True, None, relative
+
+        # The closest points are cached in the frame of the first collider
+        distance, points = cached[2]
+        points = points @ collider.transform[0:3, 0:3].T + collider.transform[0:3, 3]
+        return True, Clearance(key[0:2], distance, (points[0], points[1])), relative
+
+    def __cacheClearance(self, collider, query, threshold, relative, result):
+        """Caches the clearance of a pair
+
+        :param collider: first collider
+        :type collider: Collider
+        :param query: second collider
+        :type query: Collider
+        :param threshold: threshold of the query
+        :type threshold: Union[float, None]
+        :param relative: relative pose of the pair if already computed
+        :type relative: Union[numpy.ndarray, None]
+        :param result: distance and closest points or None if the pair is not closer than the threshold
+        :type result: Union[Tuple[float, numpy.ndarray, numpy.ndarray], None]
+        :return: clearance of the pair
+        :rtype: Union[Clearance, None]
+        """
+        relative = collider.inverse @ query.transform if relative is None else relative
+        versions = (collider.version, query.version)
+        key = (collider.id, query.id, threshold)
+        if result is None:
+            self.clearances[key] = (versions, relative, None)
+            return None
+
+        distance, point_a, point_b = result
+        points = np.array([point_a, point_b])
+        local = points @ collider.inverse[0:3, 0:3].T + collider.inverse[0:3, 3]
+        self.clearances[key] = (versions, relative, (distance, local))
+        return Clearance(key[0:2], distance, (point_a, point_b))
+
+    @staticmethod
+    def __gap(collider, query):
+        """Computes the distance between the bounding boxes of two colliders
+
+        :param collider: first collider
+        :type collider: Collider
+        :param query: second collider
+        :type query: Collider
+        :return: distance between the boxes
+        :rtype: float
+        """
+        return box_distance(np.array(collider.bounds[0::2]), np.array(collider.bounds[1::2]),
+                            np.array(query.bounds[0::2]), np.array(query.bounds[1::2]))
+
+    def clearance(self, ids=None, threshold=None):
+        """Computes the clearance i.e. the minimum distance and closest points between pairs of colliders.
+        As with collision checks, only pairs with a movable collider are included, excluded pairs are
+        skipped, and the result of a pair is reused if the relative pose of the colliders has not changed.
+        If a threshold is given, only pairs that are closer than the threshold are returned and the query
+        stops at the first pair of triangles closer than the threshold, so the distance of a returned pair
+        is below the threshold but may not be the minimum. Pairs whose bounding boxes are farther apart than
+        the threshold are skipped without a narrow phase query, which makes checking that the clearance is
+        above a margin about as fast as a collision check.
+
+        :param ids: ids of colliders whose pairs are included. All pairs are included if None
+        :type ids: Union[List[int], None]
+        :param threshold: clearance above which pairs are not returned
+        :type threshold: Union[float, None]
+        :return: clearance of the pairs
+        :rtype: List[Clearance]
+        """
+        clearances = []
+        for collider, query in self.__clearancePairs(ids):
+            cached, clearance, relative = self.__cachedClearance(collider, query, threshold)
+            if not cached:
+                result = None
+                if threshold is None or self.__gap(collider, query) < threshold:
+                    result = collider_distance(collider, query, threshold, threshold is not None)
+                clearance = self.__cacheClearance(collider, query, threshold, relative, result)
+
+            if clearance is not None:
+                clearances.append(clearance)
+
+        return clearances
+
+    def minimumClearance(self, ids=None):
+        """Computes the smallest clearance of the pairs of colliders. The pairs are queried in order of the
+        distance between their bounding boxes and the smallest clearance found so far is used to prune the
+        other queries, so this is faster than finding the minimum of the clearance of every pair
+
+        :param ids: ids of colliders whose pairs are included. All pairs are included if None
+        :type ids: Union[List[int], None]
+        :return: smallest clearance or None if there are no pairs
+        :rtype: Union[Clearance, None]
+        """
+        closest = None
+        pending = []
+        for collider, query in self.__clearancePairs(ids):
+            cached, clearance, relative = self.__cachedClearance(collider, query, None)
+            if not cached:
+                pending.append((self.__gap(collider, query), collider.id, query.id, relative))
+            elif closest is None or clearance.distance < closest.distance:
+                closest = clearance
+
+        for gap, i, j, relative in sorted(pending, key=lambda pair: pair[0:3]):
+            bound = None if closest is None else closest.distance
+            if bound is not None and gap >= bound:
+                break
+
+            # The clearance of a pair is exact when it is below the bound so only these are cached
+            result = collider_distance(self.colliders[i], self.colliders[j], bound)
+            if result is not None:
+                closest = self.__cacheClearance(self.colliders[i], self.colliders[j], None, relative, result)
+
+        return closest
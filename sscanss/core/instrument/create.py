@@ -247,9 +247,10 @@ def read_instrument_description(json_data, directory):
     detectors = read_detector_description(instrument_data, positioners, directory)
     incident_jaw = read_jaw_description(instrument_data, positioners, directory)
     fixed_hardware = read_fixed_hardware_description(instrument_data, directory)
+    collision_decimation = instrument_data.get('collision_decimation')
 
     return Instrument(instrument_name, gauge_volume, detectors, incident_jaw, positioners,
-                      positioning_stacks, script, fixed_hardware)
+                      positioning_stacks, script, fixed_hardware, collision_decimation)
 
 
 def read_script_template(instrument_data, path=''):
@@ -2,8 +2,9 @@
 A collection of classes to represent instrument and its components
 """
 from enum import Enum, unique
+import numpy as np
 import pystache
-from .robotics import IKSolver
+from .robotics import IKSolver, KinematicChain
 from ..geometry.mesh import MeshGroup
 
 
@@ -26,9 +27,11 @@ class Instrument:
     :type script: Script
     :param fixed_hardware: mesh for fixed hardware
     :type fixed_hardware: Dict[str, Mesh]
+    :param collision_decimation: maximum number of triangles in each collision mesh. Uses default if None
+    :type collision_decimation: Union[int, None]
     """
     def __init__(self, name, gauge_volume, detectors, jaws, positioners, positioning_stacks, script,
-                 fixed_hardware):
+                 fixed_hardware, collision_decimation=None):
         self.name = name
         self.gauge_volume = gauge_volume
         self.detectors = detectors
@@ -37,6 +40,7 @@ class Instrument:
         self.fixed_hardware = fixed_hardware
         self.positioning_stacks = positioning_stacks
         self.script = script
+        self.collision_decimation = collision_decimation
         self.loadPositioningStack(list(self.positioning_stacks.keys())[0])
 
     @property
@@ -506,8 +510,54 @@ class PositioningStack:
 
         return T
 
+    def fkineMany(self, q, ignore_locks=False):
+        """Computes the forward kinematics transformation matrices of the stack for many configurations at once.
+        Unlike fkine, the stack is not moved.
+
+        :param q: array of joint offsets with shape (N x number of links)
+        :type q: Union[List[List[float]], numpy.ndarray]
+        :param ignore_locks: indicates that joint locks should be ignored
+        :type ignore_locks: bool
+        :return: array of forward kinematic transformation matrices with shape (N x 4 x 4)
+        :rtype: numpy.ndarray
+        """
+        q = np.array(q, dtype=float, ndmin=2)
+        start, end = 0, self.fixed.numberOfLinks
+        T = self.fixed.fkineMany(q[:, start:end], ignore_locks=ignore_locks)
+        for link, positioner in zip(self.link_matrix, self.auxiliary):
+            start, end = end, end + positioner.numberOfLinks
+            T = T @ link[:, :] @ positioner.fkineMany(q[:, start:end], ignore_locks=ignore_locks)
+
+        return T
+
+    def compile(self):
+        """Creates an immutable snapshot of the kinematics of the stack. The snapshot computes
+        poses without moving the links.
+
+        :return: compiled kinematic chain
+        :rtype: KinematicChain
+        """
+        segments = [(self.fixed.base, 0, self.fixed.base_mesh is not None)]
+        tool = self.fixed.tool
+        start = self.fixed.numberOfLinks
+        for link, positioner in zip(self.link_matrix, self.auxiliary):
+            segments.append((tool @ link @ positioner.base, start, positioner.base_mesh is not None))
+            tool = positioner.tool
+            start += positioner.numberOfLinks
+
+        return KinematicChain(self.links, segments, tool, self.tool_link)
+
+    def jacobian(self):
+        """Computes the geometric jacobian of the end effector of the stack at the current configuration.
+
+        :return: 6 x N jacobian matrix where N is the number of links in the stack
+        :rtype: numpy.ndarray
+        """
+        return self.compile().jacobian(self.configuration)
+
     def ikine(self, current_pose, target_pose,  bounded=True, tol=(1e-2, 1.0), local_max_eval=1000,
-              global_max_eval=100):
+              global_max_eval=100, seed=None, backend=IKSolver.Backend.NLopt.value, decoupled=False,
+              reachability_map=None):
         """
         :param current_pose: current position and vector orientation
         :type current_pose: Tuple[numpy.ndarray, numpy.ndarray]
@@ -521,11 +571,21 @@ class PositioningStack:
         :type local_max_eval: int
         :param global_max_eval: number of evaluations for global optimization
         :type global_max_eval: int
+        :param seed: configuration used to warm start the optimization e.g. solution of a nearby point
+        :type seed: Union[None, numpy.ndarray]
+        :param backend: name of the optimization backend
+        :type backend: str
+        :param decoupled: indicates the orientation and position should be solved separately when possible
+        :type decoupled: bool
+        :param reachability_map: sampled map of the reachable poses of the stack used to reject unreachable poses
+                                 and seed the optimization
+        :type reachability_map: Union[ReachabilityMap, None]
         :return: result from the inverse kinematics optimization
         :rtype: IKResult
         """
         return self.ik_solver.solve(current_pose, target_pose, tol=tol, bounded=bounded, local_max_eval=local_max_eval,
-                                    global_max_eval=global_max_eval)
+                                    global_max_eval=global_max_eval, seed=seed, backend=backend, decoupled=decoupled,
+                                    reachability_map=reachability_map)
 
     def model(self):
         """generates 3d model of the stack.
@@ -0,0 +1,222 @@
+import os
+import pathlib
+import numpy as np
+
+
+def direction_bins(vectors, resolution):
+    """Computes the orientation bin of unit vectors. The bins are the cells of a cube map i.e. the vectors
+    are projected onto the faces of a cube which are divided into a resolution x resolution grid
+
+    :param vectors: unit vectors with shape (N x 3)
+    :type vectors: numpy.ndarray
+    :param resolution: number of cells along each side of a face
+    :type resolution: int
+    :return: bin index of the vectors
+    :rtype: numpy.ndarray
+    """
+    vectors = np.atleast_2d(vectors)
+    rows = np.arange(vectors.shape[0])
+    axis = np.argmax(np.abs(vectors), axis=1)
+    major = vectors[rows, axis]
+    face = 2 * axis + (major < 0)
+    u = vectors[rows, (axis + 1) % 3] / np.abs(major)
+    v = vectors[rows, (axis + 2) % 3] / np.abs(major)
+    iu = np.clip(np.floor((u + 1) * resolution / 2), 0, resolution - 1).astype(np.int64)
+    iv = np.clip(np.floor((v + 1) * resolution / 2), 0, resolution - 1).astype(np.int64)
+
+    return (face * resolution + iu) * resolution + iv
+
+
+class ReachabilityMap:
+    """Sampled map of the measurement points and vectors that a positioning stack can place in the gauge volume
+    with the measurement vectors aligned to the q-vectors. For a joint configuration, the point that is placed in
+    the gauge volume and the vector that is aligned with a q-vector are fixed in the tool frame, so the map is built
+    by computing these for random joint configurations with batched forward kinematics. The points are binned into
+    voxels and the vectors into orientation bins, and the configuration of one sample is kept for each occupied
+    cell to seed the inverse kinematics. A point and vector are considered reachable if the cell or a neighbouring
+    cell is occupied.
+
+    :param keys: sorted keys of the occupied cells
+    :type keys: numpy.ndarray
+    :param configurations: joint configuration of a sample in each occupied cell
+    :type configurations: numpy.ndarray
+    :param origin: position of the first voxel
+    :type origin: numpy.ndarray
+    :param voxel_size: size of the voxels
+    :type voxel_size: float
+    :param shape: number of voxels along each axis
+    :type shape: numpy.ndarray
+    :param resolution: number of cells along each side of a face of the orientation cube map
+    :type resolution: int
+    :param gauge_volume: position of the gauge volume
+    :type gauge_volume: numpy.ndarray
+    :param q_vectors: q-vectors of the detectors
+    :type q_vectors: numpy.ndarray
+    """
+    sample_count = 200000
+    voxel_resolution = 16
+    orientation_resolution = 8
+    seed = 10
+
+    def __init__(self, keys, configurations, origin, voxel_size, shape, resolution, gauge_volume, q_vectors):
+        self.keys = keys
+        self.configurations = configurations
+        self.origin = origin
+        self.voxel_size = voxel_size
+        self.shape = shape
+        self.resolution = resolution
+        self.gauge_volume = gauge_volume
+        self.q_vectors = q_vectors
+
+        # Neighbouring cells are searched in order of distance from the cell of the query
+        offsets = np.array(np.meshgrid([0, -1, 1], [0, -1, 1], [0, -1, 1], indexing='ij')).reshape(3, -1).T
+        self.voxel_offsets = offsets[np.argsort(np.sum(offsets ** 2, axis=1), kind='stable')]
+        self.direction_offsets = self.voxel_offsets[self.voxel_offsets[:, 2] == 0, 0:2]
+
+    @property
+    def bin_count(self):
+        return 6 * self.resolution ** 2
+
+    def __keys(self, detector, voxels, bins):
+        """computes the keys of cells
+
+        :param detector: index of the q-vector
+        :type detector: Union[int, numpy.ndarray]
+        :param voxels: voxel indices with shape (N x 3)
+        :type voxels: numpy.ndarray
+        :param bins: orientation bins
+        :type bins: numpy.ndarray
+        :return: keys
+        :rtype: numpy.ndarray
+        """
+        nx, ny, nz = self.shape
+        return (((detector * nx + voxels[:, 0]) * ny + voxels[:, 1]) * nz + voxels[:, 2]) * self.bin_count + bins
+
+    @staticmethod
+    def build(positioner, gauge_volume, q_vectors, sample_count=None, rng=None):
+        """Builds the reachability map of a positioning stack by sampling random joint configurations within
+        the joint limits. Locked joints are kept at their offsets
+
+        :param positioner: positioning stack
+        :type positioner: PositioningStack
+        :param gauge_volume: position of the gauge volume
+        :type gauge_volume: numpy.ndarray
+        :param q_vectors: q-vectors of the detectors
+        :type q_vectors: numpy.ndarray
+        :param sample_count: number of random configurations. Uses ReachabilityMap.sample_count if None
+        :type sample_count: Union[int, None]
+        :param rng: random number generator
+        :type rng: Union[numpy.random.RandomState, None]
+        :return: reachability map
+        :rtype: ReachabilityMap
+        """
+        sample_count = ReachabilityMap.sample_count if sample_count is None else sample_count
+        rng = np.random.RandomState(ReachabilityMap.seed) if rng is None else rng
+        gauge_volume = np.array(gauge_volume, dtype=float)
+        q_vectors = np.atleast_2d(np.array(q_vectors, dtype=float))
+        q_vectors = q_vectors / np.linalg.norm(q_vectors, axis=1)[:, None]
+
+        limits = np.array([(link.lower_limit, link.upper_limit) for link in positioner.links])
+        configurations = rng.uniform(limits[:, 0], limits[:, 1], (sample_count, limits.shape[0]))
+        for index, link in enumerate(positioner.links):
+            if link.locked:
+                configurations[:, index] = link.offset
+
+        matrices = positioner.fkineMany(configurations) @ positioner.tool_link[:, :]
+        rotations = matrices[:, 0:3, 0:3]
+        points = np.einsum('nji,nj->ni', rotations, gauge_volume - matrices[:, 0:3, 3])
+
+        voxel_size = max(np.ptp(points, axis=0).max() / ReachabilityMap.voxel_resolution, 1e-6)
+        origin = points.min(axis=0) - voxel_size
+        shape = np.floor((points.max(axis=0) - origin) / voxel_size).astype(np.int64) + 2
+        voxels = np.floor((points - origin) / voxel_size).astype(np.int64)
+
+        reachability_map = ReachabilityMap(np.array([], np.int64), np.zeros((0, limits.shape[0])), origin,
+                                           voxel_size, shape, ReachabilityMap.orientation_resolution, gauge_volume,
+                                           q_vectors)
+        keys = []
+        for detector, q_vector in enumerate(q_vectors):
+            vectors = np.einsum('nji,j->ni', rotations, q_vector)
+            bins = direction_bins(vectors, reachability_map.resolution)
+            keys.append(reachability_map.__keys(detector, voxels, bins))
+
+        keys, index = np.unique(np.concatenate(keys), return_index=True)
+        reachability_map.keys = keys
+        reachability_map.configurations = configurations[index % sample_count]
+
+        return reachability_map
+
+    def query(self, current_pose, target_pose):
+        """Checks if the positioning stack can move the current pose to the target pose and gets the joint
+        configuration of the nearest sample. The map can only answer for a target position at the gauge volume
+        and a target vector that matches one of the q-vectors. The first vector of each pose is used
+
+        :param current_pose: current position and vector orientation
+        :type current_pose: Tuple[numpy.ndarray, numpy.ndarray]
+        :param target_pose: target position and vector orientation
+        :type target_pose: Tuple[numpy.ndarray, numpy.ndarray]
+        :return: flag indicating the pose is reachable and the configuration of the nearest sample
+        :rtype: Tuple[bool, Union[numpy.ndarray, None]]
+        """
+        point, vectors = current_pose
+        target_position, target_vectors = target_pose
+        target_vector = np.atleast_2d(target_vectors)[0]
+        target_vector = target_vector / np.linalg.norm(target_vector)
+        detectors = np.where(np.all(np.isclose(self.q_vectors, target_vector, atol=1e-6), axis=1))[0]
+        if detectors.size == 0 or not np.allclose(target_position, self.gauge_volume, atol=1e-6):
+            return True, None
+
+        vector = np.atleast_2d(vectors)[0]
+        vector = vector / np.linalg.norm(vector)
+        voxel = np.floor((np.asarray(point) - self.origin) / self.voxel_size).astype(np.int64)
+        voxels = voxel + self.voxel_offsets
+        voxels = voxels[np.all((voxels >= 0) & (voxels < self.shape), axis=1)]
+        if voxels.size == 0:
+            return False, None
+
+        # The vector is perturbed by the angular size of a bin to find the neighbouring orientation bins
+        e1 = np.cross(vector, np.eye(3)[np.argmin(np.abs(vector))])
+        e1 = e1 / np.linalg.norm(e1)
+        e2 = np.cross(vector, e1)
+        step = np.pi / (2 * self.resolution)
+        perturbed = vector + step * (self.direction_offsets[:, 0:1] * e1 + self.direction_offsets[:, 1:2] * e2)
+        bins = np.unique(direction_bins(perturbed / np.linalg.norm(perturbed, axis=1)[:, None], self.resolution))
+        own_bin = direction_bins(vector, self.resolution)[0]
+        bins = np.concatenate(([own_bin], bins[bins != own_bin]))
+
+        keys = self.__keys(detectors[0], np.repeat(voxels, bins.size, axis=0), np.tile(bins, voxels.shape[0]))
+        index = np.minimum(np.searchsorted(self.keys, keys), self.keys.size - 1)
+        found = np.where(self.keys[index] == keys)[0] if self.keys.size else []
+        if len(found) == 0:
+            return False, None
+
+        return True, self.configurations[index[found[0]]].copy()
+
+    def save(self, filename):
+        """Writes the reachability map to a file. The file is written to a temporary file which is then
+        renamed so other processes never read a partially written file
+
+        :param filename: path of the file
+        :type filename: Union[str, pathlib.Path]
+        """
+        filename = pathlib.Path(filename)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        temp_filename = filename.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temp_filename, 'wb') as map_file:
+            np.savez(map_file, keys=self.keys, configurations=self.configurations, origin=self.origin,
+                     voxel_size=self.voxel_size, shape=self.shape, resolution=self.resolution,
+                     gauge_volume=self.gauge_volume, q_vectors=self.q_vectors)
+        temp_filename.replace(filename)
+
+    @staticmethod
+    def load(filename):
+        """Reads a reachability map from a file
+
+        :param filename: path of the file
+        :type filename: Union[str, pathlib.Path]
+        :return: reachability map
+        :rtype: ReachabilityMap
+        """
+        with np.load(filename) as data:
+            return ReachabilityMap(data['keys'], data['configurations'], data['origin'], float(data['voxel_size']),
+                                   data['shape'], int(data['resolution']), data['gauge_volume'], data['q_vectors'])
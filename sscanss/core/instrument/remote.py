@@ -0,0 +1,364 @@
+"""
+Classes for running a simulation on workers on other machines
+"""
+import logging
+import os
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+from .simulation import (JobEvent, ResultBuffer, Simulation, SimulationServer, pack_cached_args,
+                         unpack_cached_args)
+
+AUTHKEY_VARIABLE = 'SSCANSS_AUTHKEY'
+DEFAULT_PORT = 8765
+
+
+def parse_address(address):
+    """Converts an address string of the form "host:port" into a tuple. The host defaults to
+    localhost and the port to the default port
+
+    :param address: address string
+    :type address: str
+    :return: host and port
+    :rtype: Tuple[str, int]
+    :raises: ValueError
+    """
+    host, separator, port = address.strip().rpartition(':')
+    if not separator:
+        host, port = port, ''
+
+    try:
+        return host or 'localhost', int(port) if port else DEFAULT_PORT
+    except ValueError as e:
+        raise ValueError(f'"{address}" is not a valid address, expected "host:port"') from e
+
+
+def get_authkey(authkey=None):
+    """Gets the key used to authenticate the connections between the job server and workers. The key
+    is taken from the SSCANSS_AUTHKEY environment variable if not given. There is no default key because
+    the messages are unpickled, anyone with the key can run code on the server and workers.
+
+    :param authkey: authentication key
+    :type authkey: Union[str, bytes, None]
+    :return: authentication key
+    :rtype: bytes
+    :raises: ValueError
+    """
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_VARIABLE, '')
+
+    if not authkey:
+        raise ValueError(f'An authentication key is required, set a secret key with the {AUTHKEY_VARIABLE} '
+                         f'environment variable')
+
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+
+class RemoteSimulationServer(SimulationServer):
+    """Job server for a simulation on remote workers. The server listens on the given address and the
+    workers (see ``run_worker``) connect and pull chunks of measurements to simulate. The results sent by
+    the workers are written into the result buffer so the server is a drop-in replacement for the local
+    simulation server. Chunks held by a worker that disconnects are given to the other workers.
+
+    The messages are pickled so the server and workers should only be used on a trusted network with
+    a secret authentication key.
+
+    :param address: address ("host:port") to listen on. A free port is chosen if the port is 0
+    :type address: str
+    :param authkey: authentication key. The key is taken from the SSCANSS_AUTHKEY environment variable if None
+    :type authkey: Union[str, bytes, None]
+    :raises: OSError, ValueError
+    """
+    def __init__(self, address='localhost:0', authkey=None):
+        super().__init__()
+
+        self.lock = threading.Lock()
+        self.job = None
+        self.chunks = []
+        self.worker_count = 0
+        self.job_worker_count = 0
+        self.job_workers = set()
+        self.running = True
+        self.authkey = get_authkey(authkey)
+        self.listener = Listener(parse_address(address), authkey=self.authkey)
+        host, port = self.listener.address
+        self.address = f'{host}:{port}'
+        self.thread = threading.Thread(target=self.accept, daemon=True)
+        self.thread.start()
+
+    def isAlive(self):
+        """Indicates if the server is accepting workers
+
+        :return: flag indicating the server is running
+        :rtype: bool
+        """
+        return self.thread.is_alive()
+
+    def accept(self):
+        """Accepts worker connections and serves each worker on a new thread. The thread exits when the
+        server is stopped or the listener is closed"""
+        while self.running:
+            try:
+                connection = self.listener.accept()
+            except AuthenticationError:
+                logging.warning('A connection to the job server failed authentication')
+                continue
+            except (EOFError, ConnectionError) as e:
+                logging.info(f'A connection to the job server was dropped ({e})')
+                continue
+            except OSError:
+                if self.running:
+                    logging.exception('The job server stopped accepting workers')
+                break
+
+            threading.Thread(target=self.serveWorker, args=(connection,), daemon=True).start()
+
+    def submit(self, args, worker_count, digests=None):
+        """Submits a simulation job to the server. The measurements that are not reused are split into
+        chunks which are given to the workers on request and the previous job is stopped. Only the first
+        workers (up to the worker count) to request a chunk are given chunks of the job, another worker takes
+        over when one of them disconnects.
+
+        :param args: simulation arguments
+        :type args: Dict
+        :param worker_count: maximum number of connected workers that simulate the job
+        :type worker_count: int
+        :param digests: digest of cached arguments. The digest is computed if None
+        :type digests: Union[Dict[str, str], None]
+        :return: event for the submitted job
+        :rtype: JobEvent
+        """
+        digests = self.digest(args) if digests is None else digests
+        chunk_size = args['chunk_size']
+        chunks = {}
+        for index, reused in enumerate(args['reused']):
+            if not reused:
+                chunks.setdefault(index // chunk_size, []).append(index)
+
+        with self.lock:
+            self.job_id += 1
+            self.active_job.value = self.job_id
+            job = {key: value for key, value in args.items() if key not in ('buffer', 'exit_event', 'worker_state')}
+            job['job_id'] = self.job_id
+            job['worker_count'] = 1
+            job['worker_id'] = 0
+            job['digests'] = digests
+            self.job = (job, args)
+            self.chunks = list(chunks.values())
+            self.job_worker_count = worker_count
+            self.job_workers = set()
+
+        return JobEvent(self.active_job, self.job_id)
+
+    def reserve(self, layout):
+        """Sets the layout of the result buffer. The buffer is only used by the server threads so a larger
+        buffer is created if needed without stopping the workers. The previous job is stopped first, since
+        the results are only written while their job is active, a stale result cannot be written with the
+        new layout.
+
+        :param layout: number of results, joints, detectors and colliders
+        :type layout: Tuple[int, int, int, int]
+        :return: result buffer
+        :rtype: ResultBuffer
+        """
+        with self.lock:
+            self.active_job.value = -1
+            self.job = None
+            self.chunks = []
+            if not self.buffer.fits(layout):
+                size = ResultBuffer.size(*layout)
+                self.buffer = ResultBuffer(*[max(new, 2 * old) for new, old in zip(size, self.buffer.capacity)])
+
+            self.buffer.setLayout(*layout)
+            self.buffer.reset()
+
+        return self.buffer
+
+    def nextChunk(self, worker, worker_digests):
+        """Gets the next chunk of the active job for a worker
+
+        :param worker: connection to the worker
+        :type worker: multiprocessing.connection.Connection
+        :param worker_digests: digest of the arguments held by the worker
+        :type worker_digests: Dict[str, str]
+        :return: message with the job and chunk, or a message telling the worker to wait or exit
+        :rtype: Tuple
+        """
+        with self.lock:
+            if not self.running:
+                return ('exit',)
+
+            if self.job is None or not self.chunks or self.active_job.value != self.job[0]['job_id']:
+                return ('wait',)
+
+            if worker not in self.job_workers:
+                if len(self.job_workers) >= self.job_worker_count:
+                    return ('wait',)
+                self.job_workers.add(worker)
+
+            job, args = self.job
+            job = dict(job)
+            pack_cached_args(job, args, job['digests'], worker_digests)
+            return 'job', job, self.chunks.pop(0)
+
+    def requeue(self, job_id, indices):
+        """Returns the unfinished measurements of a chunk to the active job
+
+        :param job_id: id of the job of the chunk
+        :type job_id: int
+        :param indices: indices of measurements in the chunk
+        :type indices: List[int]
+        """
+        with self.lock:
+            if self.active_job.value != job_id:
+                return
+
+            indices = [index for index in indices if not self.buffer.isDone(index, job_id)]
+            if indices:
+                self.chunks.insert(0, indices)
+
+    def serveWorker(self, connection):
+        """Handles the requests and results of a worker
+
+        :param connection: connection to the worker
+        :type connection: multiprocessing.connection.Connection
+        """
+        worker_digests = {}
+        chunk = None
+        with self.lock:
+            self.worker_count += 1
+        try:
+            while True:
+                message = connection.recv()
+                if message[0] == 'request':
+                    chunk = None
+                    reply = self.nextChunk(connection, worker_digests)
+                    if reply[0] == 'job':
+                        chunk = (reply[1]['job_id'], reply[2])
+                    connection.send(reply)
+                    if reply[0] == 'exit':
+                        break
+                elif message[0] == 'result':
+                    _, job_id, index, result = message
+                    with self.lock:
+                        active = self.active_job.value == job_id
+                        if active:
+                            self.buffer.write(index, job_id, result)
+                    connection.send(active)
+                elif message[0] == 'error':
+                    job_id = message[1]
+                    with self.lock:
+                        if self.active_job.value == job_id:
+                            self.buffer.error[0] = job_id
+                            self.active_job.value = -1
+                    chunk = None
+        except (EOFError, OSError):
+            logging.info('A simulation worker disconnected from the job server')
+        finally:
+            if chunk is not None:
+                self.requeue(*chunk)
+            with self.lock:
+                self.worker_count -= 1
+                self.job_workers.discard(connection)
+            connection.close()
+
+    def stop(self):
+        """Stops the server and tells the workers to exit"""
+        with self.lock:
+            self.active_job.value = -1
+            self.running = False
+            self.job = None
+            self.chunks = []
+
+        # Connects to the listener to unblock the accept thread before closing
+        try:
+            Client(self.listener.address, authkey=self.authkey).close()
+        except Exception:
+            pass
+        self.thread.join()
+        self.listener.close()
+
+
+class RemoteJob:
+    """Result buffer and exit event of a chunk simulated by a remote worker. The results are sent to the
+    job server which replies whether the job is still active.
+
+    :param connection: connection to the job server
+    :type connection: multiprocessing.connection.Connection
+    :param job_id: id of the job
+    :type job_id: int
+    """
+    def __init__(self, connection, job_id):
+        self.connection = connection
+        self.job_id = job_id
+        self.error = [-1]
+        self.stopped = False
+
+    def write(self, index, job_id, result):
+        """Sends the result of a measurement to the job server
+
+        :param index: index of result in simulation order
+        :type index: int
+        :param job_id: id of the job
+        :type job_id: int
+        :param result: simulation result
+        :type result: SimulationResult
+        """
+        self.connection.send(('result', job_id, index, result))
+        self.stopped = not self.connection.recv()
+
+    def is_set(self):
+        """indicates if the job has been stopped
+
+        :return: flag indicating the job has been stopped
+        :rtype: bool
+        """
+        return self.stopped
+
+    def set(self):
+        """stops the job"""
+        self.stopped = True
+
+
+def run_worker(address, authkey=None, wait=0.2):
+    """Connects to the job server at the given address and simulates the chunks of measurements given
+    by the server until the server stops. The positioner, sample and instrument scene are only sent by
+    the server when they change so they are cached by the worker.
+
+    :param address: address ("host:port") of the job server
+    :type address: str
+    :param authkey: authentication key. The key is taken from the SSCANSS_AUTHKEY environment variable if None
+    :type authkey: Union[str, bytes, None]
+    :param wait: time in seconds to wait before requesting more work when the server has no work
+    :type wait: float
+    """
+    connection = Client(parse_address(address), authkey=get_authkey(authkey))
+    cache = {}
+    state = {}
+    try:
+        while True:
+            connection.send(('request',))
+            message = connection.recv()
+            if message[0] == 'exit':
+                break
+
+            if message[0] == 'wait':
+                time.sleep(wait)
+                continue
+
+            _, args, indices = message
+            unpack_cached_args(args, cache)
+            remote_job = RemoteJob(connection, args['job_id'])
+            args['indices'] = indices
+            args['buffer'] = remote_job
+            args['exit_event'] = remote_job
+            args['worker_state'] = state
+            args['log_level'] = logging.getLogger().getEffectiveLevel()
+            Simulation.execute(args)
+            if remote_job.error[0] == args['job_id']:
+                connection.send(('error', args['job_id']))
+    except (EOFError, OSError):
+        pass
+    finally:
+        connection.close()
@@ -1,9 +1,9 @@
+from abc import ABC, abstractmethod
 from enum import Enum, unique
 import logging
 import math
 import nlopt
 import numpy as np
-from PyQt5 import QtCore
 from ..geometry.mesh import MeshGroup
 from ..math.constants import VECTOR_EPS
 from ..math.matrix import Matrix44
@@ -75,6 +75,56 @@ class SerialManipulator:
 
         return base @ qs.toMatrix() @ tool
 
+    def fkineMany(self, q, start_index=0, end_index=None, include_base=True, ignore_locks=False):
+        """Computes the forward kinematics transformation matrices of the manipulator for many configurations
+        at once. Unlike fkine, the manipulator is not moved. The transformation matrices can be computed for a
+        subset of links i.e a start index to end index
+
+        :param q: array of joint offsets with shape (N x number of links)
+        :type q: Union[List[List[float]], numpy.ndarray]
+        :param start_index: index to start
+        :type start_index: int
+        :param end_index: index to end. None sets end_index to index of last link
+        :type end_index: Union[int, None]
+        :param include_base: indicates that base matrix should be included
+        :type include_base: bool
+        :param ignore_locks: indicates that joint locks should be ignored
+        :type ignore_locks: bool
+        :return: array of forward kinematic transformation matrices with shape (N x 4 x 4)
+        :rtype: numpy.ndarray
+        """
+        q = np.array(q, dtype=float, ndmin=2)
+        link_count = self.numberOfLinks
+
+        start = 0 if start_index < 0 else start_index
+        end = link_count if end_index is None or end_index > link_count else end_index
+
+        base = self.base if include_base and start == 0 else Matrix44.identity()
+        tool = self.tool if end == link_count else Matrix44.identity()
+
+        count = q.shape[0]
+        rotation = np.tile(np.identity(3), (count, 1, 1))
+        position = np.zeros((count, 3))
+        for i in range(start, end):
+            link = self.links[i]
+            offsets = np.full(count, link.offset) if link.locked and not ignore_locks else q[:, i]
+            axis = link.joint_axis[:]
+            if link.type == Link.Type.Revolute:
+                x, y, z = axis / np.linalg.norm(axis)
+                k = np.array([[0., -z, y], [z, 0., -x], [-y, x, 0.]])
+                rotation = rotation @ (np.identity(3) + np.sin(offsets)[:, None, None] * k
+                                       + (1 - np.cos(offsets))[:, None, None] * (k @ k))
+                position += rotation @ link.home[:]
+            else:
+                vector = link.home[:] + offsets[:, None] * axis
+                position += np.einsum('nij,nj->ni', rotation, vector)
+
+        matrix = np.tile(np.identity(4), (count, 1, 1))
+        matrix[:, 0:3, 0:3] = rotation
+        matrix[:, 0:3, 3] = position
+
+        return base[:, :] @ matrix @ tool[:, :]
+
     def fromUserFormat(self, q):
         """converts joint offset from user defined format to kinematic order
 
@@ -172,6 +222,30 @@ class SerialManipulator:
 
         return self.base @ qs.toMatrix() @ self.tool
 
+    def compile(self, matrix=None):
+        """Creates an immutable snapshot of the kinematics of the manipulator. The snapshot
+        computes poses without moving the links.
+
+        :param matrix: transformation matrix applied before the base matrix
+        :type matrix: Union[Matrix44, None]
+        :return: compiled kinematic chain
+        :rtype: KinematicChain
+        """
+        base = self.base if matrix is None else matrix @ self.base
+        return KinematicChain(self.links, [(base, 0, self.base_mesh is not None)], self.tool)
+
+    def jacobian(self, matrix=None):
+        """Computes the geometric jacobian of the end effector at the current configuration. The first three
+        rows are the linear velocity of the end effector position and the last three are the angular velocity,
+        both in the world coordinate frame.
+
+        :param matrix: transformation matrix applied before the base matrix
+        :type matrix: Union[Matrix44, None]
+        :return: 6 x N jacobian matrix where N is the number of links
+        :rtype: numpy.ndarray
+        """
+        return self.compile(matrix).jacobian(self.configuration)
+
     def model(self, matrix=None):
         """Generates 3d model of the manipulator and transforms it with specified matrix.
 
@@ -303,6 +377,178 @@ class Link:
         return QuaternionVectorPair(self.quaternion, self.vector)
 
 
+class KinematicChain:
+    """This class is an immutable snapshot of the kinematics of a serial manipulator or positioning
+    stack. The link parameters are copied into flat arrays and the constant matrices (i.e. base,
+    tool and fixed link matrices) between manipulators are pre-multiplied, so the pose, jacobian and
+    model transforms can be computed for any configuration without modifying the links. This makes
+    the chain safe to share between threads. Locked links are frozen at their offset when the chain is
+    created.
+
+    :param links: links in the chain
+    :type links: List[Link]
+    :param segments: constant matrix applied before the links of each manipulator, the index of the
+                      first link of the manipulator and a flag indicating the manipulator has a base mesh
+    :type segments: List[Tuple[Matrix44, int, bool]]
+    :param tool: constant matrix applied after the last link
+    :type tool: Matrix44
+    :param tool_link: matrix that transforms the end effector pose to the tool pose
+    :type tool_link: Union[Matrix44, None]
+    """
+    def __init__(self, links, segments, tool, tool_link=None):
+        self.numberOfLinks = len(links)
+        self.revolute = np.array([link.type == Link.Type.Revolute for link in links], dtype=bool)
+        self.locked = np.array([link.locked for link in links], dtype=bool)
+        self.offsets = np.array([link.offset for link in links], dtype=float)
+        self.axes = np.zeros((self.numberOfLinks, 3))
+        self.homes = np.zeros((self.numberOfLinks, 3))
+        self.mesh_rotations = []
+        self.has_mesh = np.array([link.mesh is not None for link in links], dtype=bool)
+        up = Vector3([0., 0., 1.])
+        for i, link in enumerate(links):
+            axis = link.joint_axis[:]
+            self.axes[i] = axis / np.linalg.norm(axis) if self.revolute[i] else axis
+            self.homes[i] = link.home[:]
+            self.mesh_rotations.append(rotation_btw_vectors(up, link.joint_axis)[:, :])
+
+        ends = [index for _, index, _ in segments[1:]] + [self.numberOfLinks]
+        self.segments = [(np.array(matrix[:, :], dtype=float), start, end, base_mesh)
+                         for (matrix, start, base_mesh), end in zip(segments, ends)]
+        self.tool = np.array(tool[:, :], dtype=float)
+        self.tool_link = np.identity(4) if tool_link is None else np.array(tool_link[:, :], dtype=float)
+
+        for array in (self.revolute, self.locked, self.offsets, self.axes, self.homes, self.has_mesh, self.tool,
+                      self.tool_link, *[segment[0] for segment in self.segments]):
+            array.flags.writeable = False
+
+    def __linkTransform(self, index, offset):
+        """computes the rotation and translation of a link for the given offset
+
+        :param index: index of link
+        :type index: int
+        :param offset: joint offset
+        :type offset: float
+        :return: rotation matrix and translation vector of the link
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+        """
+        if self.locked[index]:
+            offset = self.offsets[index]
+
+        if self.revolute[index]:
+            x, y, z = self.axes[index]
+            k = np.array([[0., -z, y], [z, 0., -x], [-y, x, 0.]])
+            rotation = np.identity(3) + math.sin(offset) * k + (1 - math.cos(offset)) * (k @ k)
+            return rotation, rotation @ self.homes[index]
+
+        return np.identity(3), self.homes[index] + self.axes[index] * offset
+
+    def __walk(self, q):
+        """computes the world transformation matrix before and after each link
+
+        :param q: joint offsets. The length must be equal to number of links
+        :type q: Union[List[float], numpy.ndarray]
+        :return: matrices before and after each link, and end effector matrix
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        """
+        before = np.zeros((self.numberOfLinks, 4, 4))
+        after = np.zeros((self.numberOfLinks, 4, 4))
+        matrix = np.identity(4)
+        for pre, start, end, _ in self.segments:
+            matrix = matrix @ pre
+            for i in range(start, end):
+                before[i] = matrix
+                rotation, vector = self.__linkTransform(i, q[i])
+                matrix = matrix.copy()
+                matrix[0:3, 3] += matrix[0:3, 0:3] @ vector
+                matrix[0:3, 0:3] = matrix[0:3, 0:3] @ rotation
+                after[i] = matrix
+
+        return before, after, matrix @ self.tool
+
+    def pose(self, q):
+        """computes the pose of the end effector for the given configuration
+
+        :param q: joint offsets. The length must be equal to number of links
+        :type q: Union[List[float], numpy.ndarray]
+        :return: forward kinematics transformation matrix
+        :rtype: numpy.ndarray
+        """
+        return self.__walk(q)[2]
+
+    def jacobian(self, q):
+        """computes the geometric jacobian of the end effector for the given configuration. The first three
+        rows are the linear velocity of the end effector position and the last three are the angular velocity,
+        both in the world coordinate frame.
+
+        :param q: joint offsets. The length must be equal to number of links
+        :type q: Union[List[float], numpy.ndarray]
+        :return: 6 x N jacobian matrix where N is the number of links
+        :rtype: numpy.ndarray
+        """
+        before, _, end = self.__walk(q)
+        axes = np.einsum('nij,nj->ni', before[:, 0:3, 0:3], self.axes)
+        jacobian = np.zeros((6, self.numberOfLinks))
+        jacobian[0:3, self.revolute] = np.cross(axes[self.revolute], end[0:3, 3] - before[self.revolute, 0:3, 3]).T
+        jacobian[3:6, self.revolute] = axes[self.revolute].T
+        jacobian[0:3, ~self.revolute] = axes[~self.revolute].T
+
+        return jacobian
+
+    def modelTransforms(self, q):
+        """computes the transformation matrices of the meshes in the model of the manipulator or stack for
+        the given configuration. The order of the matrices is the same as the model transforms.
+
+        :param q: joint offsets. The length must be equal to number of links
+        :type q: Union[List[float], numpy.ndarray]
+        :return: transformation matrices
+        :rtype: List[numpy.ndarray]
+        """
+        before, after, _ = self.__walk(q)
+        transforms = []
+        matrix = np.identity(4)
+        for pre, start, end, base_mesh in self.segments:
+            matrix = matrix @ pre
+            if base_mesh:
+                transforms.append(matrix)
+
+            for i in range(start, end):
+                if self.has_mesh[i]:
+                    transform = np.identity(4)
+                    transform[0:3, 0:3] = after[i, 0:3, 0:3] @ self.mesh_rotations[i]
+                    transform[0:3, 3] = before[i, 0:3, 3] if self.revolute[i] else after[i, 0:3, 3]
+                    transforms.append(transform)
+
+            matrix = after[end - 1] if end > start else matrix
+
+        return transforms
+
+    def modelLinkCounts(self):
+        """gets the number of links that move each mesh in the model of the manipulator or stack i.e. the
+        mesh is moved by the first N links. The order of the counts is the same as the model transforms.
+
+        :return: number of links that move each mesh
+        :rtype: List[int]
+        """
+        counts = []
+        for _, start, end, base_mesh in self.segments:
+            if base_mesh:
+                counts.append(start)
+            counts.extend(i + 1 for i in range(start, end) if self.has_mesh[i])
+
+        return counts
+
+    def jointOrigins(self, q):
+        """computes the world position of a point on the axis of each joint for the given configuration. A
+        revolute joint rotates the later links about an axis through its origin.
+
+        :param q: joint offsets. The length must be equal to number of links
+        :type q: Union[List[float], numpy.ndarray]
+        :return: N x 3 array of joint origins where N is the number of links
+        :rtype: numpy.ndarray
+        """
+        return self.__walk(q)[0][:, 0:3, 3]
+
+
 def joint_space_trajectory(start_pose, stop_pose, step):
     """Generates a trajectory from a start to end configuration.
 
@@ -362,71 +608,6 @@ def cubic_polynomial_trajectory(p0, p1, step=100):
     return pd
 
 
-class Sequence(QtCore.QObject):
-    """This class creates an animation from start to end configuration
-
-    :param frames: function to generate frame at each way point
-    :type frames: method
-    :param start: inclusive start joint configuration/offsets
-    :type start: List[float]
-    :param stop: inclusive stop joint configuration/offsets
-    :type stop: List[float]
-    :param duration: time duration in milliseconds
-    :type duration: int
-    :param step: number of steps
-    :type step: int
-    """
-    frame_changed = QtCore.pyqtSignal()
-
-    def __init__(self, frames, start, stop, duration, step):
-        super().__init__()
-
-        self.timeline = QtCore.QTimeLine(duration, self)
-        self.timeline.setFrameRange(0, step - 1)
-
-        self.trajectory = joint_space_trajectory(start, stop, step)
-
-        self.timeline.setCurrentTime(self.timeline.duration())
-        self.timeline.frameChanged.connect(self.animate)
-        self.frames = frames
-        self.step = step
-
-    def start(self):
-        """
-        starts the animation
-        """
-        self.timeline.start()
-
-    def stop(self):
-        """
-        stops the animation
-        """
-        if self.timeline.currentTime() < self.timeline.duration():
-            self.timeline.setCurrentTime(self.timeline.duration())
-
-        self.timeline.stop()
-
-    def isRunning(self):
-        """indicates if the animation is running
-
-        :return: indicates if the animation is running
-        :rtype: bool
-        """
-        if self.timeline.state() == QtCore.QTimeLine.Running:
-            return True
-
-        return False
-
-    def animate(self, index):
-        """Calls the frame function and emits signal to notify frame change
-
-        :param index: current step/frame in the animation
-        :type index: int
-        """
-        self.frames(self.trajectory[index, :])
-        self.frame_changed.emit()
-
-
 class IKResult:
     """Data class for the inverse kinematics result
 
@@ -442,22 +623,202 @@ class IKResult:
     :type pos_err_ok: bool
     :param orient_err_ok: flag indicates if orientation error is within tolerance
     :type orient_err_ok: bool
+    :param evaluations: number of objective evaluations used to compute the result
+    :type evaluations: int
     """
-    def __init__(self, q, status, pos_err, orient_err, pos_err_ok, orient_err_ok):
+    def __init__(self, q, status, pos_err, orient_err, pos_err_ok, orient_err_ok, evaluations=0):
         self.q = q
         self.status = status
         self.position_error = pos_err
         self.position_converged = pos_err_ok
         self.orientation_error = orient_err
         self.orientation_converged = orient_err_ok
+        self.evaluations = evaluations
+
+
+class IKBackend(ABC):
+    """Base class of the optimization backends of the inverse kinematics solver. A backend minimizes the
+    objective of the solver within the joint bounds of the active joints, the solver keeps track of the best
+    configuration evaluated so the backends do not return a result. The default global search runs the local
+    refinement from the starting configuration and then from random configurations within the joint limits
+    until the objective is below the tolerance or the evaluation budget is exhausted.
+    """
+    seed = 10
+
+    @abstractmethod
+    def refine(self, solver, q0, lower_bounds, upper_bounds, stop_eval_tol, max_eval):
+        """runs a local optimization from the starting configuration
+
+        :param solver: inverse kinematics solver
+        :type solver: IKSolver
+        :param q0: starting configuration of the active joints
+        :type q0: numpy.ndarray
+        :param lower_bounds: lower joint bounds
+        :type lower_bounds: numpy.ndarray
+        :param upper_bounds: upper joint bounds
+        :type upper_bounds: numpy.ndarray
+        :param stop_eval_tol: objective value at which the optimization stops
+        :type stop_eval_tol: float
+        :param max_eval: number of evaluations for the optimization
+        :type max_eval: int
+        """
+
+    def search(self, solver, q0, lower_bounds, upper_bounds, stop_eval_tol, local_max_eval, global_max_eval):
+        """runs a global optimization from the starting configuration
+
+        :param solver: inverse kinematics solver
+        :type solver: IKSolver
+        :param q0: starting configuration of the active joints
+        :type q0: numpy.ndarray
+        :param lower_bounds: lower joint bounds
+        :type lower_bounds: numpy.ndarray
+        :param upper_bounds: upper joint bounds
+        :type upper_bounds: numpy.ndarray
+        :param stop_eval_tol: objective value at which the optimization stops
+        :type stop_eval_tol: float
+        :param local_max_eval: number of evaluations for each local optimization
+        :type local_max_eval: int
+        :param global_max_eval: number of evaluations for the global optimization
+        :type global_max_eval: int
+        """
+        rng = np.random.RandomState(self.seed)
+        start = solver.evaluations
+        q = q0
+        while True:
+            remaining = global_max_eval - (solver.evaluations - start)
+            if remaining <= 0 or solver.best_result < stop_eval_tol:
+                break
+
+            self.refine(solver, q, lower_bounds, upper_bounds, stop_eval_tol, min(local_max_eval, remaining))
+            q = solver.randomConfiguration(rng, lower_bounds, upper_bounds)
+
+
+class MultiStartLocalBackend(IKBackend):
+    """Inverse kinematics backend which runs the nlopt SLSQP local optimizer from the starting configuration
+    and from random configurations within the joint limits"""
+    def refine(self, solver, q0, lower_bounds, upper_bounds, stop_eval_tol, max_eval):
+        optimizer = nlopt.opt(nlopt.LD_SLSQP, q0.size)
+        optimizer.set_lower_bounds(lower_bounds)
+        optimizer.set_upper_bounds(upper_bounds)
+        optimizer.set_min_objective(solver.objective)
+        optimizer.set_stopval(stop_eval_tol)
+        optimizer.set_maxeval(max_eval)
+        optimizer.set_ftol_abs(1e-6)
+        optimizer.optimize(q0)
+
+
+class NloptBackend(MultiStartLocalBackend):
+    """Inverse kinematics backend which uses the nlopt MLSL global optimizer, a randomized global optimizer with
+    a SLSQP local optimization step to refine result"""
+    def search(self, solver, q0, lower_bounds, upper_bounds, stop_eval_tol, local_max_eval, global_max_eval):
+        nlopt.srand(self.seed)
+        optimizer = nlopt.opt(nlopt.G_MLSL, q0.size)
+        optimizer.set_lower_bounds(lower_bounds)
+        optimizer.set_upper_bounds(upper_bounds)
+        optimizer.set_min_objective(solver.objective)
+        optimizer.set_stopval(stop_eval_tol)
+        optimizer.set_maxeval(global_max_eval)
+        optimizer.set_ftol_abs(1e-6)
+
+        opt = nlopt.opt(nlopt.LD_SLSQP, q0.size)
+        opt.set_maxeval(local_max_eval)
+        opt.set_ftol_abs(1e-6)
+        optimizer.set_local_optimizer(opt)
+        optimizer.optimize(q0)
+
+
+class DampedLeastSquaresBackend(IKBackend):
+    """Inverse kinematics backend which uses the Levenberg-Marquardt (damped least squares) method on the
+    position and orientation residuals. The step is projected onto the joint bounds and the damping is
+    increased when a step does not reduce the objective. Joints at a bound are held while the objective
+    decreases outside the bound. The method converges in a few iterations when
+    started near a solution e.g. for mostly Cartesian positioners, so it is restarted from random
+    configurations to find solutions that are further away.
+    """
+    initial_damping = 1e-3
+    max_damping = 1e8
+
+    def refine(self, solver, q0, lower_bounds, upper_bounds, stop_eval_tol, max_eval):
+        q = np.clip(q0, lower_bounds, upper_bounds)
+        residuals, jacobian = solver.residuals(q)
+        error = residuals @ residuals
+        damping = self.initial_damping
+        identity = np.identity(q.size)
+        for _ in range(max_eval - 1):
+            if error < stop_eval_tol or damping > self.max_damping:
+                break
+
+            # Joints at a bound are held if the objective decreases outside the bound
+            gradient = jacobian.transpose() @ residuals
+            free = ~(((q <= lower_bounds) & (gradient > 0)) | ((q >= upper_bounds) & (gradient < 0)))
+            hessian = jacobian[:, free].transpose() @ jacobian[:, free]
+            step = np.zeros(q.size)
+            step[free] = np.linalg.solve(hessian + damping * (np.diag(np.diag(hessian)) + identity[free][:, free]),
+                                         -gradient[free])
+            new_q = np.clip(q + step, lower_bounds, upper_bounds)
+            if np.allclose(new_q, q, rtol=0, atol=1e-12):
+                break
+
+            new_residuals, new_jacobian = solver.residuals(new_q)
+            new_error = new_residuals @ new_residuals
+            if new_error < error:
+                q, residuals, jacobian, error = new_q, new_residuals, new_jacobian, new_error
+                damping = max(damping / 10, 1e-12)
+            else:
+                damping *= 10
+
+
+class OrientationSubproblem:
+    """Orientation sub-problem of the decoupled inverse kinematics solver. The orientation of the end effector
+    only depends on the revolute joints so the orientation residuals are minimized over the revolute joints while
+    the other joints are held. The sub-problem provides the same residuals method as the solver so it can be
+    minimized by the least squares backend, and keeps track of the best configuration evaluated.
+
+    :param solver: inverse kinematics solver
+    :type solver: IKSolver
+    :param q: configuration of the active joints
+    :type q: numpy.ndarray
+    :param joints: mask of the revolute joints in the active joints
+    :type joints: numpy.ndarray
+    """
+    def __init__(self, solver, q, joints):
+        self.solver = solver
+        self.q = q.copy()
+        self.joints = joints
+        self.best_result = np.inf
+        self.best_q = self.q
+
+    def residuals(self, q):
+        """computes the orientation residuals and their jacobian with respect to the revolute joints
+
+        :param q: configuration of the revolute joints
+        :type q: numpy.ndarray
+        :return: residuals and residual jacobian
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+        """
+        conf = self.q.copy()
+        conf[self.joints] = q
+        residuals, jacobian = self.solver.residuals(conf)
+        residuals, jacobian = residuals[3:6], jacobian[3:6, self.joints]
+        error = residuals @ residuals
+        if error < self.best_result:
+            self.best_result = error
+            self.best_q = conf
+
+        return residuals, jacobian
 
 
 class IKSolver:
     """General inverse kinematics solver for serial robots. Inverse kinematics is framed as an optimization
-    problem and solved using randomized global optimizer with local optimization step to refine result.
+    problem and solved using randomized global optimizer with local optimization step to refine result. The
+    optimization is performed on a compiled kinematic chain so the links of the robot are not moved. The
+    optimization method is provided by a backend which can be selected for each solve.
 
     :param robot: robot used in the solver
     :type robot: PositioningStack
+    :param numerical_gradient: indicates the gradient should be computed by finite difference instead of
+                               the analytic jacobian
+    :type numerical_gradient: bool
     """
 
     @unique
@@ -469,8 +830,25 @@ class IKSolver:
         DeformedVectors = 4
         Failed = 5
 
-    def __init__(self, robot):
+    @unique
+    class Backend(Enum):
+        NLopt = 'nlopt'
+        MultiStartLocal = 'multistart'
+        DampedLeastSquares = 'dls'
+
+    backends = {Backend.NLopt: NloptBackend(), Backend.MultiStartLocal: MultiStartLocalBackend(),
+                Backend.DampedLeastSquares: DampedLeastSquaresBackend()}
+
+    decoupled_attempts = 10
+
+    def __init__(self, robot, numerical_gradient=False):
         self.robot = robot
+        self.numerical_gradient = numerical_gradient
+        self.evaluations = 0
+
+    def __getstate__(self):
+        # The optimizer and intermediate results of the last solve are not picklable and are rebuilt by solve
+        return {'robot': self.robot, 'numerical_gradient': self.numerical_gradient}
 
     def unbounds(self):
         """Returns unbounded limit for the robot
@@ -482,37 +860,23 @@ class IKSolver:
         return np.array([(-100000, 100000) if link.type == link.Type.Prismatic else (-2 * np.pi, 2 * np.pi)
                         for link in self.robot.links])
 
-    def __create_optimizer(self, n, tolerance, lower_bounds, upper_bounds, local_max_eval, global_max_eval):
-        """creates optimizer to find joint configuration that achieves specified tolerance, the number of joints could
-        be less than the number of joints in robot if some joints are locked. Since its not possible to change the
-        optimizer size after creation, re-creating the optimizer was the simplest way to accommodate locked joints
+    def randomConfiguration(self, rng, lower_bounds, upper_bounds):
+        """Returns a random configuration of the active joints within the joint bounds and the joint limits
+        i.e. the joint limits are used to sample joints that are unbounded
 
-        :param n: number of joints configuration
-        :type n: int
-        :param tolerance: stopping criterion for optimizer
-        :type tolerance: float
+        :param rng: random number generator
+        :type rng: numpy.random.RandomState
         :param lower_bounds: lower joint bounds
         :type lower_bounds: numpy.ndarray
         :param upper_bounds: upper joint bounds
         :type upper_bounds: numpy.ndarray
-        :param local_max_eval: number of evaluations for local optimization
-        :type local_max_eval: int
-        :param global_max_eval: number of evaluations for global optimization
-        :type global_max_eval: int
+        :return: random configuration
+        :rtype: numpy.ndarray
         """
-        nlopt.srand(10)
-        self.optimizer = nlopt.opt(nlopt.G_MLSL, n)
-        self.optimizer.set_lower_bounds(lower_bounds)
-        self.optimizer.set_upper_bounds(upper_bounds)
-        self.optimizer.set_min_objective(self.objective)
-        self.optimizer.set_stopval(tolerance)
-        self.optimizer.set_maxeval(global_max_eval)
-        self.optimizer.set_ftol_abs(1e-6)
-
-        opt = nlopt.opt(nlopt.LD_SLSQP, n)
-        opt.set_maxeval(local_max_eval)
-        opt.set_ftol_abs(1e-6)
-        self.optimizer.set_local_optimizer(opt)
+        limits = np.array([(link.lower_limit, link.upper_limit) for link in self.robot.links])[self.active_joints]
+        lower = np.maximum(lower_bounds, limits[:, 0])
+        upper = np.minimum(upper_bounds, limits[:, 1])
+        return rng.uniform(np.minimum(lower, upper), upper)
 
     def __gradient(self, q, epsilon, f0):
         """computes gradient of objective function at configuration q using finite difference
@@ -535,19 +899,47 @@ class IKSolver:
             ei[k] = 0.0
         return grad
 
-    def objective(self, q, gradient):
-        """optimization objective
+    def __residual_jacobian(self, conf, T, H):
+        """computes the jacobian of the position and orientation residuals from the jacobian of the robot. The
+        position residual jacobian is computed from the linear velocity of the current position and the
+        orientation residual jacobian from the angular velocity since the orientation residual is the angle
+        of the residual rotation. For a single vector, rotation about the vector does not change the residual
+        so the angular velocity is projected onto the plane normal to the target vector.
+
+        :param conf: joint configuration
+        :type conf: numpy.ndarray
+        :param T: forward kinematics transformation matrix of the robot
+        :type T: numpy.ndarray
+        :param H: forward kinematics transformation matrix of the robot including tool link
+        :type H: numpy.ndarray
+        :return: residual jacobian
+        :rtype: numpy.ndarray
+        """
+        jacobian = self.chain.jacobian(conf)[:, self.active_joints]
+        offset = H[0:3, 0:3] @ self.current_position + H[0:3, 3] - T[0:3, 3]
+        linear = jacobian[0:3] + np.cross(jacobian[3:6].transpose(), offset).transpose()
+        angular = jacobian[3:6]
+        if self.current_orientation.shape[0] == 1:
+            v = self.target_orientation[0] / np.linalg.norm(self.target_orientation[0])
+            angular = angular - np.outer(v, v @ angular)
+
+        return -np.vstack((linear, math.degrees(1) * angular))
+
+    def __evaluate(self, q):
+        """computes the position and orientation residuals of joint configuration candidate and keeps track
+        of the best configuration
 
         :param q: joint configuration candidate
         :type q: numpy.ndarray
-        :param gradient: gradient
-        :type gradient: numpy.ndarray
-        :return: objective error
-        :rtype: float
+        :return: joint configuration, transformation matrix of the robot without and with tool link,
+                 residuals and objective error
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, float]
         """
+        self.evaluations += 1
         conf = self.start.copy()
         conf[self.active_joints] = q
-        H = self.robot.fkine(conf) @ self.robot.tool_link
+        T = self.chain.pose(conf)
+        H = T @ self.chain.tool_link
 
         residuals = np.zeros(6)
         residuals[0:3] = self.target_position - (H[0:3, 0:3] @ self.current_position + H[0:3, 3])
@@ -555,7 +947,14 @@ class IKSolver:
         if self.current_orientation.shape[0] == 1:
             v1 = H[0:3, 0:3] @ self.current_orientation[0]
             v2 = self.target_orientation[0]
-            angle, axis = angle_axis_btw_vectors(v1, v2)
+            axis = np.cross(v1, v2)
+            sine = np.linalg.norm(axis)
+            if sine > VECTOR_EPS ** 2:
+                # The axis is computed directly because angle_axis_btw_vectors returns an arbitrary axis for nearly
+                # parallel vectors which gives the wrong gradient close to the solution
+                angle, axis = math.atan2(sine, np.dot(v1, v2)), axis / sine
+            else:
+                angle, axis = angle_axis_btw_vectors(v1, v2)
         else:
             v1 = np.append(self.current_orientation @ H[0:3, 0:3].transpose(), [0., 0., 0.]).reshape(-1, 3)
             v2 = np.append(self.target_orientation, [0., 0., 0.]).reshape(-1, 3)
@@ -568,14 +967,48 @@ class IKSolver:
             self.best_result = error
             self.best_conf = conf
 
+        return conf, T, H, residuals, error
+
+    def residuals(self, q):
+        """computes the position and orientation residuals and their jacobian for least squares backends
+
+        :param q: joint configuration candidate
+        :type q: numpy.ndarray
+        :return: residuals and residual jacobian
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+        """
+        conf, T, H, residuals, _ = self.__evaluate(q)
+        return residuals, self.__residual_jacobian(conf, T, H)
+
+    def objective(self, q, gradient):
+        """optimization objective
+
+        :param q: joint configuration candidate
+        :type q: numpy.ndarray
+        :param gradient: gradient
+        :type gradient: numpy.ndarray
+        :return: objective error
+        :rtype: float
+        """
+        conf, T, H, residuals, error = self.__evaluate(q)
+
         if gradient.size > 0:
-            gradient[:] = self.__gradient(q, 1e-6, error)
+            if self.numerical_gradient:
+                gradient[:] = self.__gradient(q, 1e-6, error)
+            else:
+                gradient[:] = 2 * residuals @ self.__residual_jacobian(conf, T, H)
 
         return error
 
     def solve(self, current_pose, target_pose, start=None, tol=(1e-2, 1.0), bounded=True, local_max_eval=1000,
-              global_max_eval=100):
-        """finds the configuration that moves current pose to target pose within specified tolerance.
+              global_max_eval=100, seed=None, backend=Backend.NLopt.value, decoupled=False, reachability_map=None):
+        """finds the configuration that moves current pose to target pose within specified tolerance. When a seed
+        configuration is given, a local optimization is started from the seed and the global optimization is only
+        performed if the local optimization does not converge. When decoupled is True, the orientation and position
+        are first solved separately (see decoupledSolve) and the optimization is only performed if that fails. When
+        a reachability map is given, a pose that is not in the map is reported as unreachable without optimization
+        (if the joint limits are used), otherwise the configuration of the nearest sample in the map is used as
+        the seed if no seed is given.
 
         :param current_pose: current position and vector orientation
         :type current_pose: Tuple[numpy.ndarray, numpy.ndarray]
@@ -591,10 +1024,20 @@ class IKSolver:
         :type local_max_eval: int
         :param global_max_eval: number of evaluations for global optimization
         :type global_max_eval: int
+        :param seed: starting joint configuration for local optimization
+        :type seed: Union[None, numpy.ndarray]
+        :param backend: name of the optimization backend
+        :type backend: str
+        :param decoupled: indicates the orientation and position should be solved separately when possible
+        :type decoupled: bool
+        :param reachability_map: sampled map of the reachable poses of the robot
+        :type reachability_map: Union[ReachabilityMap, None]
         :return: result from the inverse kinematics optimization
         :rtype: IKResult
         """
         self.status = IKSolver.Status.NotConverged
+        self.evaluations = 0
+        self.backend = self.backends[IKSolver.Backend(backend)]
 
         self.tolerance = tol
         stop_eval_tol = min(tol) ** 2
@@ -605,6 +1048,7 @@ class IKSolver:
         self.best_result = np.inf
 
         self.start = self.best_conf if start is None else start
+        self.chain = self.robot.compile()
         self.active_joints = [not link.locked for link in self.robot.links]
         q0 = self.start[self.active_joints]
 
@@ -616,18 +1060,47 @@ class IKSolver:
             real_bounds = np.array([(link.lower_limit, link.upper_limit) for link in self.robot.links])
             bounds[active_limits] = real_bounds[active_limits]
 
-        lower_bounds, upper_bounds = list(zip(*bounds[self.active_joints]))
+        lower_bounds, upper_bounds = np.array(bounds[self.active_joints]).transpose()
 
         q0 = np.clip(q0, lower_bounds, upper_bounds)  # ensure starting config is bounded avoids crash
 
-        try:
-            self.__create_optimizer(q0.size, stop_eval_tol, lower_bounds, upper_bounds, local_max_eval, global_max_eval)
-            self.optimizer.optimize(q0)
-        except nlopt.RoundoffLimited:
-            logging.exception("Roundoff Error occurred during inverse kinematics")
-        except RuntimeError:
-            self.status = IKSolver.Status.Failed
-            logging.exception("Unknown runtime error occurred during inverse kinematics")
+        if reachability_map is not None:
+            reachable, configuration = reachability_map.query(current_pose, target_pose)
+            if not reachable and bounded and not any(link.ignore_limits for link in self.robot.links):
+                self.status = IKSolver.Status.Unreachable
+                return IKResult(self.best_conf, self.status, *self.computeResidualError(), self.evaluations)
+            if seed is None:
+                seed = configuration
+
+        q_seed = q0 if seed is None else np.clip(np.array(seed, dtype=float)[self.active_joints], lower_bounds,
+                                                 upper_bounds)
+        solved = False
+        if decoupled:
+            solved = self.decoupledSolve(q_seed, lower_bounds, upper_bounds, local_max_eval)
+
+        # The decoupled solve and warm started optimization share the local evaluation budget
+        remaining_eval = local_max_eval - self.evaluations
+        if seed is not None and not solved and remaining_eval > 0:
+            try:
+                self.backend.refine(self, q_seed, lower_bounds, upper_bounds, stop_eval_tol, remaining_eval)
+            except nlopt.RoundoffLimited:
+                logging.exception("Roundoff Error occurred during warm started inverse kinematics")
+            except RuntimeError:
+                logging.exception("Unknown runtime error occurred during warm started inverse kinematics")
+
+            if np.isfinite(self.best_conf).all():
+                _, _, position_error_good, orient_error_good = self.computeResidualError()
+                solved = position_error_good and orient_error_good
+
+        if not solved:
+            try:
+                self.backend.search(self, q0, lower_bounds, upper_bounds, stop_eval_tol, local_max_eval,
+                                    global_max_eval)
+            except nlopt.RoundoffLimited:
+                logging.exception("Roundoff Error occurred during inverse kinematics")
+            except RuntimeError:
+                self.status = IKSolver.Status.Failed
+                logging.exception("Unknown runtime error occurred during inverse kinematics")
 
         best_conf = self.best_conf
         residual_error = self.computeResidualError()
@@ -649,11 +1122,74 @@ class IKSolver:
             else:
                 self.status = IKSolver.Status.NotConverged
 
-        return IKResult(best_conf, self.status, *residual_error)
+        return IKResult(best_conf, self.status, *residual_error, self.evaluations)
+
+    def decoupledSolve(self, q0, lower_bounds, upper_bounds, max_eval):
+        """Solves the inverse kinematics by exploiting the structure of positioning stacks with prismatic joints
+        for position and revolute joints for orientation. The orientation of the end effector only depends on the
+        revolute joints, and for a fixed orientation the position is linear in the prismatic joints. The
+        orientation residuals are minimized over the revolute joints with the damped least squares method, then the
+        prismatic joints are computed by linear least squares. This is repeated from random configurations of the
+        revolute joints if the prismatic joints are outside the bounds until the evaluation budget is exhausted.
+        The structure does not apply if the prismatic joints cannot move the end effector in three independent
+        directions.
+
+        :param q0: starting configuration of the active joints
+        :type q0: numpy.ndarray
+        :param lower_bounds: lower joint bounds
+        :type lower_bounds: numpy.ndarray
+        :param upper_bounds: upper joint bounds
+        :type upper_bounds: numpy.ndarray
+        :param max_eval: number of evaluations for all the attempts
+        :type max_eval: int
+        :return: indicates if the position and orientation converged
+        :rtype: bool
+        """
+        revolute = self.chain.revolute[self.active_joints]
+        prismatic = ~revolute
+        if np.count_nonzero(prismatic) < 3:
+            return False
+
+        backend = self.backends[IKSolver.Backend.DampedLeastSquares]
+        rng = np.random.RandomState(backend.seed)
+        stop_eval_tol = self.tolerance[1] ** 2
+        start = self.evaluations
+        q = q0
+        for _ in range(self.decoupled_attempts):
+            remaining = max_eval - (self.evaluations - start)
+            if remaining <= 0:
+                break
+
+            if revolute.any():
+                problem = OrientationSubproblem(self, q, revolute)
+                backend.refine(problem, q[revolute], lower_bounds[revolute], upper_bounds[revolute], stop_eval_tol,
+                               remaining)
+                q = problem.best_q
+                if problem.best_result > stop_eval_tol:
+                    q = self.randomConfiguration(rng, lower_bounds, upper_bounds)
+                    continue
+
+            residuals, jacobian = self.residuals(q)
+            step, _, rank, _ = np.linalg.lstsq(jacobian[0:3, prismatic], -residuals[0:3], rcond=None)
+            if rank < 3:
+                return False
+
+            q = q.copy()
+            q[prismatic] += step
+            if np.all(q >= lower_bounds) and np.all(q <= upper_bounds):
+                self.residuals(q)
+                _, _, position_error_good, orient_error_good = self.computeResidualError()
+                if position_error_good and orient_error_good:
+                    return True
+
+            q = self.randomConfiguration(rng, lower_bounds, upper_bounds)
+
+        return False
 
     def jointLimitCheck(self, q0, stop_eval_tol, local_max_eval, global_max_eval):
         """Checks if the simulation fails because of joint limits. This runs the simulation without
-        joint limits to check if non convergence is because of joint limits
+        joint limits to check if non convergence is because of joint limits. A local optimization from the
+        starting configuration is tried first and the global optimization is only performed if it fails.
 
         :param q0: starting configuration
         :type q0: numpy.ndarray
@@ -667,10 +1203,20 @@ class IKSolver:
         :rtype: bool
         """
         bounds = self.unbounds()
-        lower_bounds, upper_bounds = list(zip(*bounds[self.active_joints]))
+        lower_bounds, upper_bounds = np.array(bounds[self.active_joints]).transpose()
+        try:
+            self.backend.refine(self, q0, lower_bounds, upper_bounds, stop_eval_tol, local_max_eval)
+        except nlopt.RoundoffLimited:
+            logging.exception("Roundoff Error occurred during checkJointLimit")
+        except RuntimeError:
+            logging.exception("Unknown runtime error occurred during checkJointLimit")
+
+        residual_error = self.computeResidualError()
+        if residual_error[2] and residual_error[3]:
+            return True
+
         try:
-            self.__create_optimizer(q0.size, stop_eval_tol, lower_bounds, upper_bounds, local_max_eval, global_max_eval)
-            self.optimizer.optimize(q0)
+            self.backend.search(self, q0, lower_bounds, upper_bounds, stop_eval_tol, local_max_eval, global_max_eval)
         except nlopt.RoundoffLimited:
             logging.exception("Roundoff Error occurred during checkJointLimit")
         except RuntimeError:
@@ -724,7 +1270,7 @@ class IKSolver:
         :return: 3D position and orientation error and flags indicating convergence
         :rtype: Tuple[numpy.ndarray, numpy.ndarray, bool, bool]
         """
-        H = self.robot.fkine(self.best_conf) @ self.robot.tool_link
+        H = self.chain.pose(self.best_conf) @ self.chain.tool_link
         position_error = self.target_position - (H[0:3, 0:3] @ self.current_position + H[0:3, 3])
         position_error_good = False if trunc(np.linalg.norm(position_error), 3) > self.tolerance[0] else True
 
@@ -1,19 +1,111 @@
+from contextlib import suppress
+import copy
+import hashlib
 import logging
+import math
+import os
+import pathlib
+import pickle
 import time
 import numpy as np
-from multiprocessing import Event, Process, Queue, sharedctypes
-from PyQt5 import QtCore
-from .collision import CollisionManager
-from .robotics import IKSolver
+from multiprocessing import Event, Process, Queue, Value, sharedctypes
+from .collision import CollisionManager, MeshCache
+from .reachability import ReachabilityMap
+from .robotics import IKSolver, IKResult, joint_space_trajectory
 from ..geometry.intersection import path_length_calculation
 from ..math import VECTOR_EPS
 from ..scene.entity import InstrumentEntity
-from ..util.misc import Attributes
-from ...config import settings, setup_logging
+from ..util.misc import Attributes, Signal
+from ...config import settings, setup_logging, CHECKPOINT_PATH, MESH_CACHE_PATH, REACHABILITY_PATH
+
+CHUNK_SIZE = 10
+# Multiples of the evaluation budgets used by the adaptive budget. Every measurement is first solved with the
+# configured budgets and the measurements that do not converge are solved again with the larger budgets
+BUDGET_SCALES = (1, 4)
+ESCALATED_STATUS = (IKSolver.Status.NotConverged, IKSolver.Status.HardwareLimit)
+SKIP_NOTES = ('The measurement point is disabled', 'The measurement vector is unset')
+# Note of a measurement that was not solved again with the larger budgets because the time budget was exceeded.
+# The result depends on the time taken by the simulation so it is never reused
+TIME_BUDGET_NOTE = 'The time budget was exceeded before the measurement was solved with a larger budget'
+# Number of initial samples on the path between consecutive measurements, and the largest distance (mm) a
+# collider can move between samples that are tested for collision when checking the path
+PATH_STEPS = 10
+PATH_RESOLUTION = 1.0
+
+
+def simulation_order(shape, align_first_order):
+    """Returns the order in which the measurement points and alignments are simulated
+
+    :param shape: number of points, detectors, and alignments
+    :type shape: Tuple[int, int, int]
+    :param align_first_order: indicates all alignments of a point are simulated before the next point
+    :type align_first_order: bool
+    :return: point and alignment index pairs in simulation order
+    :rtype: List[Tuple[int, int]]
+    """
+    if align_first_order:
+        return [(i, j) for i in range(shape[0]) for j in range(shape[2])]
+
+    return [(i, j) for j in range(shape[2]) for i in range(shape[0])]
+
+
+def result_label(index, point_index, alignment_index, alignment_count):
+    """Returns the label of a simulation result
+
+    :param index: index of result in simulation order
+    :type index: int
+    :param point_index: index of measurement point
+    :type point_index: int
+    :param alignment_index: index of alignment
+    :type alignment_index: int
+    :param alignment_count: number of alignments
+    :type alignment_count: int
+    :return: result label
+    :rtype: str
+    """
+    if alignment_count > 1:
+        return f'# {index + 1} - Point {point_index + 1}, Alignment {alignment_index + 1}'
+
+    return f'Point {point_index + 1}'
+
+
+def render_script(template, results, filename='', mu_amps='0.000', limit=None):
+    """Renders the instrument script for the valid simulation results from the script template
+
+    :param template: instrument script template
+    :type template: Script
+    :param results: simulation results
+    :type results: SimulationResultSet
+    :param filename: name of the project file
+    :type filename: str
+    :param mu_amps: duration of measurements in microamps
+    :type mu_amps: str
+    :param limit: maximum number of results to include in the script
+    :type limit: Union[int, None]
+    :return: instrument script
+    :rtype: str
+    """
+    key = template.Key
+    formatted = results.formatted[results.valid][:limit]
+    script = [{key.position.value: '\t'.join('{:.3f}'.format(value) for value in offsets)} for offsets in formatted]
+
+    header = '\t'.join(template.header_order).replace(key.position.value, '\t'.join(results.joint_labels), 1)
+    values = {key.script.value: script,
+              key.position.value: '',
+              key.filename.value: filename,
+              key.mu_amps.value: mu_amps,
+              key.count.value: len(script),
+              key.header.value: header}
+
+    for name in template.keys:
+        template.keys[name] = values[name]
+
+    return template.render()
 
 
 def update_colliders(manager, sample_pose, sample_ids, positioner_poses, positioner_ids):
-    """Updates the sample and positioner colliders
+    """Updates the sample and positioner colliders. Only the colliders whose pose changed are transformed
+    and have their bounding boxes updated
 
     :param manager: collision manager
     :type manager: CollisionManager
@@ -26,18 +118,189 @@ def update_colliders(manager, sample_pose, sample_ids, positioner_poses, positio
     :param positioner_ids: list of positioner ids
     :type positioner_ids: List[int]
     """
-    for i in sample_ids:
-        manager.colliders[i].geometry.transform(sample_pose)
+    manager.moveColliders(sample_ids, [sample_pose] * len(sample_ids))
+    manager.moveColliders(positioner_ids, positioner_poses)
 
-    for i, pose in zip(positioner_ids, positioner_poses):
-        manager.colliders[i].geometry.transform(pose)
 
-    manager.createAABBSets()
+def sample_clearance(manager, sample_ids, collision_mask=None):
+    """Computes the minimum distance between the sample and the instrument colliders it can collide with.
+    The clearance is zero if the sample collides
 
+    :param manager: collision manager
+    :type manager: CollisionManager
+    :param sample_ids: list of sample collider ids
+    :type sample_ids: List[int]
+    :param collision_mask: mask showing which objects collided
+    :type collision_mask: Union[List[bool], None]
+    :return: clearance or None if the sample cannot collide with the instrument
+    :rtype: Union[float, None]
+    """
+    if collision_mask is not None and any(collision_mask[index] for index in sample_ids):
+        return 0.0
+
+    clearance = manager.minimumClearance(sample_ids)
+
+    return None if clearance is None else clearance.distance
+
+
+def path_length_bound(points, origins, revolute, delta):
+    """Computes an upper bound of the distance travelled by the points when the joints that move them move
+    linearly. A revolute joint moves a point at most by the turned angle times the distance of the point from
+    the joint origin, and that distance changes at most by the distance the later joints move the point, so
+    the bound is computed from the last joint to the first.
+
+    :param points: 3 x N array of points at the start of the motion
+    :type points: numpy.ndarray
+    :param origins: M x 3 array of the origins of the joints that move the points at the start of the motion
+    :type origins: numpy.ndarray
+    :param revolute: flags indicating which joints are revolute
+    :type revolute: numpy.ndarray
+    :param delta: change of each joint offset
+    :type delta: numpy.ndarray
+    :return: upper bound of the distance travelled by any of the points
+    :rtype: float
+    """
+    distance = 0.0
+    for origin, is_revolute, change in zip(origins[::-1], revolute[::-1], np.abs(delta[::-1])):
+        if change == 0.0:
+            continue
+
+        if is_revolute:
+            radius = np.linalg.norm(points - origin[:, None], axis=0).max() + distance
+            distance += change * radius
+        else:
+            distance += change
 
-def populate_collision_manager(manager, sample, instrument_node):
+    return distance
+
+
+def find_path_collision(manager, chain, alignment, start_q, stop_q, sample_ids, positioner_ids):
+    """Finds the first contact on the path of the positioner between two joint configurations. The path is
+    the path of the joint space trajectory i.e. the joints move linearly from the start to the stop
+    configuration. The path is divided at the samples of the trajectory, and the intervals are checked in
+    order. An interval is skipped if the boxes swept by the sample and positioner colliders do not intersect
+    another collider, otherwise it is halved until the colliders move less than PATH_RESOLUTION in the interval
+    and the pose at the end of the interval is tested for collision. The distance moved by the colliders is
+    bounded from the joint motion (see ``path_length_bound``) so the swept boxes contain the colliders for
+    any combination of rotations and translations. The search stops at the first contact
+
+    :param manager: collision manager
+    :type manager: CollisionManager
+    :param chain: compiled positioning stack
+    :type chain: KinematicChain
+    :param alignment: alignment matrix of the sample
+    :type alignment: numpy.ndarray
+    :param start_q: joint configuration at the start of the path
+    :type start_q: numpy.ndarray
+    :param stop_q: joint configuration at the end of the path
+    :type stop_q: numpy.ndarray
+    :param sample_ids: list of sample collider ids
+    :type sample_ids: List[int]
+    :param positioner_ids: list of positioner ids
+    :type positioner_ids: List[int]
+    :return: fraction of the path at the first contact or None if no contact is found
+    :rtype: Union[float, None]
+    """
+    start_q = np.asarray(start_q, dtype=float)
+    delta = np.asarray(stop_q, dtype=float) - start_q
+    delta[chain.locked] = 0.0
+    if not np.any(delta):
+        return None
+
+    ids = list(sample_ids) + list(positioner_ids)
+    link_counts = [chain.numberOfLinks] * len(sample_ids) + chain.modelLinkCounts()
+    corners = [manager.colliders[i].corners for i in ids]
+
+    def transforms(fraction):
+        q = start_q + fraction * delta
+        pose = chain.pose(q) @ chain.tool_link @ alignment
+        return [pose] * len(sample_ids) + chain.modelTransforms(q), chain.jointOrigins(q)
+
+    fractions = joint_space_trajectory([0.0], [1.0], PATH_STEPS)[:, 0]
+    intervals = list(zip(fractions[-2::-1], fractions[:0:-1]))
+
+    poses = {}
+    while intervals:
+        start, stop = intervals.pop()
+        for fraction in (start, stop):
+            if fraction not in poses:
+                poses[fraction] = transforms(fraction)
+
+        matrices, origins = poses[start]
+        step = (stop - start) * delta
+        distances = [path_length_bound(matrix[0:3, 0:3] @ points + matrix[0:3, 3:4], origins[:count],
+                                       chain.revolute[:count], step[:count])
+                     for matrix, points, count in zip(matrices, corners, link_counts)]
+
+        if not manager.sweep(ids, matrices, poses[stop][0], distances):
+            continue
+
+        if max(distances) > PATH_RESOLUTION:
+            middle = (start + stop) / 2
+            intervals.extend([(middle, stop), (start, middle)])
+            continue
+
+        matrices = poses[stop][0]
+        update_colliders(manager, matrices[0], sample_ids, matrices[len(sample_ids):], positioner_ids)
+        if any(manager.collide(first_hit=True)):
+            return float(stop)
+
+    return None
+
+
+def is_reusable(result):
+    """Indicates if the result can be reused by a later simulation with the same inputs i.e. the result
+    is skipped or the measurement was solved without a runtime error or being cut short by the time budget
+
+    :param result: simulation result
+    :type result: SimulationResult
+    :return: indicates the result can be reused
+    :rtype: bool
+    """
+    if result.skipped:
+        return True
+
+    return result.ik.status != IKSolver.Status.Failed and result.note != TIME_BUDGET_NOTE
+
+
+def compute_digest(*arrays):
+    """Computes a digest of the contents of the given arrays which is used to check if the arguments
+    held by a simulation worker are still valid
+
+    :param arrays: arrays to hash
+    :type arrays: numpy.ndarray
+    :return: hex digest
+    :rtype: str
+    """
+    digest = hashlib.md5()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype, array.shape)).encode())
+        digest.update(array.data)
+
+    return digest.hexdigest()
+
+
+def compute_positioner_digest(positioner):
+    """Computes a digest of the kinematics, limits and locks of the positioner. Unlike the digest of
+    the pickled positioner, the digest does not depend on the current offsets of the unlocked joints
+
+    :param positioner: positioner
+    :type positioner: Union[PositioningStack, SerialManipulator]
+    :return: hex digest
+    :rtype: str
+    """
+    chain = positioner.compile()
+    limits = np.array([(link.lower_limit, link.upper_limit, link.ignore_limits) for link in positioner.links])
+
+    return compute_digest(chain.revolute, chain.locked, chain.offsets[chain.locked], chain.axes, chain.homes,
+                          chain.tool, chain.tool_link, *[segment[0] for segment in chain.segments], limits,
+                          np.array(positioner.order))
+
+
+def populate_collision_manager(manager, sample, instrument_node, decimation=None, cache=None):
     """Adds sample and instrument scene colliders to the collision manager and builds
-    scene bounding boxes
+    scene bounding boxes. The decimation target and mesh cache are only used for the instrument colliders
 
     :param manager: collision manager
     :type manager: CollisionManager
@@ -45,6 +308,10 @@ def populate_collision_manager(manager, sample, instrument_node):
     :type sample: List[Mesh]
     :param instrument_node: instrument node and ids
     :type instrument_node: Dict[str, List[Node]]
+    :param decimation: maximum number of triangles in each instrument collider. Uses default if None
+    :type decimation: Union[int, None]
+    :param cache: cache of decimated instrument geometry
+    :type cache: Union[MeshCache, None]
     :return: sample and positioner collider ids
     :rtype: Tuple[List[int], List[int]]
     """
@@ -58,7 +325,8 @@ def populate_collision_manager(manager, sample, instrument_node):
         transform = [n.transform for n in attribute_node]
         if name == Attributes.Positioner.value:
             start_id = manager.colliders[-1].id + 1
-            manager.addColliders(attribute_node, transform, exclude=manager.Exclude.Consecutive, movable=True)
+            manager.addColliders(attribute_node, transform, exclude=manager.Exclude.Consecutive, movable=True,
+                                 decimation=decimation, cache=cache)
             last_link_collider = manager.colliders[-1]
             for index, obj in enumerate(manager.colliders[0:len(sample)]):
                 obj.excludes[last_link_collider.id] = True
@@ -67,7 +335,8 @@ def populate_collision_manager(manager, sample, instrument_node):
             positioner_ids.extend(range(start_id, last_link_collider.id + 1))
         else:
             exclude = manager.Exclude.Nothing if name == Attributes.Fixture.value else manager.Exclude.Consecutive
-            manager.addColliders(attribute_node, transform, exclude=exclude, movable=False)
+            manager.addColliders(attribute_node, transform, exclude=exclude, movable=False, decimation=decimation,
+                                 cache=cache)
 
     manager.createAABBSets()
 
@@ -93,9 +362,16 @@ class SimulationResult:
     :type skipped: bool
     :param note: note about result such as reason for skipping
     :type note: str
+    :param reused: indicates if the result is reused from a previous simulation
+    :type reused: bool
+    :param path_collision: fraction of the path from the previous measurement at the first contact
+    :type path_collision: Union[float, None]
+    :param clearance: minimum distance between the sample and the instrument
+    :type clearance: Union[float, None]
     """
     def __init__(self, result_id, ik=None, q_formatted=(None, None),
-                 alignment=0, path_length=None, collision_mask=None, skipped=False, note=''):
+                 alignment=0, path_length=None, collision_mask=None, skipped=False, note='', reused=False,
+                 path_collision=None, clearance=None):
 
         self.id = result_id
         self.ik = ik
@@ -105,12 +381,801 @@ class SimulationResult:
         self.collision_mask = collision_mask
         self.skipped = skipped
         self.note = note
+        self.reused = reused
+        self.path_collision = path_collision
+        self.clearance = clearance
+
+
+class SimulationResultSet:
+    """Columnar store for simulation results backed by a structured numpy array. The results can be
+    accessed individually as SimulationResult objects or as column views (e.g. status, formatted joint
+    offsets, path lengths) which support vectorised queries over all the results.
+
+    :param joint_labels: names of the positioner joints
+    :type joint_labels: List[str]
+    :param detector_count: number of detectors i.e. path lengths per result
+    :type detector_count: int
+    :param collider_count: number of colliders i.e. length of collision mask
+    :type collider_count: int
+    :param capacity: initial number of rows
+    :type capacity: int
+    """
+    SKIPPED = -1
+
+    def __init__(self, joint_labels, detector_count=0, collider_count=0, capacity=16):
+        self.joint_labels = list(joint_labels)
+        joint_count = len(self.joint_labels)
+        self.dtype = np.dtype([('id', object), ('note', object), ('alignment', np.int32), ('status', np.int8),
+                               ('q', np.float64, (joint_count,)), ('formatted', np.float64, (joint_count,)),
+                               ('position_error', np.float64, (3,)), ('orientation_error', np.float64, (3,)),
+                               ('position_converged', bool), ('orientation_converged', bool),
+                               ('path_length', np.float64, (detector_count,)), ('has_path_length', bool),
+                               ('collision_mask', bool, (collider_count,)), ('has_collision_mask', bool),
+                               ('path_collision', np.float64), ('has_path_collision', bool),
+                               ('clearance', np.float64), ('has_clearance', bool),
+                               ('reused', bool), ('evaluations', np.int32)])
+        self._data = np.zeros(max(capacity, 1), self.dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self[index]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('result index out of range')
+
+        row = self._data[index]
+        if row['status'] == self.SKIPPED:
+            return SimulationResult(row['id'], alignment=int(row['alignment']), skipped=True, note=row['note'],
+                                    reused=bool(row['reused']))
+
+        ik = IKResult(row['q'].copy(), IKSolver.Status(int(row['status'])), row['position_error'].copy(),
+                      row['orientation_error'].copy(), bool(row['position_converged']),
+                      bool(row['orientation_converged']), int(row['evaluations']))
+        path_length = tuple(row['path_length']) if row['has_path_length'] else None
+        collision_mask = row['collision_mask'].tolist() if row['has_collision_mask'] else None
+        path_collision = float(row['path_collision']) if row['has_path_collision'] else None
+        clearance = float(row['clearance']) if row['has_clearance'] else None
+
+        return SimulationResult(row['id'], ik, (self.joint_labels, row['formatted'].copy()),
+                                int(row['alignment']), path_length, collision_mask, note=row['note'],
+                                reused=bool(row['reused']), path_collision=path_collision, clearance=clearance)
+
+    @property
+    def data(self):
+        """Gets the structured array of the results
+
+        :return: results
+        :rtype: numpy.ndarray
+        """
+        return self._data[:self._size]
+
+    @property
+    def skipped(self):
+        """Gets the flags indicating the skipped results
+
+        :return: skipped flags
+        :rtype: numpy.ndarray[bool]
+        """
+        return self.data['status'] == self.SKIPPED
+
+    @property
+    def valid(self):
+        """Gets the flags indicating results that are not skipped and did not fail
+
+        :return: valid flags
+        :rtype: numpy.ndarray[bool]
+        """
+        status = self.data['status']
+        return (status != self.SKIPPED) & (status != IKSolver.Status.Failed.value)
+
+    @property
+    def formatted(self):
+        """Gets the positioner offsets of the results in user format
+
+        :return: formatted joint offsets
+        :rtype: numpy.ndarray
+        """
+        return self.data['formatted']
+
+    def append(self, result):
+        """Adds the result to the end of the result set
+
+        :param result: simulation result
+        :type result: SimulationResult
+        """
+        if self._size == self._data.shape[0]:
+            data = np.zeros(2 * self._size, self.dtype)
+            data[:self._size] = self._data
+            self._data = data
+
+        row = self._data[self._size]
+        row['id'] = result.id
+        row['note'] = result.note
+        row['alignment'] = result.alignment
+        row['reused'] = result.reused
+        if result.skipped:
+            row['status'] = self.SKIPPED
+        else:
+            ik = result.ik
+            row['status'] = ik.status.value
+            row['q'] = ik.q
+            row['formatted'] = result.formatted
+            row['position_error'] = ik.position_error
+            row['orientation_error'] = ik.orientation_error
+            row['position_converged'] = ik.position_converged
+            row['orientation_converged'] = ik.orientation_converged
+            row['evaluations'] = ik.evaluations
+            row['has_path_length'] = result.path_length is not None
+            if result.path_length is not None:
+                row['path_length'] = result.path_length
+            row['has_collision_mask'] = result.collision_mask is not None
+            if result.collision_mask is not None:
+                row['collision_mask'] = result.collision_mask
+            row['has_path_collision'] = result.path_collision is not None
+            if result.path_collision is not None:
+                row['path_collision'] = result.path_collision
+            row['has_clearance'] = result.clearance is not None
+            if result.clearance is not None:
+                row['clearance'] = result.clearance
+
+        self._size += 1
+
+    def extend(self, results):
+        """Adds the results to the end of the result set
+
+        :param results: simulation results
+        :type results: Iterable[SimulationResult]
+        """
+        for result in results:
+            self.append(result)
+
+    def load(self, columns):
+        """Replaces the results with the given columns e.g. results read from file
+
+        :param columns: result columns keyed by field name
+        :type columns: Dict[str, Union[numpy.ndarray, List]]
+        """
+        size = len(columns['status'])
+        self._data = np.zeros(max(size, 1), self.dtype)
+        for key, value in columns.items():
+            self._data[key][:size] = value
+        self._size = size
+
+    def clear(self):
+        """Removes all the results"""
+        self._data[:self._size] = np.zeros(1, self.dtype)
+        self._size = 0
+
+    def query(self, status=None, skipped=None, collision=None, max_position_error=None, max_orientation_error=None,
+              alignment=None, path_length_range=None, max_clearance=None):
+        """Finds the results that meet all the given criteria. The error, collision, path length and
+        clearance criteria are never met by skipped results. A result has a collision if the colliders
+        collide at the final pose or on the path from the previous measurement
+
+        :param status: solver status or statuses to match
+        :type status: Union[IKSolver.Status, List[IKSolver.Status], None]
+        :param skipped: indicates if skipped or unskipped results are matched
+        :type skipped: Union[bool, None]
+        :param collision: indicates if results with or without a collision are matched
+        :type collision: Union[bool, None]
+        :param max_position_error: maximum norm of the position error
+        :type max_position_error: Union[float, None]
+        :param max_orientation_error: maximum norm of the orientation error
+        :type max_orientation_error: Union[float, None]
+        :param alignment: alignment index or indices to match
+        :type alignment: Union[int, List[int], None]
+        :param path_length_range: minimum and maximum path length for all detectors
+        :type path_length_range: Union[Tuple[float, float], None]
+        :param max_clearance: clearance below which results are matched e.g. a safety margin
+        :type max_clearance: Union[float, None]
+        :return: indices of matching results
+        :rtype: numpy.ndarray
+        """
+        data = self.data
+        unskipped = ~self.skipped
+        mask = np.ones(len(data), bool)
+        if status is not None:
+            status = [status] if isinstance(status, IKSolver.Status) else status
+            mask &= np.isin(data['status'], [s.value for s in status])
+        if skipped is not None:
+            mask &= ~unskipped if skipped else unskipped
+        if collision is not None:
+            collided = data['has_collision_mask'] & np.any(data['collision_mask'], axis=1)
+            collided |= data['has_path_collision']
+            mask &= unskipped & data['has_collision_mask'] & (collided == collision)
+        if max_position_error is not None:
+            mask &= unskipped & (np.linalg.norm(data['position_error'], axis=1) <= max_position_error)
+        if max_orientation_error is not None:
+            mask &= unskipped & (np.linalg.norm(data['orientation_error'], axis=1) <= max_orientation_error)
+        if alignment is not None:
+            mask &= np.isin(data['alignment'], alignment)
+        if path_length_range is not None:
+            lower, upper = path_length_range
+            path_length = data['path_length']
+            mask &= unskipped & data['has_path_length'] & np.all((path_length >= lower) & (path_length <= upper),
+                                                                  axis=1)
+        if max_clearance is not None:
+            mask &= unskipped & data['has_clearance'] & (data['clearance'] < max_clearance)
+
+        return np.flatnonzero(mask)
+
+    def pathLengths(self, shape, order):
+        """Gets the path lengths arranged by measurement point, detector, and alignment. Path lengths of
+        skipped results or results without path lengths are zero
+
+        :param shape: number of points, detectors, and alignments
+        :type shape: Tuple[int, int, int]
+        :param order: point and alignment index pairs in simulation order
+        :type order: List[Tuple[int, int]]
+        :return: path lengths
+        :rtype: numpy.ndarray
+        """
+        path_lengths = np.zeros(shape, np.float32)
+        data = self.data
+        index = np.flatnonzero(data['has_path_length'] & (data['status'] != self.SKIPPED))
+        if index.size:
+            point_index, alignment_index = np.array(order)[index].T
+            path_lengths[point_index, :, alignment_index] = data['path_length'][index]
+
+        return path_lengths
+
+
+class ResultBuffer:
+    """Shared memory buffer for simulation results. The results are stored in columns (joint offsets, status,
+    errors, path lengths, collision masks etc.) so the worker processes can write a result without pickling
+    and the main process can read new rows without deserializing. A row is complete when its done flag is set
+    to the id of the job that computed it, the flag is written last so a complete row is never partially read.
+    The buffer must be created before the worker processes are started because the shared arrays are
+    inherited by the workers, the layout of the columns is set for each simulation.
+
+    :param ints: capacity of the integer array
+    :type ints: int
+    :param bytes_: capacity of the byte array
+    :type bytes_: int
+    :param floats: capacity of the float array
+    :type floats: int
+    """
+    def __init__(self, ints=0, bytes_=0, floats=0):
+        self.capacity = (ints, bytes_, floats)
+        self._ints = sharedctypes.RawArray('i', max(ints, 1))
+        self._bytes = sharedctypes.RawArray('b', max(bytes_, 1))
+        self._floats = sharedctypes.RawArray('d', max(floats, 1))
+        self.layout = None
+
+    def __getstate__(self):
+        # The column views are not shared so only the shared arrays are sent to a spawned worker
+        return {'capacity': self.capacity, '_ints': self._ints, '_bytes': self._bytes, '_floats': self._floats,
+                'layout': None}
+
+    @staticmethod
+    def size(count, joint_count, detector_count, collider_count):
+        """Computes the size of the integer, byte and float arrays required for the given layout
+
+        :param count: number of results
+        :type count: int
+        :param joint_count: number of joints in the positioner
+        :type joint_count: int
+        :param detector_count: number of detectors
+        :type detector_count: int
+        :param collider_count: number of colliders in the scene
+        :type collider_count: int
+        :return: size of integer, byte and float arrays
+        :rtype: Tuple[int, int, int]
+        """
+        return 1 + 2 * count, count * (8 + collider_count), count * (8 + joint_count + detector_count)
+
+    def fits(self, layout):
+        """Checks if the buffer has the capacity for the given layout
+
+        :param layout: number of results, joints, detectors and colliders
+        :type layout: Tuple[int, int, int, int]
+        :return: indicates the layout fits in the buffer
+        :rtype: bool
+        """
+        return all(size <= capacity for size, capacity in zip(self.size(*layout), self.capacity))
+
+    def setLayout(self, count, joint_count, detector_count, collider_count):
+        """Creates the column views for the given layout and resets the done flags
+
+        :param count: number of results
+        :type count: int
+        :param joint_count: number of joints in the positioner
+        :type joint_count: int
+        :param detector_count: number of detectors
+        :type detector_count: int
+        :param collider_count: number of colliders in the scene
+        :type collider_count: int
+        """
+        self.layout = (count, joint_count, detector_count, collider_count)
+        ints = np.frombuffer(self._ints, np.int32)
+        self.error = ints[0:1]
+        self.done = ints[1:1 + count]
+        self.evaluations = ints[1 + count:1 + 2 * count]
+
+        array = np.frombuffer(self._bytes, np.int8)
+        self.status, array = array[:count], array[count:]
+        self.flags, array = array[:7 * count].reshape(count, 7), array[7 * count:]
+        self.collision_mask = array[:count * collider_count].reshape(count, collider_count)
+
+        array = np.frombuffer(self._floats, np.float64)
+        self.q, array = array[:count * joint_count].reshape(count, joint_count), array[count * joint_count:]
+        self.errors, array = array[:count * 6].reshape(count, 6), array[count * 6:]
+        self.path_collision, array = array[:count], array[count:]
+        self.clearance, array = array[:count], array[count:]
+        self.path_length = array[:count * detector_count].reshape(count, detector_count)
+
+    def reset(self):
+        """Clears the done and error flags"""
+        self.error[:] = -1
+        self.done[:] = -1
+
+    def isDone(self, index, job_id):
+        """Indicates if the result at the given index has been written by the given job
+
+        :param index: index of result
+        :type index: int
+        :param job_id: id of the job
+        :type job_id: int
+        :return: indicates the result is available
+        :rtype: bool
+        """
+        return self.done[index] == job_id
+
+    def write(self, index, job_id, result):
+        """Writes the result into the row at the given index
+
+        :param index: index of result
+        :type index: int
+        :param job_id: id of the job
+        :type job_id: int
+        :param result: simulation result
+        :type result: SimulationResult
+        """
+        if result.skipped:
+            self.status[index] = -1 - SKIP_NOTES.index(result.note)
+        else:
+            ik = result.ik
+            self.status[index] = ik.status.value
+            self.evaluations[index] = ik.evaluations
+            self.q[index] = ik.q
+            self.errors[index, 0:3] = ik.position_error
+            self.errors[index, 3:6] = ik.orientation_error
+            self.flags[index] = (ik.position_converged, ik.orientation_converged, result.path_length is not None,
+                                 result.collision_mask is not None, result.path_collision is not None,
+                                 result.clearance is not None, result.note == TIME_BUDGET_NOTE)
+            if result.path_length is not None:
+                self.path_length[index] = result.path_length
+            if result.collision_mask is not None:
+                self.collision_mask[index] = result.collision_mask
+            if result.path_collision is not None:
+                self.path_collision[index] = result.path_collision
+            if result.clearance is not None:
+                self.clearance[index] = result.clearance
+
+        self.done[index] = job_id
+
+    def read(self, index, result_id, alignment, positioner):
+        """Creates a simulation result from the row at the given index
+
+        :param index: index of result
+        :type index: int
+        :param result_id: result identifier
+        :type result_id: str
+        :param alignment: alignment index
+        :type alignment: int
+        :param positioner: positioner used to format the joint offsets
+        :type positioner: Union[PositioningStack, SerialManipulator]
+        :return: simulation result
+        :rtype: SimulationResult
+        """
+        status = int(self.status[index])
+        if status < 0:
+            return SimulationResult(result_id, alignment=alignment, skipped=True, note=SKIP_NOTES[-1 - status])
+
+        q = self.q[index].copy()
+        (position_converged, orientation_converged, has_path_length, has_collision_mask, has_path_collision,
+         has_clearance, timed_out) = self.flags[index]
+        ik = IKResult(q, IKSolver.Status(status), self.errors[index, 0:3].copy(), self.errors[index, 3:6].copy(),
+                      bool(position_converged), bool(orientation_converged), int(self.evaluations[index]))
+        joint_labels = [positioner.links[order].name for order in positioner.order]
+        path_length = tuple(self.path_length[index]) if has_path_length else None
+        collision_mask = self.collision_mask[index].astype(bool).tolist() if has_collision_mask else None
+        path_collision = float(self.path_collision[index]) if has_path_collision else None
+        clearance = float(self.clearance[index]) if has_clearance else None
+
+        return SimulationResult(result_id, ik, (joint_labels, positioner.toUserFormat(q)), alignment, path_length,
+                                collision_mask, note=TIME_BUDGET_NOTE if timed_out else '',
+                                path_collision=path_collision, clearance=clearance)
+
+
+class JobEvent:
+    """Event-like flag for a job submitted to the simulation server. The flag is set when the job is
+    aborted or another job is submitted to the server.
+
+    :param active_job: id of the active job which is shared with the worker processes
+    :type active_job: multiprocessing.Value
+    :param job_id: id of the job
+    :type job_id: int
+    """
+    def __init__(self, active_job, job_id):
+        self.active_job = active_job
+        self.job_id = job_id
+
+    def is_set(self):
+        """indicates if the job has been stopped
+
+        :return: flag indicating the job has been stopped
+        :rtype: bool
+        """
+        return self.active_job.value != self.job_id
+
+    def set(self):
+        """stops the job"""
+        with self.active_job.get_lock():
+            if self.active_job.value == self.job_id:
+                self.active_job.value = -1
+
+
+def pack_cached_args(job, args, digests, worker_digests):
+    """Adds the cached arguments to the job of a worker as (digest, value) pairs. The value is None if
+    the worker already holds the argument with the same digest
+
+    :param job: job of the worker
+    :type job: Dict
+    :param args: simulation arguments
+    :type args: Dict
+    :param digests: digest of cached arguments
+    :type digests: Dict[str, str]
+    :param worker_digests: digest of the arguments held by the worker which are updated
+    :type worker_digests: Dict[str, str]
+    """
+    for key in SimulationServer.CACHED_ARGS:
+        cached = worker_digests.get(key) == digests[key]
+        job[key] = (digests[key], None if cached else args[key])
+        worker_digests[key] = digests[key]
+
+
+def unpack_cached_args(job, cache):
+    """Replaces the (digest, value) pairs of the cached arguments in the job with the values. The
+    value is taken from the cache if it was not sent with the job
+
+    :param job: job of the worker
+    :type job: Dict
+    :param cache: arguments held by the worker which are updated
+    :type cache: Dict
+    """
+    for key in SimulationServer.CACHED_ARGS:
+        _, value = job[key]
+        if value is None:
+            value = cache[key]
+        cache[key] = value
+        job[key] = value
+
+
+def serve(jobs, buffer, active_job, busy):
+    """Runs simulation jobs in a long-lived worker process. The positioner, sample and instrument scene
+    are only sent with a job if they changed since the previous job so they are cached along with
+    the collision manager built from them. The busy flag is set while a job is running so the server
+    can wait for the worker to stop writing into the buffer before the buffer is reset.
+
+    :param jobs: queue of simulation arguments. None stops the worker
+    :type jobs: multiprocessing.Queue
+    :param buffer: shared buffer for simulation results
+    :type buffer: ResultBuffer
+    :param active_job: id of the active job
+    :type active_job: multiprocessing.Value
+    :param busy: flag indicating the worker is running a job
+    :type busy: multiprocessing.Value
+    """
+    cache = {}
+    state = {}
+    for args in iter(jobs.get, None):
+        busy.value = 1
+        try:
+            unpack_cached_args(args, cache)
+            buffer.setLayout(*args['layout'])
+            args['buffer'] = buffer
+            args['exit_event'] = JobEvent(active_job, args['job_id'])
+            args['worker_state'] = state
+            Simulation.execute(args)
+        finally:
+            busy.value = 0
+
+
+class SimulationServer:
+    """Manages long-lived simulation worker processes. The workers keep the positioner, sample and
+    instrument scene (including the collision manager) between simulations so only the arguments that
+    changed since the previous simulation are sent to the workers when a new simulation is submitted.
+    The address is empty for a server with local workers.
+    """
+    CACHED_ARGS = ('positioner', 'sample', 'instrument_scene')
+
+    def __init__(self):
+        self.address = ''
+        self.buffer = ResultBuffer()
+        self.active_job = Value('i', -1)
+        self.job_id = 0
+        self.processes = []
+        self.job_queues = []
+        self.digests = []
+        self.busy = []
+
+    def isAlive(self):
+        """Indicates if any of the worker processes is alive
+
+        :return: flag indicating a worker process is alive
+        :rtype: bool
+        """
+        return any(process.is_alive() for process in self.processes)
 
+    def digest(self, args):
+        """Computes the digest of the cached simulation arguments
 
-class Simulation(QtCore.QObject):
+        :param args: simulation arguments
+        :type args: Dict
+        :return: digest of cached arguments
+        :rtype: Dict[str, str]
+        """
+        scene = [node for nodes in args['instrument_scene'].values() for node in nodes]
+        scene_arrays = [np.array([len(nodes) for nodes in args['instrument_scene'].values()])]
+        for node in scene:
+            scene_arrays.extend([node.vertices, node.indices, node.transform[:, :]])
+
+        sample_arrays = []
+        for mesh in args['sample']:
+            sample_arrays.extend([mesh.vertices, mesh.indices])
+
+        return {'positioner': hashlib.md5(pickle.dumps(args['positioner'])).hexdigest(),
+                'sample': compute_digest(*sample_arrays),
+                'instrument_scene': compute_digest(*scene_arrays)}
+
+    def submit(self, args, worker_count, digests=None):
+        """Submits a simulation job to the workers. Workers are started if there are fewer than the
+        worker count and the previous job is stopped.
+
+        :param args: simulation arguments
+        :type args: Dict
+        :param worker_count: number of workers to use
+        :type worker_count: int
+        :param digests: digest of cached arguments. The digest is computed if None
+        :type digests: Union[Dict[str, str], None]
+        :return: event for the submitted job
+        :rtype: JobEvent
+        """
+        self.job_id += 1
+        self.active_job.value = self.job_id
+
+        alive = [index for index, process in enumerate(self.processes) if process.is_alive()]
+        self.processes = [self.processes[index] for index in alive]
+        self.job_queues = [self.job_queues[index] for index in alive]
+        self.digests = [self.digests[index] for index in alive]
+        self.busy = [self.busy[index] for index in alive]
+        while len(self.processes) < worker_count:
+            jobs = Queue()
+            busy = Value('b', 0)
+            process = Process(target=serve, args=(jobs, self.buffer, self.active_job, busy))
+            process.daemon = True
+            process.start()
+            self.processes.append(process)
+            self.job_queues.append(jobs)
+            self.digests.append({})
+            self.busy.append(busy)
+
+        digests = self.digest(args) if digests is None else digests
+        job = {key: value for key, value in args.items() if key not in ('buffer', 'exit_event', 'worker_state')}
+        job['job_id'] = self.job_id
+        job['worker_count'] = worker_count
+        job['digests'] = digests
+        for worker_id in range(worker_count):
+            worker_job = dict(job, worker_id=worker_id)
+            pack_cached_args(worker_job, args, digests, self.digests[worker_id])
+            self.job_queues[worker_id].put(worker_job)
+
+        return JobEvent(self.active_job, self.job_id)
+
+    def reserve(self, layout):
+        """Sets the layout of the result buffer. The previous job is stopped and the layout is only changed
+        after its workers have finished so a stale worker cannot write into the rows of the next job. Since
+        the workers inherit the buffer when they are started, the workers are stopped if a larger buffer is
+        needed for the layout and restarted on the next submit.
+
+        :param layout: number of results, joints, detectors and colliders
+        :type layout: Tuple[int, int, int, int]
+        :return: result buffer
+        :rtype: ResultBuffer
+        """
+        self.active_job.value = -1
+        while any(busy.value and process.is_alive() for busy, process in zip(self.busy, self.processes)):
+            time.sleep(0.01)
+
+        if not self.buffer.fits(layout):
+            self.stop()
+            size = ResultBuffer.size(*layout)
+            self.buffer = ResultBuffer(*[max(new, 2 * old) for new, old in zip(size, self.buffer.capacity)])
+
+        self.buffer.setLayout(*layout)
+        self.buffer.reset()
+
+        return self.buffer
+
+    def stop(self):
+        """Stops the worker processes"""
+        self.active_job.value = -1
+        for jobs in self.job_queues:
+            jobs.put(None)
+
+        for process in self.processes:
+            process.join()
+
+        self.processes = []
+        self.job_queues = []
+        self.digests = []
+        self.busy = []
+
+
+def load_reachability_map(positioner, gauge_volume, q_vectors):
+    """Gets the reachability map of the positioner from the reachability directory. The map is built and
+    saved if it does not exist, the file name is a digest of the kinematics of the positioner, the gauge
+    volume and q-vectors so the map is rebuilt when any of these change
+
+    :param positioner: positioning stack
+    :type positioner: PositioningStack
+    :param gauge_volume: position of the gauge volume
+    :type gauge_volume: numpy.ndarray
+    :param q_vectors: q-vectors of the detectors
+    :type q_vectors: numpy.ndarray
+    :return: reachability map
+    :rtype: ReachabilityMap
+    """
+    parameters = np.array([ReachabilityMap.sample_count, ReachabilityMap.voxel_resolution,
+                           ReachabilityMap.orientation_resolution, ReachabilityMap.seed])
+    digest = compute_digest(np.frombuffer(compute_positioner_digest(positioner).encode(), np.uint8),
+                            np.asarray(gauge_volume, dtype=float), np.asarray(q_vectors, dtype=float), parameters)
+    filename = REACHABILITY_PATH / f'{digest}.npz'
+    try:
+        return ReachabilityMap.load(filename)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError):
+        logging.warning(f'The reachability map ({filename}) could not be read and will be rebuilt')
+
+    reachability_map = ReachabilityMap.build(positioner, gauge_volume, q_vectors)
+    try:
+        reachability_map.save(filename)
+    except OSError:
+        logging.exception(f'The reachability map could not be saved to {filename}')
+
+    return reachability_map
+
+
+def checkpoint_path(project):
+    """Gets the path of the checkpoint file of a project in the checkpoint directory
+
+    :param project: path of the project
+    :type project: Union[str, pathlib.Path]
+    :return: path of checkpoint file
+    :rtype: pathlib.Path
+    """
+    key = str(pathlib.Path(project).resolve())
+    return CHECKPOINT_PATH / f'{hashlib.md5(key.encode()).hexdigest()}.ckpt'
+
+
+class Checkpoint:
+    """Append-only file of the results of a simulation. Each record is the key of the measurement inputs
+    (see ``Simulation.computeKeys``) and the result so a simulation that was aborted or crashed can be resumed
+    by reusing the results with the same key. The records are flushed to disk periodically.
+
+    :param filename: path of the checkpoint file
+    :type filename: Union[str, pathlib.Path]
+    :param interval: minimum time in seconds between flushes
+    :type interval: float
+    """
+    def __init__(self, filename, interval=1.0):
+        self.filename = pathlib.Path(filename)
+        self.interval = interval
+        self.file = None
+        self.last_flush = 0.0
+
+    def exists(self):
+        """Indicates if the checkpoint file exists
+
+        :return: flag indicating the checkpoint file exists
+        :rtype: bool
+        """
+        return self.filename.is_file()
+
+    def load(self):
+        """Reads the results in the checkpoint file. An incomplete record at the end of the file, which
+        could be written if the application crashed, is ignored
+
+        :return: results keyed by the key of the measurement inputs
+        :rtype: Dict[str, SimulationResult]
+        """
+        results = {}
+        if not self.exists():
+            return results
+
+        with open(self.filename, 'rb') as checkpoint_file:
+            while True:
+                try:
+                    key, result = pickle.load(checkpoint_file)
+                except EOFError:
+                    break
+                except Exception:
+                    logging.warning(f'The checkpoint ({self.filename}) ends with an incomplete record')
+                    break
+                results[key] = result
+
+        return results
+
+    def open(self, results=None):
+        """Creates a new checkpoint file with the given results. New results are appended to the file
+
+        :param results: results keyed by the key of the measurement inputs
+        :type results: Union[Dict[str, SimulationResult], None]
+        """
+        self.close()
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.filename, 'wb')
+        for key, result in ({} if results is None else results).items():
+            pickle.dump((key, result), self.file)
+        self.flush()
+
+    def write(self, key, result):
+        """Appends a result to the checkpoint file
+
+        :param key: key of the measurement inputs
+        :type key: str
+        :param result: simulation result
+        :type result: SimulationResult
+        """
+        if self.file is None:
+            return
+
+        pickle.dump((key, result), self.file)
+        if time.perf_counter() - self.last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered records to disk"""
+        if self.file is None:
+            return
+
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.last_flush = time.perf_counter()
+
+    def close(self):
+        """Flushes and closes the checkpoint file"""
+        if self.file is None:
+            return
+
+        self.flush()
+        self.file.close()
+        self.file = None
+
+    def remove(self):
+        """Closes and deletes the checkpoint file"""
+        self.close()
+        with suppress(FileNotFoundError):
+            self.filename.unlink()
+
+
+class Simulation:
     """Simulates the experiment by computing inverse kinematics of positioning system to place measurement
-    points in the gauge volume with the appropriate orientation. The simulation is performed on a different
-    process to avoid freezing the main thread and a signal is sent when new results are available.
+    points in the gauge volume with the appropriate orientation. The simulation is performed on one or more
+    worker processes of a simulation server to avoid freezing the main thread. The caller should periodically
+    check for results with ``checkResult`` which emits a signal when new results are available.
 
     :param instrument: instrument object
     :type instrument: Instrument
@@ -122,37 +1187,57 @@ class Simulation(QtCore.QObject):
     :type vectors: numpy.ndarray
     :param alignment: alignment matrix
     :type alignment: Matrix44
+    :param server: simulation server. A new server is created if None
+    :type server: Union[SimulationServer, None]
+    :param cache: results from previous simulations keyed by a digest of their inputs. Results with
+                  unchanged inputs are reused instead of recomputed
+    :type cache: Union[Dict[str, SimulationResult], None]
     """
-    result_updated = QtCore.pyqtSignal(bool)
-    stopped = QtCore.pyqtSignal()
+    def __init__(self, instrument, sample, points, vectors, alignment, server=None, cache=None):
+        self.result_updated = Signal()
+        self.stopped = Signal()
 
-    def __init__(self, instrument, sample, points, vectors, alignment):
-        super().__init__()
-
-        self.timer = QtCore.QTimer()
-        self.timer.setInterval(20)
-        self.timer.timeout.connect(self.checkResult)
+        self.server = SimulationServer() if server is None else server
+        self.cache = {} if cache is None else cache
+        self.checkpoint = None
+        self.keys = {}
+        self.input_digest = ''
+        self.stale = False
 
         self.args = {'ikine_kwargs': {'local_max_eval': settings.value(settings.Key.Local_Max_Eval),
                                       'global_max_eval': settings.value(settings.Key.Global_Max_Eval),
                                       'tol': (settings.value(settings.Key.Position_Stop_Val),
                                               settings.value(settings.Key.Angular_Stop_Val)),
-                                      'bounded': True},
+                                      'bounded': True,
+                                      'backend': settings.value(settings.Key.IK_Backend),
+                                      'decoupled': settings.value(settings.Key.Decoupled_IK)},
                      'skip_zero_vectors': settings.value(settings.Key.Skip_Zero_Vectors),
-                     'align_first_order': settings.value(settings.Key.Align_First)}
-        self.results = []
-        self.process = None
+                     'align_first_order': settings.value(settings.Key.Align_First),
+                     'warm_start': settings.value(settings.Key.Warm_Start),
+                     'reachability_map': settings.value(settings.Key.Reachability_Map),
+                     'check_path_collision': settings.value(settings.Key.Path_Collision),
+                     'check_clearance': settings.value(settings.Key.Clearance),
+                     'clearance_margin': settings.value(settings.Key.Clearance_Margin),
+                     'budget_scales': BUDGET_SCALES if settings.value(settings.Key.Adaptive_Budget) else (1,),
+                     'time_budget': settings.value(settings.Key.Time_Budget),
+                     'worker_count': settings.value(settings.Key.Worker_Count),
+                     'collision_threads': settings.value(settings.Key.Collision_Threads),
+                     'worker_id': 0,
+                     'job_id': 0,
+                     'chunk_size': CHUNK_SIZE,
+                     'log_level': logging.INFO}
+        self.pending_results = {}
         self.compute_path_length = False
         self.render_graphics = False
         self.check_limits = True
         self.check_collision = False
-        self.has_valid_result = False
         self.args['positioner'] = instrument.positioning_stack
 
         self.shape = (vectors.shape[0], vectors.shape[1] // 3, vectors.shape[2])
         self.count = self.shape[0] * self.shape[2]
-        self.args['results'] = Queue(self.count + 1)
+        self.args['reused'] = np.zeros(self.count, bool)
         self.args['exit_event'] = Event()
+        self.args['start_configuration'] = instrument.positioning_stack.set_points
 
         matrix = alignment.transpose()
         self.args['points'] = points.points @ matrix[0:3, 0:3] + matrix[3, 0:3]
@@ -162,9 +1247,8 @@ class Simulation(QtCore.QObject):
             for j in range(0, self.args['vectors'].shape[1], 3):
                 self.args['vectors'][:, j:j+3, k] = vectors[:, j:j+3, k] @ matrix[0:3, 0:3]
 
-        self.args['sample'] = []
-        for key, mesh in sample.items():
-            self.args['sample'].append(mesh.transformed(alignment))
+        self.args['sample'] = list(sample.values())
+        self.args['alignment'] = alignment
 
         self.args['beam_axis'] = np.array(instrument.jaws.beam_direction)
         self.args['gauge_volume'] = np.array(instrument.gauge_volume)
@@ -175,6 +1259,11 @@ class Simulation(QtCore.QObject):
         self.params = self.extractInstrumentParameters(instrument)
 
         self.args['instrument_scene'] = InstrumentEntity(instrument).collisionNode()
+        self.args['collision_decimation'] = instrument.collision_decimation
+        self.args['layout'] = (self.count, len(self.positioner.links), len(self.detector_names), self.scene_size)
+        joint_labels = [self.positioner.links[order].name for order in self.positioner.order]
+        self.results = SimulationResultSet(joint_labels, len(self.detector_names), self.scene_size, self.count)
+        self.args['buffer'] = self.server.reserve(self.args['layout'])
 
     def extractInstrumentParameters(self, instrument):
         """Extract detector and jaws state
@@ -219,6 +1308,15 @@ class Simulation(QtCore.QObject):
     def positioner(self):
         return self.args['positioner']
 
+    @property
+    def order(self):
+        """Gets the point and alignment index pairs in simulation order
+
+        :return: point and alignment index pairs
+        :rtype: List[Tuple[int, int]]
+        """
+        return simulation_order(self.shape, self.args['align_first_order'])
+
     @property
     def scene_size(self):
         return sum(map(len, self.args['instrument_scene'].values())) + len(self.args['sample'])
@@ -230,8 +1328,6 @@ class Simulation(QtCore.QObject):
     @compute_path_length.setter
     def compute_path_length(self, value):
         self.args['compute_path_length'] = value
-        if value:
-            self.args['path_lengths'] = sharedctypes.RawArray('f', [0.] * np.prod(self.shape))
 
     @property
     def check_collision(self):
@@ -241,6 +1337,30 @@ class Simulation(QtCore.QObject):
     def check_collision(self, value):
         self.args['check_collision'] = value
 
+    @property
+    def check_path_collision(self):
+        return self.args['check_path_collision']
+
+    @check_path_collision.setter
+    def check_path_collision(self, value):
+        self.args['check_path_collision'] = value
+
+    @property
+    def check_clearance(self):
+        return self.args['check_clearance']
+
+    @check_clearance.setter
+    def check_clearance(self, value):
+        self.args['check_clearance'] = value
+
+    @property
+    def clearance_margin(self):
+        return self.args['clearance_margin']
+
+    @clearance_margin.setter
+    def clearance_margin(self, value):
+        self.args['clearance_margin'] = value
+
     @property
     def render_graphics(self):
         return self.args['render_graphics']
@@ -257,43 +1377,238 @@ class Simulation(QtCore.QObject):
     def check_limits(self, value):
         self.args['ikine_kwargs']['bounded'] = value
 
-    def start(self):
-        """starts the simulation"""
-        self.process = Process(target=Simulation.execute, args=(self.args,))
-        self.process.daemon = True
-        self.process.start()
-        self.timer.start()
+    @property
+    def time_budget(self):
+        return self.args['time_budget']
+
+    @time_budget.setter
+    def time_budget(self, value):
+        self.args['time_budget'] = value
 
-    def checkResult(self):
-        """checks and notifies if result are available"""
-        queue = self.args['results']
-        if self.args['results'].empty():
+    @property
+    def worker_count(self):
+        return self.args['worker_count']
+
+    @worker_count.setter
+    def worker_count(self, value):
+        self.args['worker_count'] = value
+
+    @property
+    def log_level(self):
+        return self.args['log_level']
+
+    @log_level.setter
+    def log_level(self, value):
+        self.args['log_level'] = value
+
+    def computeCommonDigest(self, digests):
+        """Computes the digest of the simulation inputs that affect the result of every measurement i.e.
+        all the inputs except the measurement points and vectors. The start configuration is included because
+        every chunk is solved from it
+
+        :param digests: digest of cached arguments
+        :type digests: Dict[str, str]
+        :return: hex digest
+        :rtype: str
+        """
+        args = self.args
+        flags = (repr(sorted(args['ikine_kwargs'].items())), args['budget_scales'], args['skip_zero_vectors'],
+                 args['compute_path_length'], args['check_collision'], args['beam_in_gauge'],
+                 args['reachability_map'], args['warm_start'],
+                 args['check_collision'] and args['check_path_collision'],
+                 args['check_collision'] and args['check_clearance'])
+        inputs = [compute_positioner_digest(args['positioner']), repr(flags)]
+        if args['compute_path_length'] or args['check_collision']:
+            inputs.append(digests['sample'])
+        if args['check_collision']:
+            inputs.append(digests['instrument_scene'])
+        return compute_digest(np.frombuffer(''.join(inputs).encode(), np.uint8), args['alignment'][:, :],
+                              args['beam_axis'], args['gauge_volume'], args['q_vectors'], args['diff_axis'],
+                              np.asarray(args['start_configuration'], dtype=float))
+
+    def computeInputDigest(self, digests):
+        """Computes the digest of all the simulation inputs which is saved with the results to check if
+        the results are still valid
+
+        :param digests: digest of cached arguments
+        :type digests: Dict[str, str]
+        :return: hex digest
+        :rtype: str
+        """
+        args = self.args
+        common = self.computeCommonDigest(digests)
+        return compute_digest(np.frombuffer(f'{common}{args["align_first_order"]}'.encode(), np.uint8),
+                              args['points'], args['vectors'], np.array(args['enabled']))
+
+    def computeKeys(self, digests):
+        """Computes the cache key of each measurement in simulation order from the measurement point and
+        vectors, and the digest of the other simulation inputs that affect the result. The key is None for
+        measurements that depend on the previous measurement i.e. unskipped measurements with zero vectors.
+        When the path between measurements is checked for collision, the key also depends on the key of the
+        previous measurement in the chunk or the start configuration for the first measurement in the chunk
+
+        :param digests: digest of cached arguments
+        :type digests: Dict[str, str]
+        :return: cache keys
+        :rtype: Dict[int, Union[str, None]]
+        """
+        args = self.args
+        common = self.computeCommonDigest(digests)
+        check_path = args['check_collision'] and args['check_path_collision']
+
+        keys = {}
+        vectors = args['vectors']
+        for index, (i, j) in enumerate(simulation_order(self.shape, args['align_first_order'])):
+            zero_vectors = np.all(np.linalg.norm(vectors[i, :, j].reshape(-1, 3), axis=1) < VECTOR_EPS)
+            if args['enabled'][i] and zero_vectors and not args['skip_zero_vectors']:
+                keys[index] = None
+                continue
+            keys[index] = compute_digest(np.frombuffer(common.encode(), np.uint8), args['points'][i, :],
+                                         vectors[i, :, j], np.array(args['enabled'][i]))
+            if not check_path:
+                continue
+
+            if index % args['chunk_size'] == 0:
+                previous = np.asarray(args['start_configuration'], dtype=float)
+            elif keys[index - 1] is not None:
+                previous = np.frombuffer(keys[index - 1].encode(), np.uint8)
+            else:
+                keys[index] = None
+                continue
+            keys[index] = compute_digest(np.frombuffer(keys[index].encode(), np.uint8), previous)
+
+        return keys
+
+    def start(self, resume=False):
+        """starts the simulation on the server workers. The results of measurements whose inputs have not
+        changed since a previous simulation are taken from the cache and the other measurements are split
+        across the workers when more than one worker is specified. When resuming, the results in the checkpoint
+        are added to the cache so only the measurements that were not completed are simulated.
+
+        :param resume: indicates the simulation should continue from the checkpoint
+        :type resume: bool
+        """
+        self.results.clear()
+        self.pending_results = {}
+        self.args['buffer'] = self.server.reserve(self.args['layout'])
+
+        digests = self.server.digest(self.args)
+        self.keys = self.computeKeys(digests)
+        self.input_digest = self.computeInputDigest(digests)
+        self.stale = False
+        if self.checkpoint is not None and resume:
+            self.cache.update(self.checkpoint.load())
+        for key in set(self.cache).difference(self.keys.values()):
+            del self.cache[key]
+
+        if self.checkpoint is not None:
+            self.checkpoint.open(self.cache)
+
+        order = simulation_order(self.shape, self.args['align_first_order'])
+        reused = self.args['reused']
+        reused[:] = [self.keys[index] in self.cache for index in range(self.count)]
+        if self.check_collision and self.check_path_collision:
+            # A chunk is simulated from its start configuration so the results of a chunk are only reused if
+            # the whole chunk is reused, otherwise the path to the first simulated measurement would be wrong
+            chunks = np.arange(self.count) // self.args['chunk_size']
+            reused[np.isin(chunks, chunks[~reused])] = False
+
+        for index, key in self.keys.items():
+            if reused[index]:
+                i, j = order[index]
+                result = copy.copy(self.cache[key])
+                result.id = result_label(index, i, j, self.shape[2])
+                result.alignment = j
+                result.reused = True
+                self.pending_results[index] = result
+
+        remaining = self.count - np.count_nonzero(reused)
+        if remaining > 0:
+            worker_count = min(self.worker_count, math.ceil(remaining / self.args['chunk_size']))
+            self.args['exit_event'] = self.server.submit(self.args, max(worker_count, 1), digests)
+            self.args['job_id'] = self.args['exit_event'].job_id
+
+    def restore(self, results, input_digest):
+        """Sets the results of a saved simulation. The results are marked as stale if the inputs of the
+        simulation differ from the inputs of the saved simulation, otherwise the results are added to the
+        cache so they are reused when the simulation is run again
+
+        :param results: saved simulation results
+        :type results: SimulationResultSet
+        :param input_digest: digest of the inputs of the saved simulation
+        :type input_digest: str
+        """
+        digests = self.server.digest(self.args)
+        self.results = results
+        self.input_digest = input_digest
+        self.stale = input_digest != self.computeInputDigest(digests)
+        if self.stale:
             return
 
-        if not self.process.is_alive():
-            self.timer.stop()
+        self.keys = self.computeKeys(digests)
+        for index, key in self.keys.items():
+            if key is None or index >= len(results):
+                continue
+            result = results[index]
+            if is_reusable(result):
+                self.cache[key] = result
 
-        queue.put(None)
-        error = False
-        for result in iter(queue.get, None):
-            if isinstance(result, SimulationResult):
-                self.results.append(result)
-                if not result.skipped and result.ik.status != IKSolver.Status.Failed:
-                    self.has_valid_result = True
+    def checkResult(self):
+        """checks and notifies if result are available. Results from the workers could arrive out
+        of order so they are held in the result buffer until all results before them are available"""
+        buffer = self.args['buffer']
+        job_id = self.args['job_id']
+        error = bool(buffer.error[0] == job_id)
+        if error:
+            buffer.error[0] = -1
+
+        count = len(self.results)
+        order = simulation_order(self.shape, self.args['align_first_order'])
+        while len(self.results) < self.count:
+            index = len(self.results)
+            if index in self.pending_results:
+                result = self.pending_results.pop(index)
+            elif buffer.isDone(index, job_id):
+                i, j = order[index]
+                result = buffer.read(index, result_label(index, i, j, self.shape[2]), j, self.positioner)
+                key = self.keys.get(index)
+                if key is not None and is_reusable(result):
+                    self.cache[key] = result
+                    if self.checkpoint is not None:
+                        self.checkpoint.write(key, result)
             else:
-                error = True
+                break
+
+            self.results.append(result)
+
+        if self.checkpoint is not None:
+            if len(self.results) == self.count:
+                self.checkpoint.remove()
+            elif error or not self.isRunning():
+                self.checkpoint.close()
 
-        self.result_updated.emit(error)
+        if error or len(self.results) > count:
+            self.result_updated.emit(error)
 
     @staticmethod
     def execute(args):
         """Computes inverse kinematics, path length, and collisions for each measurement in the
-        simulation.
+        simulation. When the simulation is split across multiple workers, the measurements are divided
+        into chunks of fixed size which are assigned to the workers in turn. Each chunk starts from the
+        same joint configuration so the results do not depend on the number of workers. If warm start is
+        enabled, the inverse kinematics for a measurement is started from the solution of the nearest point
+        (with the same alignment) already solved in the current chunk. Measurements with results reused
+        from a previous simulation are not computed. If the "indices" argument is given, only the measurements
+        at those indices are computed e.g. a chunk assigned by a remote job server. When the path between
+        measurements is checked for collision, the path from the configuration of the previous measurement in
+        the chunk is checked, and measurements that do not converge are solved again with larger budgets
+        immediately so the path to the next measurement starts from the final configuration. The clearance
+        between the sample and the instrument is computed at the final pose if requested.
 
         :param args: argument required for the simulation
         :type args: Dict
         """
-        setup_logging('simulation.log')
+        setup_logging('simulation.log', args['log_level'])
         logger = logging.getLogger(__name__)
         logger.info('Initializing new simulation...')
 
@@ -303,45 +1618,173 @@ class Simulation(QtCore.QObject):
         diff_axis = args['diff_axis']
         beam_in_gauge = args['beam_in_gauge']
 
-        results = args['results']
+        buffer = args['buffer']
         exit_event = args['exit_event']
         ikine_kwargs = args['ikine_kwargs']
 
         positioner = args['positioner']
+        chain = positioner.compile()
         joint_labels = [positioner.links[order].name for order in positioner.order]
         vectors = args['vectors']
         shape = (vectors.shape[0], vectors.shape[1]//3,  vectors.shape[2])
         points = args['points']
         enabled = args['enabled']
         sample = args['sample']
+        alignment = args['alignment']
         compute_path_length = args['compute_path_length']
         render_graphics = args['render_graphics']
         check_collision = args['check_collision']
-        if compute_path_length and beam_in_gauge:
-            path_lengths = np.frombuffer(args['path_lengths'], dtype=np.float32, count=np.prod(shape)).reshape(shape)
+        check_path = check_collision and args['check_path_collision']
+        check_clearance = check_collision and args['check_clearance']
+        job_id = args['job_id']
+        state = args.get('worker_state', {})
+        digests = args.get('digests', {})
 
         if check_collision:
-            instrument_scene = args['instrument_scene']
-            scene_size = sum(map(len, instrument_scene.values())) + len(args['sample'])
-            manager = CollisionManager(scene_size)
-            sample_ids, positioner_ids = populate_collision_manager(manager, sample, instrument_scene)
+            key = (digests.get('instrument_scene'), digests.get('sample'), args['collision_decimation'])
+            if None in key or state.get('collision_key') != key:
+                instrument_scene = args['instrument_scene']
+                scene_size = sum(map(len, instrument_scene.values())) + len(args['sample'])
+                if 'collision_manager' in state:
+                    state['collision_manager'].close()
+                manager = CollisionManager(scene_size, args['collision_threads'])
+                state['collision_ids'] = populate_collision_manager(manager, sample, instrument_scene,
+                                                                    args['collision_decimation'],
+                                                                    MeshCache(MESH_CACHE_PATH))
+                state['collision_manager'] = manager
+                state['collision_key'] = key
+            manager = state['collision_manager']
+            sample_ids, positioner_ids = state['collision_ids']
+
+        reachability_map = None
+        if args['reachability_map']:
+            key = (compute_positioner_digest(positioner), compute_digest(gauge_volume, q_vec))
+            if state.get('reachability_key') != key:
+                logger.info('Loading reachability map...')
+                state['reachability_map'] = load_reachability_map(positioner, gauge_volume, q_vec)
+                state['reachability_key'] = key
+            reachability_map = state['reachability_map']
 
         skip_zero_vectors = args['skip_zero_vectors']
-        if args['align_first_order']:
-            order = [(i, j) for i in range(shape[0]) for j in range(shape[2])]
-        else:
-            order = [(i, j) for j in range(shape[2]) for i in range(shape[0])]
+        warm_start = args['warm_start']
+        solved = {}
+        order = simulation_order(shape, args['align_first_order'])
+        worker_id = args['worker_id']
+        worker_count = args['worker_count']
+        chunk_size = args['chunk_size']
+        reused = args['reused']
+        indices = args.get('indices')
+        if indices is None:
+            indices = [index for index in range(len(order)) if not reused[index]]
+            if worker_count > 1:
+                indices = [index for index in indices if (index // chunk_size) % worker_count == worker_id]
+
+        budget_scales = args['budget_scales']
+        time_budget = args['time_budget']
+        if time_budget > 0 and state.get('budget_job') != job_id:
+            state['budget_job'] = job_id
+            state['deadline'] = time.monotonic() + time_budget
 
         logger.info(f'Simulation ({shape[0]} points, {shape[2]} alignments) initialized with '
                     f'render graphics: {render_graphics}, check_collision: {check_collision}, compute_path_length: '
-                    f'{compute_path_length}, check_limits: {args["ikine_kwargs"]["bounded"]}')
+                    f'{compute_path_length}, check_limits: {args["ikine_kwargs"]["bounded"]}, worker: '
+                    f'{worker_id + 1} of {worker_count}')
+
+        def write(index, result):
+            """writes the result to the buffer unless the simulation is stopped. Returns False if the
+            simulation is stopped"""
+            if exit_event.is_set():
+                return False
+
+            buffer.write(index, job_id, result)
+            return True
+
+        def complete(index, i, j, label, start_q, r, note=''):
+            """computes the path length and collision of a measurement and writes the result to the buffer.
+            Returns False if the simulation is stopped"""
+            result = SimulationResult(label, r, (joint_labels, positioner.toUserFormat(r.q)), j, note=note)
+            if r.status != IKSolver.Status.Failed:
+                positioner.set_points = r.q
+                pose = chain.pose(r.q) @ chain.tool_link @ alignment
+
+                if compute_path_length and beam_in_gauge:
+                    transformed_sample = sample[0].transformed(pose)
+                    result.path_length = path_length_calculation(transformed_sample, gauge_volume,
+                                                                 beam_axis, diff_axis)
+
+                if exit_event.is_set():
+                    return False
+
+                if check_collision:
+                    update_colliders(manager, pose, sample_ids, chain.modelTransforms(r.q), positioner_ids)
+                    result.collision_mask = manager.collide()
+
+                if check_clearance:
+                    result.clearance = sample_clearance(manager, sample_ids, result.collision_mask)
+
+                if check_path:
+                    result.path_collision = find_path_collision(manager, chain, alignment, start_q, r.q,
+                                                                sample_ids, positioner_ids)
+
+            if not write(index, result):
+                return False
+
+            if render_graphics:
+                # Sleep to allow graphics render
+                time.sleep(0.2)
+
+            logger.info(f'Finished Point {i+1}, Alignment {j+1}')
+
+            return not exit_event.is_set()
+
+        def escalate(measurements):
+            """solves the deferred measurements of a chunk again with larger evaluation budgets until they
+            converge, the budgets are exhausted or the time budget is exceeded. Returns False if the
+            simulation is stopped"""
+            for index, i, j, label, start_q, poses, seed, r in measurements:
+                note = ''
+                for scale in budget_scales[1:]:
+                    if r.status not in ESCALATED_STATUS:
+                        break
+                    if time_budget > 0 and time.monotonic() > state['deadline']:
+                        logger.info(f'Time budget exceeded, Point {i+1}, Alignment {j+1} is not escalated')
+                        note = TIME_BUDGET_NOTE
+                        break
+
+                    positioner.set_points = start_q
+                    evaluations = r.evaluations
+                    kwargs = dict(ikine_kwargs, local_max_eval=scale * ikine_kwargs['local_max_eval'],
+                                  global_max_eval=scale * ikine_kwargs['global_max_eval'])
+                    r = positioner.ikine(*poses, **kwargs, seed=seed, reachability_map=reachability_map)
+                    r.evaluations += evaluations
+                    logger.info(f'Escalated Point {i+1}, Alignment {j+1} to {scale}x budget ({r.status.name})')
+
+                    if exit_event.is_set():
+                        return False
+
+                if not complete(index, i, j, label, start_q, r, note):
+                    return False
+
+            return True
+
+        chunk = None
+        deferred = []
         try:
-            for index, ij in enumerate(order):
-                i, j = ij
-                label = f'# {index + 1} - Point {i + 1}, Alignment {j + 1}' if shape[2] > 1 else f'Point {i + 1}'
+            for index in indices:
+                i, j = order[index]
+                label = result_label(index, i, j, shape[2])
+
+                if index // chunk_size != chunk:
+                    if not escalate(deferred):
+                        break
+                    deferred.clear()
+                    chunk = index // chunk_size
+                    positioner.set_points = args['start_configuration']
+                    solved.clear()
 
                 if not enabled[i]:
-                    results.put(SimulationResult(label, skipped=True, note='The measurement point is disabled'))
+                    if not write(index, SimulationResult(label, skipped=True, note=SKIP_NOTES[0])):
+                        break
                     logger.info(f'Skipped Point {i+1}, Alignment {j+1} (Point Disabled)')
                     continue
 
@@ -349,66 +1792,85 @@ class Simulation(QtCore.QObject):
                 selected = np.where(np.linalg.norm(all_mvs, axis=1) > VECTOR_EPS)[0]
                 if selected.size == 0:
                     if skip_zero_vectors:
-                        results.put(SimulationResult(label, skipped=True, note='The measurement vector is unset'))
+                        if not write(index, SimulationResult(label, skipped=True, note=SKIP_NOTES[1])):
+                            break
                         logger.info(f'Skipped Point {i+1}, Alignment {j+1} (Vector Unset)')
                         continue
                     q_vectors = np.atleast_2d(q_vec[0])
-                    measurement_vectors = np.atleast_2d(positioner.pose[0:3, 0:3].transpose() @ q_vec[0])
+                    pose = chain.pose(positioner.set_points)
+                    measurement_vectors = np.atleast_2d(pose[0:3, 0:3].transpose() @ q_vec[0])
                 else:
                     q_vectors = np.atleast_2d(q_vec[selected])
                     measurement_vectors = np.atleast_2d(all_mvs[selected])
 
                 logger.info(f'Started Point {i+1}, Alignment {j+1}')
 
-                r = positioner.ikine((points[i, :], measurement_vectors), (gauge_volume, q_vectors), **ikine_kwargs)
-
-                if exit_event.is_set():
-                    break
+                seed = None
+                if warm_start and j in solved:
+                    solved_points, solved_q = solved[j]
+                    nearest = np.argmin(np.linalg.norm(np.array(solved_points) - points[i, :], axis=1))
+                    seed = solved_q[nearest]
 
-                result = SimulationResult(label, r, (joint_labels, positioner.toUserFormat(r.q)), j)
-                if r.status != IKSolver.Status.Failed:
-                    pose = positioner.fkine(r.q) @ positioner.tool_link
-
-                    if compute_path_length and beam_in_gauge:
-                        transformed_sample = sample[0].transformed(pose)
-                        result.path_length = path_length_calculation(transformed_sample, gauge_volume,
-                                                                     beam_axis, diff_axis)
-                        path_lengths[i, :, j] = result.path_length
-
-                    if exit_event.is_set():
-                        break
+                start_q = positioner.set_points
+                poses = ((points[i, :], measurement_vectors), (gauge_volume, q_vectors))
+                r = positioner.ikine(*poses, **ikine_kwargs, seed=seed, reachability_map=reachability_map)
 
-                    if check_collision:
-                        update_colliders(manager, pose, sample_ids, positioner.model().transforms, positioner_ids)
-                        result.collision_mask = manager.collide()
+                if warm_start and r.status == IKSolver.Status.Converged:
+                    solved_points, solved_q = solved.setdefault(j, ([], []))
+                    solved_points.append(points[i, :])
+                    solved_q.append(r.q)
 
                 if exit_event.is_set():
                     break
 
-                results.put(result)
-                if render_graphics:
-                    # Sleep to allow graphics render
-                    time.sleep(0.2)
+                if len(budget_scales) > 1 and r.status in ESCALATED_STATUS:
+                    measurement = (index, i, j, label, start_q, poses, seed, r)
+                    if check_path:
+                        # The path to the next measurement starts from the final configuration of this one
+                        if not escalate([measurement]):
+                            break
+                        continue
 
-                logger.info(f'Finished Point {i+1}, Alignment {j+1}')
+                    # The measurement is solved again with larger budgets after the rest of the chunk
+                    deferred.append(measurement)
+                    positioner.set_points = r.q
+                    logger.info(f'Deferred Point {i+1}, Alignment {j+1} ({r.status.name})')
+                    continue
 
-                if exit_event.is_set():
+                if not complete(index, i, j, label, start_q, r):
                     break
+            else:
+                escalate(deferred)
 
             logger.info('Simulation Finished')
         except Exception:
-            results.put('Error')
+            if not exit_event.is_set():
+                buffer.error[0] = job_id
+            exit_event.set()
             logging.exception('An error occurred while running the simulation.')
 
         logging.shutdown()
 
     @property
     def path_lengths(self):
-        if self.compute_path_length:
-            return np.frombuffer(self.args['path_lengths'], dtype=np.float32,
-                                 count=np.prod(self.shape)).reshape(self.shape)
+        """Gets the path lengths arranged by measurement point, detector, and alignment
 
-        return None
+        :return: path lengths or None if path lengths are not computed
+        :rtype: Union[numpy.ndarray, None]
+        """
+        if not self.compute_path_length:
+            return None
+
+        return self.results.pathLengths(self.shape, simulation_order(self.shape, self.args['align_first_order']))
+
+    @property
+    def has_valid_result(self):
+        """Indicates if the simulation has a result that is not skipped and did not fail
+
+        :return: flag indicating a valid result is available
+        :rtype: bool
+        """
+        return bool(np.any(self.results.valid))
 
     def isRunning(self):
         """Indicates if the simulation is running.
@@ -416,13 +1878,18 @@ class Simulation(QtCore.QObject):
         :return: flag indicating the simulation is running
         :rtype: bool
         """
-        if self.process is None:
+        if len(self.results) >= self.count:
+            return False
+
+        if self.args['job_id'] == 0 or self.args['exit_event'].is_set():
             return False
 
-        return self.process.is_alive() and not self.args['exit_event'].is_set()
+        return self.server.isAlive()
 
     def abort(self):
-        """Aborts the simulation, but not guaranteed to be instantaneous."""
+        """Aborts the simulation, but not guaranteed to be instantaneous. The checkpoint is kept so the
+        simulation can be resumed"""
         self.args['exit_event'].set()
-        self.timer.stop()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
         self.stopped.emit()
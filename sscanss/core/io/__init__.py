@@ -1,3 +1,5 @@
 from .reader import (read_3d_model, read_obj, read_stl, read_project_hdf, read_points, read_vectors, read_trans_matrix,
-                     read_fpos, validate_vector_length, read_kinematic_calibration_file, read_robot_world_calibration_file)
-from .writer import write_project_hdf, write_binary_stl, write_points
+                     read_fpos, validate_vector_length, read_kinematic_calibration_file, read_robot_world_calibration_file,
+                     read_simulation_hdf)
+from .writer import (write_project_hdf, write_binary_stl, write_points, write_simulation_hdf,
+                     write_simulation_csv)
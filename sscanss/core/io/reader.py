@@ -10,6 +10,7 @@ from ..geometry.mesh import Mesh
 from ..geometry.colour import Colour
 from ..instrument.instrument import Instrument, Collimator, Detector, Jaws, Script
 from ..instrument.robotics import Link, SerialManipulator
+from ..instrument.simulation import SimulationResultSet
 from ..math.constants import VECTOR_EPS
 from ..math.matrix import Matrix44
 from ..math.vector import Vector3
@@ -36,7 +37,7 @@ def read_project_hdf(filename):
         setting_group = hdf_file.get('settings')
         if setting_group is not None:
             for key, value in setting_group.attrs.items():
-                data['settings'][key] = value
+                data['settings'][key] = value.item() if isinstance(value, np.generic) else value
 
         sample_group = hdf_file['sample']
         sample = OrderedDict()
@@ -64,6 +65,8 @@ def read_project_hdf(filename):
 
         alignment = hdf_file.get('alignment')
         data['alignment'] = alignment if alignment is None else Matrix44(alignment)
+        # The simulation results are read separately when needed with read_simulation_hdf
+        data['has_simulation'] = 'simulation' in hdf_file
 
         instrument = _read_instrument(hdf_file)
 
@@ -77,11 +80,47 @@ def read_project_hdf(filename):
     return data, instrument
 
 
+def read_simulation_hdf(filename):
+    """Reads the simulation results and options from a project or simulation hdf file
+
+    :param filename: path of the hdf file
+    :type filename: str
+    :return: A dictionary containing the simulation options and results
+    :rtype: Dict
+    :raises: KeyError
+    """
+    data = {}
+    with h5py.File(filename, 'r') as hdf_file:
+        group = hdf_file['simulation']
+        data['input_digest'] = group.attrs.get('input_digest', '')
+        data['shape'] = tuple(int(size) for size in group.attrs['shape'])
+        for key in ('align_first_order', 'compute_path_length', 'check_collision', 'check_limits'):
+            data[key] = bool(group.attrs[key])
+        data['detector_names'] = [str(name) for name in group.attrs['detector_names']]
+
+        joint_labels = [str(label) for label in group.attrs['joint_labels']]
+        results = SimulationResultSet(joint_labels, len(data['detector_names']), group['collision_mask'].shape[1])
+        columns = {}
+        for key in results.dtype.names:
+            if key not in group:
+                # Columns added after the file was written are left empty
+                continue
+            if results.dtype[key] == object:
+                columns[key] = [value.decode() for value in group[key]]
+            else:
+                columns[key] = np.array(group[key])
+        results.load(columns)
+        data['results'] = results
+
+    return data
+
+
 def _read_instrument(hdf_file):
     instrument_group = hdf_file['instrument']
     name = instrument_group.attrs['name']
     gauge_volume = list(instrument_group['gauge_volume'])
     script = Script(instrument_group.attrs['script_template'])
+    collision_decimation = instrument_group.attrs.get('collision_decimation')
 
     positioning_stacks = {}
     for key, value in instrument_group['stacks'].attrs.items():
@@ -156,7 +195,7 @@ def _read_instrument(hdf_file):
                 link.locked = lock_state[index]
 
     instrument = Instrument(name, gauge_volume, detectors, jaws, positioners, positioning_stacks, script,
-                            fixed_hardware)
+                            fixed_hardware, None if collision_decimation is None else int(collision_decimation))
 
     active_stack_group = instrument_group['stacks']['active']
     instrument.loadPositioningStack(active_stack_group.attrs['name'])
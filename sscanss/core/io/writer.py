@@ -5,16 +5,19 @@ import csv
 import datetime as dt
 import h5py
 import numpy as np
+from ..instrument.robotics import IKSolver
 from ...config import __version__, settings
 
 
-def write_project_hdf(data, filename):
-    """Writes the project data dictionary to a hdf file
+def write_project_hdf(data, filename, simulation=None):
+    """Writes the project data dictionary and the simulation results to a hdf file
 
     :param data: A dictionary containing the project data
     :type data: dict
     :param filename: path of the hdf file
     :type filename: str
+    :param simulation: simulation whose results are saved with the project
+    :type simulation: Union[Simulation, None]
     """
     with h5py.File(filename, 'w') as hdf_file:
         hdf_file.attrs['name'] = data['name']
@@ -58,12 +61,17 @@ def write_project_hdf(data, filename):
 
         _write_instrument(hdf_file, instrument)
 
+        if simulation is not None and len(simulation.results) > 0:
+            _write_simulation(hdf_file.create_group('simulation'), simulation)
+
 
 def _write_instrument(hdf_file, instrument):
     instrument_group = hdf_file.create_group('instrument')
     instrument_group.attrs['name'] = instrument.name
     instrument_group['gauge_volume'] = instrument.gauge_volume
     instrument_group.attrs['script_template'] = instrument.script.template
+    if instrument.collision_decimation is not None:
+        instrument_group.attrs['collision_decimation'] = instrument.collision_decimation
 
     positioners_group = instrument_group.create_group('positioners')
     for key, positioner in instrument.positioners.items():
@@ -199,3 +207,95 @@ def write_points(filename, data):
                 writer.writerow([f'{p0:.7f}', f'{p1:.7f}', f'{p2:.7f}'])
             else:
                 writer.writerow([f'{p0:.7f}', f'{p1:.7f}', f'{p2:.7f}', data[i].enabled])
+
+
+def write_simulation_hdf(simulation, filename, name=''):
+    """Writes the simulation results and options to a hdf file
+
+    :param simulation: simulation
+    :type simulation: Simulation
+    :param filename: path of the hdf file
+    :type filename: str
+    :param name: name of the project
+    :type name: str
+    """
+    with h5py.File(filename, 'w') as hdf_file:
+        hdf_file.attrs['name'] = name
+        hdf_file.attrs['version'] = __version__
+        hdf_file.attrs['date_created'] = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        _write_simulation(hdf_file.create_group('simulation'), simulation)
+
+
+def _write_simulation(group, simulation):
+    group.attrs['input_digest'] = simulation.input_digest
+    group.attrs['shape'] = simulation.shape
+    group.attrs['align_first_order'] = simulation.args['align_first_order']
+    group.attrs['compute_path_length'] = simulation.compute_path_length
+    group.attrs['check_collision'] = simulation.check_collision
+    group.attrs['check_limits'] = simulation.check_limits
+    group.attrs['joint_labels'] = simulation.results.joint_labels
+    group.attrs['detector_names'] = simulation.detector_names
+
+    results = simulation.results.data
+    options = {'compression': 'gzip', 'chunks': True} if results.size else {}
+    group.create_dataset('order', data=np.array(simulation.order, dtype=np.int32).reshape(-1, 2)[:results.size],
+                         **options)
+    for key in results.dtype.names:
+        if results.dtype[key] == object:
+            group.create_dataset(key, data=[str(value) for value in results[key]], dtype=h5py.string_dtype(),
+                                 **options)
+        else:
+            group.create_dataset(key, data=results[key], **options)
+
+
+def write_simulation_csv(simulation, filename):
+    """Writes a row for each simulation result to a comma delimited file.
+
+    :param simulation: simulation
+    :type simulation: Simulation
+    :param filename: path of the file
+    :type filename: str
+    """
+    results = simulation.results
+    header = ['Label', 'Point', 'Alignment', 'Status']
+    header.extend(f'Position Error {axis} (mm)' for axis in 'XYZ')
+    header.extend(f'Orientation Error {axis} (degrees)' for axis in 'XYZ')
+    header.extend(results.joint_labels)
+    if simulation.compute_path_length:
+        header.extend(f'Path Length {name} (mm)' for name in simulation.detector_names)
+    if simulation.check_collision:
+        header.append('Collision')
+        if simulation.check_path_collision:
+            header.append('Path Collision (%)')
+        if simulation.check_clearance:
+            header.append('Clearance (mm)')
+    header.extend(['Evaluations', 'Reused', 'Note'])
+
+    with open(filename, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        for row, (point_index, alignment_index) in zip(results.data, simulation.order):
+            skipped = row['status'] == results.SKIPPED
+            values = [row['id'], point_index + 1, alignment_index + 1,
+                      'Skipped' if skipped else IKSolver.Status(int(row['status'])).name]
+            if skipped:
+                values.extend([''] * (6 + len(results.joint_labels)))
+            else:
+                values.extend(f'{value:.3f}' for value in row['position_error'])
+                values.extend(f'{value:.3f}' for value in row['orientation_error'])
+                values.extend(f'{value:.3f}' for value in row['formatted'])
+
+            if simulation.compute_path_length:
+                if row['has_path_length']:
+                    values.extend(f'{value:.3f}' for value in row['path_length'])
+                else:
+                    values.extend([''] * len(simulation.detector_names))
+            if simulation.check_collision:
+                values.append(bool(row['collision_mask'].any()) if row['has_collision_mask'] else '')
+                if simulation.check_path_collision:
+                    values.append(f'{100 * row["path_collision"]:.1f}' if row['has_path_collision'] else '')
+                if simulation.check_clearance:
+                    values.append(f'{row["clearance"]:.3f}' if row['has_clearance'] else '')
+            values.extend(['' if skipped else row['evaluations'], bool(row['reused']), row['note']])
+            writer.writerow(values)
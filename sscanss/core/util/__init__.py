@@ -1,3 +1,3 @@
 from .misc import (Directions, Primitives, to_float, TransformType, DockFlag, PointType, Attributes, POINT_DTYPE,
-                   StrainComponents, LoadVector, MessageSeverity, CommandID, toggleActionInGroup, PlaneOptions)
-from .worker import Worker
+                   StrainComponents, LoadVector, MessageSeverity, CommandID, toggleActionInGroup, PlaneOptions,
+                   Signal)
@@ -111,6 +111,42 @@ class PlaneOptions(Enum):
     Custom = 'Custom Normal'
 
 
+class Signal:
+    """Calls the connected functions when the signal is emitted. The class is used instead of the
+    Qt signal so the core package does not depend on Qt, and the functions are called in the thread
+    that emits the signal."""
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        """Connects a function to the signal
+
+        :param slot: function to call when the signal is emitted
+        :type slot: Callable[..., None]
+        """
+        self.slots.append(slot)
+
+    def disconnect(self, slot=None):
+        """Disconnects a function or all functions if no function is given from the signal
+
+        :param slot: function to disconnect
+        :type slot: Union[Callable[..., None], None]
+        """
+        if slot is None:
+            self.slots.clear()
+        else:
+            self.slots.remove(slot)
+
+    def emit(self, *args):
+        """Calls the connected functions with the given arguments
+
+        :param args: arguments of the connected functions
+        :type args: Any
+        """
+        for slot in list(self.slots):
+            slot(*args)
+
+
 def to_float(string):
     """Converts a string to a float if possible otherwise returns None
 
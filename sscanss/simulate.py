@@ -0,0 +1,335 @@
+"""
+Command line interface for running a simulation without the graphical user interface. The project file is loaded,
+the simulation is run on the simulation workers, and the results are written to HDF and/or CSV files along with
+the instrument script. The exit code indicates the outcome of the simulation so the runner can be used in
+batch jobs and continuous integration. The runner does not import Qt.
+
+Usage: python -m sscanss.simulate project.h5 [options]
+"""
+import argparse
+from enum import IntEnum, unique
+import logging
+import multiprocessing
+import pathlib
+import sys
+import time
+import numpy as np
+from sscanss.config import settings, setup_logging, MemorySettings
+from sscanss.core.instrument import (Simulation, IKSolver, RemoteSimulationServer, Checkpoint, checkpoint_path,
+                                     render_script)
+from sscanss.core.io import read_project_hdf, write_simulation_hdf, write_simulation_csv
+from sscanss.core.math import VECTOR_EPS
+from sscanss.core.util import POINT_DTYPE
+
+POLL_INTERVAL = 0.05
+
+
+@unique
+class ExitCode(IntEnum):
+    """Exit codes of the command line simulation runner"""
+    Success = 0
+    Error = 1
+    Usage = 2
+    NotConverged = 3
+    Collision = 4
+
+
+def create_parser():
+    """Creates the argument parser of the command line simulation runner
+
+    :return: argument parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog='python -m sscanss.simulate',
+                                     description='Runs the simulation of a SScanSS 2 project without the graphical '
+                                                 'user interface.',
+                                     epilog=f'exit codes: {ExitCode.Success} all measurements converged without '
+                                            f'collision, {ExitCode.Error} simulation could not be completed, '
+                                            f'{ExitCode.Usage} invalid arguments, {ExitCode.NotConverged} some '
+                                            f'measurements did not converge, {ExitCode.Collision} some '
+                                            f'measurements collided.')
+    parser.add_argument('project', help='path of the project (.h5) file')
+    parser.add_argument('-o', '--output', help='path prefix of the output files (default: project path without '
+                                               'extension)')
+    parser.add_argument('--listen', metavar='HOST:PORT', help='run the simulation on remote workers which connect '
+                                                              'to this address with "python -m sscanss.worker" '
+                                                              'instead of local worker processes')
+    parser.add_argument('--resume', action='store_true', help='continue an aborted simulation from its checkpoint '
+                                                              'instead of simulating all the measurements')
+    add_simulation_arguments(parser)
+
+    return parser
+
+
+def add_simulation_arguments(parser):
+    """Adds the simulation and output options to the argument parser
+
+    :param parser: argument parser
+    :type parser: argparse.ArgumentParser
+    """
+    parser.add_argument('-f', '--format', nargs='+', choices=['hdf', 'csv'], default=['hdf', 'csv'],
+                        help='formats of the result files (default: hdf csv)')
+    parser.add_argument('--no-script', action='store_true', help='do not write the instrument script')
+    parser.add_argument('--mu-amps', default='0.000', help='duration of measurements in microamps used in the '
+                                                           'instrument script (default: 0.000)')
+    parser.add_argument('--path-length', action='store_true', help='compute path lengths')
+    parser.add_argument('--check-collision', action='store_true', help='check for collisions')
+    parser.add_argument('--ignore-limits', action='store_true', help='ignore hardware limits')
+    parser.add_argument('-w', '--workers', type=int, help='number of simulation workers, or the maximum number of '
+                                                          'remote workers with --listen (default: 1)')
+    parser.add_argument('--time-budget', type=int, metavar='SECONDS',
+                        help='time after which measurements that did not converge are not solved again with larger '
+                             'evaluation budgets, 0 for no limit (default: value in the project or default '
+                             'setting)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not print progress and summary')
+
+
+def configure_logging(quiet):
+    """Sets the level of the root logger so that informational messages are not printed by the runner and
+    simulation workers in quiet mode
+
+    :param quiet: indicates only warnings and errors should be logged
+    :type quiet: bool
+    :return: log level
+    :rtype: int
+    """
+    level = logging.WARNING if quiet else logging.INFO
+    logging.getLogger().setLevel(level)
+
+    return level
+
+
+def configure_simulation(simulation, args):
+    """Sets the simulation options from the parsed arguments
+
+    :param simulation: simulation
+    :type simulation: Simulation
+    :param args: parsed arguments
+    :type args: argparse.Namespace
+    """
+    simulation.compute_path_length = args.path_length
+    simulation.check_collision = args.check_collision
+    simulation.check_limits = not args.ignore_limits
+    simulation.log_level = logging.WARNING if args.quiet else logging.INFO
+    if args.workers is not None:
+        simulation.worker_count = max(args.workers, 1)
+    if args.time_budget is not None:
+        simulation.time_budget = max(args.time_budget, 0)
+
+
+def load_project(filename, server=None):
+    """Loads the project file and creates the simulation. The project settings are applied to the
+    application settings and the results are checkpointed to the checkpoint file of the project
+
+    :param filename: path of the project file
+    :type filename: str
+    :param server: simulation server. A new server is created if None
+    :type server: Union[SimulationServer, None]
+    :return: project name, instrument, and simulation
+    :rtype: Tuple[str, Instrument, Simulation]
+    :raises: ValueError
+    """
+    data, instrument = read_project_hdf(filename)
+
+    settings.reset()
+    for key, value in data['settings'].items():
+        settings.local[key] = value
+
+    if data['alignment'] is None:
+        raise ValueError('Sample must be aligned on the instrument for Simulation')
+
+    points = np.rec.fromarrays(data['measurement_points'], dtype=POINT_DTYPE)
+    if points.size == 0:
+        raise ValueError('Measurement points should be added before Simulation')
+
+    if not points.enabled.any():
+        raise ValueError('No measurement points are enabled. Enable points from the point manager to proceed.')
+
+    vectors = data['measurement_vectors']
+    if settings.value(settings.Key.Skip_Zero_Vectors):
+        if (np.linalg.norm(vectors[points.enabled, :, :], axis=1) < VECTOR_EPS).all():
+            raise ValueError('No measurement vectors have been added and the project is configured to '
+                             '"Skip the measurement" when the measurement vector is unset.')
+
+    simulation = Simulation(instrument, data['sample'], points, vectors, data['alignment'], server)
+    simulation.checkpoint = Checkpoint(checkpoint_path(filename))
+
+    return data['name'], instrument, simulation
+
+
+def run_simulation(simulation, quiet=False, resume=False):
+    """Runs the simulation and waits for it to finish
+
+    :param simulation: simulation
+    :type simulation: Simulation
+    :param quiet: indicates progress should not be printed
+    :type quiet: bool
+    :param resume: indicates the simulation should continue from the checkpoint
+    :type resume: bool
+    :return: indicates if an error occurred in the simulation
+    :rtype: bool
+    """
+    errors = []
+    simulation.result_updated.connect(lambda error: errors.append(error))
+    simulation.start(resume)
+
+    reported = 0
+    try:
+        while True:
+            simulation.checkResult()
+            if not quiet and len(simulation.results) != reported:
+                reported = len(simulation.results)
+                print(f'Completed {reported} of {simulation.count} measurements', file=sys.stderr)
+
+            if not simulation.isRunning():
+                break
+            time.sleep(POLL_INTERVAL)
+    except KeyboardInterrupt:
+        simulation.abort()
+        print('Simulation interrupted, run the same command with --resume to continue', file=sys.stderr)
+        return True
+
+    return any(errors) or len(simulation.results) < simulation.count
+
+
+def summarize(results):
+    """Computes the convergence statistics of the simulation results
+
+    :param results: simulation results
+    :type results: SimulationResultSet
+    :return: number of results for each status, skipped results, collisions, and objective evaluations
+             of the results that were not reused
+    :rtype: Dict[str, int]
+    """
+    status = results.data['status']
+    summary = {'Total': len(results), 'Skipped': int(np.count_nonzero(status == results.SKIPPED))}
+    for value in IKSolver.Status:
+        summary[value.name] = int(np.count_nonzero(status == value.value))
+    summary['Collision'] = results.query(collision=True).size
+    summary['Evaluations'] = int(results.data['evaluations'][~results.data['reused']].sum())
+
+    return summary
+
+
+def exit_code(summary, error):
+    """Gets the exit code from the convergence statistics
+
+    :param summary: convergence statistics
+    :type summary: Dict[str, int]
+    :param error: indicates if an error occurred in the simulation
+    :type error: bool
+    :return: exit code
+    :rtype: ExitCode
+    """
+    if error:
+        return ExitCode.Error
+
+    if summary['Total'] - summary['Skipped'] != summary[IKSolver.Status.Converged.name]:
+        return ExitCode.NotConverged
+
+    if summary['Collision'] > 0:
+        return ExitCode.Collision
+
+    return ExitCode.Success
+
+
+def write_outputs(project, name, instrument, simulation, prefix, formats, write_script=True, mu_amps='0.000'):
+    """Writes the simulation results and the instrument script
+
+    :param project: path of the project file
+    :type project: str
+    :param name: name of the project
+    :type name: str
+    :param instrument: instrument
+    :type instrument: Instrument
+    :param simulation: simulation
+    :type simulation: Simulation
+    :param prefix: path prefix of the output files
+    :type prefix: pathlib.Path
+    :param formats: formats of the result files
+    :type formats: List[str]
+    :param write_script: indicates the instrument script should be written
+    :type write_script: bool
+    :param mu_amps: duration of measurements in microamps
+    :type mu_amps: str
+    :return: paths of the written files
+    :rtype: List[pathlib.Path]
+    """
+    filenames = []
+    if 'hdf' in formats:
+        filenames.append(prefix.with_name(f'{prefix.name}_simulation.h5'))
+        write_simulation_hdf(simulation, filenames[-1], name)
+
+    if 'csv' in formats:
+        filenames.append(prefix.with_name(f'{prefix.name}_simulation.csv'))
+        write_simulation_csv(simulation, filenames[-1])
+
+    if write_script:
+        filenames.append(prefix.with_name(f'{prefix.name}_script.txt'))
+        script = render_script(instrument.script, simulation.results, project, mu_amps)
+        with open(filenames[-1], 'w', newline='\n') as text_file:
+            text_file.write(script)
+
+    return filenames
+
+
+def main(argv=None):
+    """Runs the command line simulation runner
+
+    :param argv: command line arguments
+    :type argv: Union[List[str], None]
+    :return: exit code
+    :rtype: ExitCode
+    """
+    args = create_parser().parse_args(argv)
+    configure_logging(args.quiet)
+    settings.system = MemorySettings()
+
+    server = None
+    if args.listen is not None:
+        try:
+            server = RemoteSimulationServer(args.listen)
+        except (OSError, ValueError) as e:
+            print(f'error: could not start the job server ({args.listen}): {e}', file=sys.stderr)
+            return ExitCode.Error
+        if not args.quiet:
+            print(f'Waiting for workers to connect to {server.address}', file=sys.stderr)
+
+    try:
+        name, instrument, simulation = load_project(args.project, server)
+    except (OSError, KeyError, ValueError) as e:
+        logging.exception(f'An error occurred while loading the project ({args.project})')
+        print(f'error: could not load the project ({args.project}): {e}', file=sys.stderr)
+        if server is not None:
+            server.stop()
+        return ExitCode.Error
+
+    configure_simulation(simulation, args)
+
+    try:
+        error = run_simulation(simulation, args.quiet, args.resume)
+    finally:
+        simulation.server.stop()
+
+    summary = summarize(simulation.results)
+    code = exit_code(summary, error)
+    if not args.quiet:
+        print(', '.join(f'{key}: {value}' for key, value in summary.items()))
+
+    prefix = pathlib.Path(args.output if args.output else pathlib.Path(args.project).with_suffix(''))
+    try:
+        write_outputs(args.project, name, instrument, simulation, prefix, args.format, not args.no_script, args.mu_amps)
+    except OSError as e:
+        logging.exception('An error occurred while writing the simulation results')
+        print(f'error: could not write the simulation results: {e}', file=sys.stderr)
+        return ExitCode.Error
+
+    return code
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    setup_logging('simulate.log')
+    exit_status = main()
+    logging.shutdown()
+    sys.exit(exit_status)
@@ -0,0 +1,11 @@
+from PyQt5 import QtCore
+import sscanss.__resource
+
+
+def set_locale():
+    locale = QtCore.QLocale(QtCore.QLocale.C)
+    locale.setNumberOptions(QtCore.QLocale.RejectGroupSeparator)
+    QtCore.QLocale.setDefault(locale)
+
+
+set_locale()
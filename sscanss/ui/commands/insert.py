@@ -3,10 +3,11 @@ import logging
 import os
 import numpy as np
 from PyQt5 import QtWidgets
-from sscanss.core.util import (Primitives, Worker, PointType, LoadVector, MessageSeverity, StrainComponents,
-                               CommandID, Attributes)
+from sscanss.core.util import (Primitives, PointType, LoadVector, MessageSeverity, StrainComponents, CommandID,
+                               Attributes)
 from sscanss.core.geometry import (create_tube, create_sphere, create_cylinder, create_cuboid,
                                    closest_triangle_to_point, compute_face_normals)
+from sscanss.ui.util import Worker
 
 
 class InsertPrimitive(QtWidgets.QUndoCommand):
@@ -6,10 +6,10 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from sscanss.config import path_for, __version__
-from sscanss.core.instrument import IKSolver
+from sscanss.core.instrument import render_script
 from sscanss.core.util import DockFlag, Attributes
-from sscanss.ui.widgets import (AlignmentErrorModel, ErrorDetailModel, Banner, Accordion, Pane, create_tool_button,
-                                CenteredBoxProxy)
+from sscanss.ui.widgets import (AlignmentErrorModel, ErrorDetailModel, Banner, create_tool_button, CenteredBoxProxy,
+                                SimulationResultModel, SimulationResultProxy, SimulationResultDelegate)
 
 
 class AboutDialog(QtWidgets.QDialog):
@@ -656,6 +656,19 @@ class SimulationDialog(QtWidgets.QWidget):
                                                       icon_path=path_for('minus.png'), checkable=True)
         self.hide_skipped_button.toggled.connect(self.hideSkippedResults)
 
+        self.hide_failed_button = create_tool_button(tooltip='Hide Failed Results', style_name='ToolButton',
+                                                     status_tip='Hide the results with runtime errors in the result '
+                                                                'list',
+                                                     icon_path=path_for('cross.png'), checkable=True)
+        self.hide_failed_button.toggled.connect(lambda checked: self.result_proxy.setFilter(hide_failed=checked))
+
+        self.collisions_only_button = create_tool_button(tooltip='Show Only Collisions', style_name='ToolButton',
+                                                         status_tip='Show only the results with collisions in the '
+                                                                    'result list',
+                                                         icon_path=path_for('collision.png'), checkable=True)
+        self.collisions_only_button.toggled.connect(
+            lambda checked: self.result_proxy.setFilter(collisions_only=checked))
+
         self.path_length_button = create_tool_button(tooltip='Plot Path Length', style_name='ToolButton',
                                                      status_tip='Plot calculated path length for current simulation',
                                                      icon_path=path_for('line-chart.png'))
@@ -667,6 +680,8 @@ class SimulationDialog(QtWidgets.QWidget):
         self.export_button.clicked.connect(self.parent.showScriptExport)
 
         button_layout.addWidget(self.hide_skipped_button)
+        button_layout.addWidget(self.hide_failed_button)
+        button_layout.addWidget(self.collisions_only_button)
         button_layout.addWidget(self.path_length_button)
         button_layout.addWidget(self.export_button)
         main_layout.addLayout(button_layout)
@@ -677,7 +692,20 @@ class SimulationDialog(QtWidgets.QWidget):
         main_layout.addWidget(self.progress_label)
         main_layout.addWidget(self.progress_bar)
 
-        self.result_list = Accordion()
+        self.result_model = SimulationResultModel()
+        self.result_proxy = SimulationResultProxy()
+        self.result_proxy.setSourceModel(self.result_model)
+        self.result_list = QtWidgets.QListView()
+        self.result_list.setModel(self.result_proxy)
+        self.result_list.setItemDelegate(SimulationResultDelegate(self.result_list))
+        self.result_list.setUniformItemSizes(False)
+        self.result_list.setLayoutMode(QtWidgets.QListView.Batched)
+        self.result_list.setBatchSize(100)
+        self.result_list.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.result_list.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.result_list.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.result_list.customContextMenuRequested.connect(self.showContextMenu)
+        self.result_list.clicked.connect(self.toggleResultDetails)
         main_layout.addWidget(self.result_list)
         self.setLayout(main_layout)
 
@@ -699,6 +727,10 @@ class SimulationDialog(QtWidgets.QWidget):
     def loadSimulation(self, no_render=False):
         if self.simulation is not None:
             self.banner.hide()
+            if self.simulation.stale:
+                self.banner.showMessage('These results were saved with the project but the project has changed since '
+                                        'the simulation was run. Run the simulation again to update the results.',
+                                        Banner.Type.Warn)
             self.render_graphics = False if no_render else self.simulation.render_graphics
             self.check_collision = self.simulation.check_collision
             self.default_vector_alignment = self.parent.scenes.rendered_alignment
@@ -707,13 +739,13 @@ class SimulationDialog(QtWidgets.QWidget):
             self.progress_bar.setValue(0)
             self.progress_bar.setMaximum(self.simulation.count)
             self.updateProgress(SimulationDialog.State.Starting)
-            self.result_list.clear()
+            self.result_model.setSimulation(self.simulation)
             self.simulation.result_updated.connect(self.showResult)
             self.simulation.stopped.connect(lambda: self.updateProgress(SimulationDialog.State.Stopped))
 
-    def updateProgress(self, state, increment=False):
-        if increment:
-            self.progress_bar.setValue(self.progress_bar.value() + 1)
+    def updateProgress(self, state, count=None):
+        if count is not None:
+            self.progress_bar.setValue(count)
 
         completion = f'<p>Completed {self.progress_bar.value()} of {self.progress_bar.maximum()}</p>'
         if state == SimulationDialog.State.Starting:
@@ -728,128 +760,74 @@ class SimulationDialog(QtWidgets.QWidget):
 
     def hideSkippedResults(self, checked):
         self._hide_skipped_results = checked
-        for i in range(len(self.result_list.panes)):
-            if self.simulation.results[i].skipped:
-                self.result_list.panes[i].setVisible(not self._hide_skipped_results)
+        self.result_proxy.setFilter(hide_skipped=checked)
 
     def showResult(self, error=False):
         if self.simulation is None:
             return
 
         state = SimulationDialog.State.Running if self.simulation.isRunning() else SimulationDialog.State.Stopped
-        results = self.simulation.results[len(self.result_list.panes):]
-
-        for result in results:
-            header = QtWidgets.QLabel()
-            header.setTextFormat(QtCore.Qt.RichText)
-
-            details = QtWidgets.QLabel()
-            details.setTextFormat(QtCore.Qt.RichText)
-
-            if result.skipped:
-                header = self.__createPaneHeader(f'<span>{result.id}</span><br/> '
-                                                 f'<span><b>SKIPPED:</b> {result.note}.</span>', None)
-                style = Pane.Type.Info
-            elif result.ik.status == IKSolver.Status.Failed:
-                header = self.__createPaneHeader(f'<span>{result.id}</span><br/><span> A runtime error occurred. '
-                                                 'Check logs for more Information.</span>', result.ik.status)
-                style = Pane.Type.Error
-            else:
-                result_text = '\n'.join(
-                    '{:<20}{:>12.3f}'.format(*t) for t in zip(result.joint_labels, result.formatted))
-                style = Pane.Type.Info if result.ik.status == IKSolver.Status.Converged else Pane.Type.Warn
-                pos_style = '' if result.ik.position_converged else 'style="color:red"'
-                orient_style = '' if result.ik.orientation_converged else 'style="color:red"'
-                pos_err, orient_err = result.ik.position_error, result.ik.orientation_error
-                info = (f'<span>{result.id}</span><br/>'
-                        f'<span {pos_style}><b>Position Error (mm):</b> (X.) {pos_err[0]:.3f}, (Y.) '
-                        f'{pos_err[1]:.3f}, (Z.) {pos_err[2]:.3f}</span><br/>'
-                        f'<span {orient_style}><b>Orientation Error (degrees):</b> (X.) {orient_err[0]:.3f}, (Y.) '
-                        f'{orient_err[1]:.3f}, (Z.) {orient_err[2]:.3f}</span>')
-
-                if self.simulation.compute_path_length:
-                    labels = self.simulation.detector_names
-                    path_length_info = ', '.join('({}) {:.3f}'.format(*l) for l in zip(labels, result.path_length))
-                    info = f'{info}<br/><span><b>Path Length:</b> {path_length_info}</span>'
-
-                show_collision = self.simulation.check_collision and np.any(result.collision_mask)
-
-                header = self.__createPaneHeader(info, result.ik.status, show_collision)
-                details.setText(f'<pre>{result_text}</pre>')
-                if self.render_graphics:
-                    self.renderSimualtion(result)
-
-            self.result_list.addPane(self.__createPane(header, details, style, result))
-            self.updateProgress(state, True)
+        count = self.result_model.rowCount()
+        self.result_model.update()
+        if self.render_graphics:
+            for index in reversed(range(count, self.result_model.rowCount())):
+                if self.result_model.isExpandable(index):
+                    self.renderSimualtion(self.simulation.results[index])
+                    break
+
+        self.updateProgress(state, self.result_model.rowCount())
 
         if error:
             self.updateProgress(SimulationDialog.State.Stopped)
             self.parent.showMessage('An error occurred while running the simulation.')
 
-    def __createPane(self, panel, details, style, result):
-        pane = Pane(panel, details, style)
-        if style == Pane.Type.Error or result.skipped:
-            pane.setDisabled(True)
-            pane.toggle_icon.hide()
-            if result.skipped and self._hide_skipped_results:
-                pane.hide()
-            return pane
-        action = QtWidgets.QAction('Copy', pane)
+    def toggleResultDetails(self, index):
+        """Shows or hides the joint offsets of the result at the given index
+
+        :param index: proxy model index
+        :type index: QtCore.QModelIndex
+        """
+        row = self.result_proxy.mapToSource(index).row()
+        self.result_model.toggleExpanded(row)
+        self.result_list.itemDelegate().sizeHintChanged.emit(index)
+
+    def contextMenu(self, index):
+        """Creates the context menu for the result at the given index
+
+        :param index: proxy model index
+        :type index: QtCore.QModelIndex
+        :return: context menu or None if result is skipped or failed
+        :rtype: Union[QtWidgets.QMenu, None]
+        """
+        row = self.result_proxy.mapToSource(index).row()
+        if not index.isValid() or not self.result_model.isExpandable(row):
+            return None
+
+        result = self.simulation.results[row]
+        menu = QtWidgets.QMenu(self.result_list)
+        action = QtWidgets.QAction('Copy', menu)
         action.setStatusTip('Copy positioner offsets to clipboard')
         action_text = '\t'.join('{:.3f}'.format(t) for t in result.formatted)
         action.triggered.connect(lambda ignore, q=action_text:
                                  QtWidgets.QApplication.clipboard().setText(q))
-        pane.addContextMenuAction(action)
+        menu.addAction(action)
 
-        action = QtWidgets.QAction('Visualize', pane)
+        action = QtWidgets.QAction('Visualize', menu)
         action.setStatusTip('Visualize selected simulation result in the graphics window')
-        action.triggered.connect(lambda ignore, r=result: self.__visualize(result))
-        pane.addContextMenuAction(action)
+        action.triggered.connect(lambda ignore, r=result: self.__visualize(r))
+        menu.addAction(action)
 
-        return pane
+        return menu
 
-    def __createPaneHeader(self, header_text, status, show_collision=False):
-        widget = QtWidgets.QWidget()
-        layout = QtWidgets.QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-        widget.setLayout(layout)
-
-        header = QtWidgets.QLabel(header_text)
-        header.setTextFormat(QtCore.Qt.RichText)
-        layout.addWidget(header)
-
-        sub_layout = QtWidgets.QHBoxLayout()
-        layout.addLayout(sub_layout)
-
-        tool_tip_duration = 1800000
-        if show_collision:
-            icon = QtWidgets.QLabel()
-            icon.setToolTip('Collision Detected')
-            icon.setToolTipDuration(tool_tip_duration)
-            icon.setPixmap(QtGui.QPixmap(path_for('collision.png')).scaled(25, 25))
-            sub_layout.addWidget(icon)
-
-        tool_tip = ''
-        icon_path = ''
-        if status == IKSolver.Status.HardwareLimit:
-            tool_tip = 'Hardware limits violation'
-            icon_path = 'limit_hit.png'
-        elif status == IKSolver.Status.Unreachable:
-            tool_tip = 'Orientation is not reachable by the positioner'
-            icon_path = 'unreachable.png'
-        elif status == IKSolver.Status.DeformedVectors:
-            tool_tip = 'Angle between measurement vectors does not match q-vectors'
-            icon_path = 'deformed.png'
-
-        if icon_path and tool_tip:
-            icon = QtWidgets.QLabel()
-            icon.setToolTip(tool_tip)
-            icon.setPixmap(QtGui.QPixmap(path_for(icon_path)).scaled(25, 25))
-            icon.setToolTipDuration(tool_tip_duration)
-            sub_layout.addWidget(icon)
-        sub_layout.addStretch(1)
-
-        return widget
+    def showContextMenu(self, pos):
+        """Shows context menu for the result at cursor position
+
+        :param pos: cursor position
+        :type pos: QtCore.QPoint
+        """
+        menu = self.contextMenu(self.result_list.indexAt(pos))
+        if menu is not None:
+            menu.popup(self.result_list.viewport().mapToGlobal(pos))
 
     def __visualize(self, result):
         if not self.simulation.isRunning():
@@ -925,13 +903,12 @@ class ScriptExportDialog(QtWidgets.QDialog):
 
         self.template = self.parent_model.instrument.script
         self.show_mu_amps = self.template.Key.mu_amps.value in self.template.keys
-        self.createTemplateKeys()
 
         main_layout = QtWidgets.QVBoxLayout()
         if self.show_mu_amps:
             layout = QtWidgets.QHBoxLayout()
             layout.addWidget(QtWidgets.QLabel('Duration of Measurements (microamps):'))
-            self.micro_amp_textbox = QtWidgets.QLineEdit(self.template.keys[self.template.Key.mu_amps.value])
+            self.micro_amp_textbox = QtWidgets.QLineEdit('0.000')
             validator = QtGui.QDoubleValidator(self.micro_amp_textbox)
             validator.setNotation(QtGui.QDoubleValidator.StandardNotation)
             validator.setDecimals(3)
@@ -964,40 +941,10 @@ class ScriptExportDialog(QtWidgets.QDialog):
         self.setWindowFlag(QtCore.Qt.WindowContextHelpButtonHint, False)
         self.setAttribute(QtCore.Qt.WA_DeleteOnClose);
 
-    def createTemplateKeys(self):
-        temp = {self.template.Key.script.value: [],
-                self.template.Key.position.value: '',
-                self.template.Key.filename.value: self.parent_model.save_path,
-                self.template.Key.mu_amps.value: '0.000',
-                self.template.Key.count.value: len(self.results)}
-
-        header = '\t'.join(self.template.header_order)
-        temp[self.template.Key.header.value] = header.replace(self.template.Key.position.value,
-                                                              '\t'.join(self.results[0].joint_labels), 1)
-
-        for key in self.template.keys:
-            self.template.keys[key] = temp[key]
-
     def renderScript(self, preview=False):
-        key = self.template.Key
-        script = []
-        size = 0
-        for result in self.results:
-            if size == 10 and preview:
-                break
-
-            if result.skipped or result.ik.status == IKSolver.Status.Failed:
-                continue
-
-            script.append({key.position.value: '\t'.join('{:.3f}'.format(value) for value in result.formatted)})
-            size += 1
-
-        if self.show_mu_amps:
-            self.template.keys[key.mu_amps.value] = self.micro_amp_textbox.text()
-        self.template.keys[key.script.value] = script
-        self.template.keys[key.count.value] = len(script)
-
-        return self.template.render()
+        mu_amps = self.micro_amp_textbox.text() if self.show_mu_amps else '0.000'
+        return render_script(self.template, self.results, self.parent_model.save_path, mu_amps,
+                             10 if preview else None)
 
     def preview(self):
         script = self.renderScript(preview=True)
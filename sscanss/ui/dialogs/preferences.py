@@ -205,6 +205,155 @@ class Preferences(QtWidgets.QDialog):
         layout.addWidget(spin)
         layout.addStretch(1)
         main_layout.addLayout(layout)
+
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.IK_Backend
+        value = settings.value(key)
+        backends = settings.default(key).limits
+        layout.addWidget(QtWidgets.QLabel('Optimization method: '))
+        combo_box = QtWidgets.QComboBox()
+        combo_box.addItems(['Global optimization (MLSL)', 'Multi-start local optimization',
+                            'Damped least squares'])
+        combo_box.setProperty(self.prop_name, (key, value))
+        combo_box.setCurrentIndex(backends.index(value))
+        combo_box.currentIndexChanged.connect(lambda i, v=backends: self.changeSetting(v[i]))
+        layout.addWidget(combo_box)
+        layout.addStretch(1)
+        main_layout.addLayout(layout)
+
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.Decoupled_IK
+        value = settings.value(key)
+        checkbox = QtWidgets.QCheckBox('Solve orientation and position separately when possible')
+        checkbox.setChecked(value)
+        checkbox.stateChanged.connect(lambda ignore, c=checkbox: self.changeSetting(c.isChecked()))
+        checkbox.setProperty(self.prop_name, (key, value))
+        layout.addWidget(checkbox)
+        main_layout.addLayout(layout)
+
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.Reachability_Map
+        value = settings.value(key)
+        checkbox = QtWidgets.QCheckBox('Use reachability map to skip unreachable measurements')
+        checkbox.setChecked(value)
+        checkbox.stateChanged.connect(lambda ignore, c=checkbox: self.changeSetting(c.isChecked()))
+        checkbox.setProperty(self.prop_name, (key, value))
+        layout.addWidget(checkbox)
+        main_layout.addLayout(layout)
+
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.Adaptive_Budget
+        value = settings.value(key)
+        checkbox = QtWidgets.QCheckBox('Retry measurements that do not converge with larger evaluation budgets')
+        checkbox.setChecked(value)
+        checkbox.stateChanged.connect(lambda ignore, c=checkbox: self.changeSetting(c.isChecked()))
+        checkbox.setProperty(self.prop_name, (key, value))
+        layout.addWidget(checkbox)
+        main_layout.addLayout(layout)
+
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.Time_Budget
+        value = settings.value(key)
+        lim = settings.default(key).limits
+        layout.addWidget(QtWidgets.QLabel('Time limit for retrying measurements (seconds, 0 for no limit): '))
+        spin = QtWidgets.QSpinBox()
+        spin.setRange(*lim)
+        spin.setValue(value)
+        spin.setProperty(self.prop_name, (key, value))
+        spin.valueChanged.connect(self.changeSetting)
+        layout.addWidget(spin)
+        layout.addStretch(1)
+        main_layout.addLayout(layout)
+
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.Warm_Start
+        value = settings.value(key)
+        checkbox = QtWidgets.QCheckBox('Start from the solution of the nearest solved point')
+        checkbox.setChecked(value)
+        checkbox.stateChanged.connect(lambda ignore, c=checkbox: self.changeSetting(c.isChecked()))
+        checkbox.setProperty(self.prop_name, (key, value))
+        layout.addWidget(checkbox)
+        main_layout.addLayout(layout)
+
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.Path_Collision
+        value = settings.value(key)
+        checkbox = QtWidgets.QCheckBox('Check for collisions on the path between measurements')
+        checkbox.setChecked(value)
+        checkbox.stateChanged.connect(lambda ignore, c=checkbox: self.changeSetting(c.isChecked()))
+        checkbox.setProperty(self.prop_name, (key, value))
+        layout.addWidget(checkbox)
+        main_layout.addLayout(layout)
+
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.Clearance
+        value = settings.value(key)
+        checkbox = QtWidgets.QCheckBox('Compute the clearance between the sample and the instrument')
+        checkbox.setChecked(value)
+        checkbox.stateChanged.connect(lambda ignore, c=checkbox: self.changeSetting(c.isChecked()))
+        checkbox.setProperty(self.prop_name, (key, value))
+        layout.addWidget(checkbox)
+        main_layout.addLayout(layout)
+
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.Clearance_Margin
+        value = settings.value(key)
+        lim = settings.default(key).limits
+        layout.addWidget(QtWidgets.QLabel('Clearance warning margin (mm): '))
+        spin = QtWidgets.QDoubleSpinBox()
+        spin.setDecimals(3)
+        spin.setRange(*lim)
+        spin.setValue(value)
+        spin.setProperty(self.prop_name, (key, value))
+        spin.valueChanged.connect(self.changeSetting)
+        layout.addWidget(spin)
+        layout.addStretch(1)
+        main_layout.addLayout(layout)
+
+        main_layout.addWidget(create_header('Performance'))
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.Worker_Count
+        self.global_names.append(key)
+        value = settings.value(key)
+        lim = settings.default(key).limits
+        layout.addWidget(QtWidgets.QLabel(f'Number of simulation worker processes ({lim[0]} - {lim[1]}): '))
+        spin = QtWidgets.QSpinBox()
+        spin.setRange(*lim)
+        spin.setValue(value)
+        spin.setProperty(self.prop_name, (key, value))
+        spin.valueChanged.connect(self.changeSetting)
+        layout.addWidget(spin)
+        layout.addStretch(1)
+        main_layout.addLayout(layout)
+
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.Collision_Threads
+        self.global_names.append(key)
+        value = settings.value(key)
+        lim = settings.default(key).limits
+        layout.addWidget(QtWidgets.QLabel(f'Number of collision threads per worker ({lim[0]} - {lim[1]}): '))
+        spin = QtWidgets.QSpinBox()
+        spin.setRange(*lim)
+        spin.setValue(value)
+        spin.setProperty(self.prop_name, (key, value))
+        spin.valueChanged.connect(self.changeSetting)
+        layout.addWidget(spin)
+        layout.addStretch(1)
+        main_layout.addLayout(layout)
+
+        layout = QtWidgets.QHBoxLayout()
+        key = settings.Key.Server_Address
+        self.global_names.append(key)
+        value = settings.value(key)
+        layout.addWidget(QtWidgets.QLabel('Job server address for remote workers (host:port): '))
+        line_edit = QtWidgets.QLineEdit(value)
+        line_edit.setPlaceholderText('Local workers')
+        line_edit.setToolTip('Workers on other machines connect to this address with "python -m sscanss.worker '
+                             'host:port". Leave empty to run the simulation on local worker processes.')
+        line_edit.setProperty(self.prop_name, (key, value))
+        line_edit.textChanged.connect(lambda text: self.changeSetting(text.strip()))
+        layout.addWidget(line_edit)
+        main_layout.addLayout(layout)
         main_layout.addStretch(1)
 
         frame.setLayout(main_layout)
@@ -0,0 +1,2 @@
+from .animation import Sequence
+from .worker import Worker
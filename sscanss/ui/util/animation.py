@@ -0,0 +1,70 @@
+"""
+Class for animating the joints of a positioner
+"""
+from PyQt5 import QtCore
+from sscanss.core.instrument.robotics import joint_space_trajectory
+
+
+class Sequence(QtCore.QObject):
+    """This class creates an animation from start to end configuration
+
+    :param frames: function to generate frame at each way point
+    :type frames: method
+    :param start: inclusive start joint configuration/offsets
+    :type start: List[float]
+    :param stop: inclusive stop joint configuration/offsets
+    :type stop: List[float]
+    :param duration: time duration in milliseconds
+    :type duration: int
+    :param step: number of steps
+    :type step: int
+    """
+    frame_changed = QtCore.pyqtSignal()
+
+    def __init__(self, frames, start, stop, duration, step):
+        super().__init__()
+
+        self.timeline = QtCore.QTimeLine(duration, self)
+        self.timeline.setFrameRange(0, step - 1)
+
+        self.trajectory = joint_space_trajectory(start, stop, step)
+
+        self.timeline.setCurrentTime(self.timeline.duration())
+        self.timeline.frameChanged.connect(self.animate)
+        self.frames = frames
+        self.step = step
+
+    def start(self):
+        """
+        starts the animation
+        """
+        self.timeline.start()
+
+    def stop(self):
+        """
+        stops the animation
+        """
+        if self.timeline.currentTime() < self.timeline.duration():
+            self.timeline.setCurrentTime(self.timeline.duration())
+
+        self.timeline.stop()
+
+    def isRunning(self):
+        """indicates if the animation is running
+
+        :return: indicates if the animation is running
+        :rtype: bool
+        """
+        if self.timeline.state() == QtCore.QTimeLine.Running:
+            return True
+
+        return False
+
+    def animate(self, index):
+        """Calls the frame function and emits signal to notify frame change
+
+        :param index: current step/frame in the animation
+        :type index: int
+        """
+        self.frames(self.trajectory[index, :])
+        self.frame_changed.emit()
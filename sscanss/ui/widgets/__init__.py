@@ -1,5 +1,6 @@
 from .forms import FormControl, FormGroup, FormTitle, CompareValidator, Banner
 from .graphics import GLWidget, GraphicsView, GraphicsScene, GraphicsPointItem, Grid
-from .table_model import PointModel, AlignmentErrorModel, ErrorDetailModel, CenteredBoxProxy, LimitTextDelegate
+from .table_model import (PointModel, AlignmentErrorModel, ErrorDetailModel, CenteredBoxProxy, LimitTextDelegate,
+                          SimulationResultModel, SimulationResultProxy, SimulationResultDelegate)
 from .helpers import (create_header, create_tool_button, create_scroll_area, Accordion, Pane, ColourPicker, create_icon,
                       StatusBar, FilePicker, FileDialog)
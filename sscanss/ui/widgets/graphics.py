@@ -3,6 +3,7 @@ from enum import Enum, unique
 import math
 import numpy as np
 from OpenGL import GL, error
+from OpenGL.plugins import FormatHandler
 from PyQt5 import QtCore, QtGui, QtWidgets
 from sscanss.core.math import Vector3, clamp, Matrix44
 from sscanss.core.geometry import Colour
@@ -11,6 +12,9 @@ from sscanss.core.scene import (Node, Camera, world_to_screen, screen_to_world,
 from sscanss.core.util import Attributes
 from sscanss.config import settings
 
+# Tells OpenGL to use the NumpyHandler for the Matrix44 objects
+FormatHandler('sscanss', 'OpenGL.arrays.numpymodule.NumpyHandler', ['sscanss.core.math.matrix.Matrix44'])
+
 
 class GLWidget(QtWidgets.QOpenGLWidget):
     """Provides OpenGL widget for draw 3D scene for the sample setup and instrument
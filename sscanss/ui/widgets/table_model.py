@@ -1,6 +1,7 @@
 import numpy as np
 from PyQt5 import QtCore, QtGui, QtWidgets
 from sscanss.config import path_for
+from sscanss.core.instrument import IKSolver
 from sscanss.core.util import to_float
 
 
@@ -323,3 +324,327 @@ class ErrorDetailModel(QtCore.QAbstractTableModel):
                     return QtGui.QBrush(QtGui.QColor(255, 00, 0))
 
         return QtCore.QVariant()
+
+
+class SimulationResultModel(QtCore.QAbstractListModel):
+    """Provides model for showing simulation results in list view. The rows are read from the simulation
+    result set only when they are displayed and new results are inserted in batches.
+    """
+    ResultRole = QtCore.Qt.UserRole + 1
+    ExpandedRole = QtCore.Qt.UserRole + 2
+
+    def __init__(self):
+        super().__init__()
+
+        self.results = []
+        self.detector_names = []
+        self.compute_path_length = False
+        self.check_collision = False
+        self.clearance_margin = 0.0
+        self.expanded = set()
+        self._count = 0
+
+    def setSimulation(self, simulation):
+        """Resets the model to show the results of the given simulation
+
+        :param simulation: simulation
+        :type simulation: Union[Simulation, None]
+        """
+        self.beginResetModel()
+        if simulation is None:
+            self.results = []
+            self.detector_names = []
+            self.compute_path_length = False
+            self.check_collision = False
+            self.clearance_margin = 0.0
+        else:
+            self.results = simulation.results
+            self.detector_names = simulation.detector_names
+            self.compute_path_length = simulation.compute_path_length
+            self.check_collision = simulation.check_collision
+            self.clearance_margin = simulation.clearance_margin
+        self.expanded = set()
+        self._count = 0
+        self.endResetModel()
+
+    def update(self):
+        """Inserts the rows for the results added since the last update"""
+        count = len(self.results)
+        if count > self._count:
+            self.beginInsertRows(QtCore.QModelIndex(), self._count, count - 1)
+            self._count = count
+            self.endInsertRows()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def isExpandable(self, row):
+        """Checks if the result in the given row has joint details that can be expanded
+
+        :param row: row index
+        :type row: int
+        :return: indicates the row is expandable
+        :rtype: bool
+        """
+        status = self.results.data['status'][row]
+        return status != self.results.SKIPPED and status != IKSolver.Status.Failed.value
+
+    def toggleExpanded(self, row):
+        """Toggles the visibility of the joint details of the result in the given row
+
+        :param row: row index
+        :type row: int
+        """
+        if not self.isExpandable(row):
+            return
+
+        self.expanded.symmetric_difference_update({row})
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [self.ExpandedRole])
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return QtCore.QVariant()
+
+        row = index.row()
+        if role == QtCore.Qt.DisplayRole:
+            return self.results[row].id
+        elif role == self.ResultRole:
+            return self.results[row]
+        elif role == self.ExpandedRole:
+            return row in self.expanded
+
+        return QtCore.QVariant()
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+
+        if self.isExpandable(index.row()):
+            return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+        return QtCore.Qt.ItemIsSelectable
+
+
+class SimulationResultProxy(QtCore.QSortFilterProxyModel):
+    """Filters the skipped, failed or collision free results from the simulation result model. The
+    filter is computed for all results at once using the columns of the simulation result set."""
+    def __init__(self):
+        super().__init__()
+
+        self.hide_skipped = False
+        self.hide_failed = False
+        self.collisions_only = False
+        self._accepted = np.empty(0, bool)
+
+    def setFilter(self, hide_skipped=None, hide_failed=None, collisions_only=None):
+        """Sets the filter flags, a flag is unchanged if its value is None
+
+        :param hide_skipped: indicates skipped results are hidden
+        :type hide_skipped: Union[bool, None]
+        :param hide_failed: indicates failed results are hidden
+        :type hide_failed: Union[bool, None]
+        :param collisions_only: indicates only results with collisions are shown
+        :type collisions_only: Union[bool, None]
+        """
+        if hide_skipped is not None:
+            self.hide_skipped = hide_skipped
+        if hide_failed is not None:
+            self.hide_failed = hide_failed
+        if collisions_only is not None:
+            self.collisions_only = collisions_only
+
+        self._accepted = np.empty(0, bool)
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if source_row >= self._accepted.size:
+            results = self.sourceModel().results
+            accepted = np.ones(len(results), bool)
+            if self.hide_skipped:
+                accepted &= ~results.skipped
+            if self.hide_failed:
+                accepted[results.query(status=IKSolver.Status.Failed)] = False
+            if self.collisions_only:
+                collided = np.zeros(len(results), bool)
+                collided[results.query(collision=True)] = True
+                accepted &= collided
+            self._accepted = accepted
+
+        return bool(self._accepted[source_row])
+
+
+class SimulationResultDelegate(QtWidgets.QStyledItemDelegate):
+    """Renders the simulation results in the list view. Only the visible rows are painted and the size
+    of a row is computed from its content without laying out the text."""
+    ICON_SIZE = 25
+    MARGIN = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.icons = {}
+
+    def icon(self, name):
+        """Gets the pixmap for the icon with given name
+
+        :param name: icon file name
+        :type name: str
+        :return: pixmap
+        :rtype: QtGui.QPixmap
+        """
+        if name not in self.icons:
+            self.icons[name] = QtGui.QPixmap(path_for(name)).scaled(self.ICON_SIZE, self.ICON_SIZE)
+        return self.icons[name]
+
+    @staticmethod
+    def statusIcon(status):
+        """Gets the icon file name and tooltip for the solver status
+
+        :param status: solver status
+        :type status: IKSolver.Status
+        :return: icon file name and tooltip
+        :rtype: Tuple[str, str]
+        """
+        if status == IKSolver.Status.HardwareLimit:
+            return 'limit_hit.png', 'Hardware limits violation'
+        elif status == IKSolver.Status.Unreachable:
+            return 'unreachable.png', 'Orientation is not reachable by the positioner'
+        elif status == IKSolver.Status.DeformedVectors:
+            return 'deformed.png', 'Angle between measurement vectors does not match q-vectors'
+
+        return '', ''
+
+    def layout(self, index):
+        """Gets the header lines, icons, and details of the result
+
+        :param index: model index
+        :type index: QtCore.QModelIndex
+        :return: result, header lines, icons and joint details
+        :rtype: Tuple[SimulationResult, List[Tuple[str, bool]], List[Tuple[str, str]], List[str]]
+        """
+        model = index.model()
+        if isinstance(model, QtCore.QSortFilterProxyModel):
+            model = model.sourceModel()
+
+        result = index.data(SimulationResultModel.ResultRole)
+        title = f'{result.id} (Reused)' if result.reused else result.id
+        if result.skipped:
+            return result, [(title, False), (f'SKIPPED: {result.note}.', False)], [], []
+
+        if result.ik.status == IKSolver.Status.Failed:
+            return (result, [(title, False), ('A runtime error occurred. Check logs for more Information.', False)],
+                    [], [])
+
+        pos_err, orient_err = result.ik.position_error, result.ik.orientation_error
+        lines = [(title, False),
+                 (f'Position Error (mm): (X.) {pos_err[0]:.3f}, (Y.) {pos_err[1]:.3f}, (Z.) {pos_err[2]:.3f}',
+                  not result.ik.position_converged),
+                 (f'Orientation Error (degrees): (X.) {orient_err[0]:.3f}, (Y.) {orient_err[1]:.3f}, '
+                  f'(Z.) {orient_err[2]:.3f}', not result.ik.orientation_converged)]
+
+        if model.compute_path_length and result.path_length is not None:
+            path_length_info = ', '.join('({}) {:.3f}'.format(*l) for l in zip(model.detector_names,
+                                                                                result.path_length))
+            lines.append((f'Path Length: {path_length_info}', False))
+
+        if model.check_collision and result.path_collision is not None:
+            lines.append((f'Path Collision: first contact at {100 * result.path_collision:.1f}% of the move from '
+                          f'the previous measurement', True))
+
+        if model.check_collision and result.clearance is not None:
+            below_margin = result.clearance < model.clearance_margin
+            note = f' (below the {model.clearance_margin:.3f} mm margin)' if below_margin else ''
+            lines.append((f'Clearance (mm): {result.clearance:.3f}{note}', below_margin))
+
+        if result.note:
+            lines.append((f'{result.note}.', True))
+
+        icons = []
+        if model.check_collision and (np.any(result.collision_mask) or result.path_collision is not None):
+            icons.append(('collision.png', 'Collision Detected'))
+        icon = self.statusIcon(result.ik.status)
+        if icon[0]:
+            icons.append(icon)
+
+        details = []
+        if index.data(SimulationResultModel.ExpandedRole):
+            details = ['{:<20}{:>12.3f}'.format(*t) for t in zip(result.joint_labels, result.formatted)]
+
+        return result, lines, icons, details
+
+    def sizeHint(self, option, index):
+        _, lines, icons, details = self.layout(index)
+        metrics = QtGui.QFontMetrics(option.font)
+        height = 2 * self.MARGIN + len(lines) * metrics.lineSpacing()
+        if icons:
+            height += self.ICON_SIZE + self.MARGIN
+        if details:
+            monospace = QtGui.QFontMetrics(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+            height += 2 * self.MARGIN + len(details) * monospace.lineSpacing()
+
+        return QtCore.QSize(option.rect.width(), height)
+
+    def paint(self, painter, option, index):
+        result, lines, icons, details = self.layout(index)
+        painter.save()
+
+        rect = option.rect
+        enabled = bool(index.flags() & QtCore.Qt.ItemIsEnabled)
+        if enabled and result.ik.status != IKSolver.Status.Converged:
+            painter.fillRect(rect, QtGui.QColor('#F4D03F'))
+        elif not result.skipped and result.ik.status == IKSolver.Status.Failed:
+            painter.fillRect(rect, QtGui.QColor('#CD6155'))
+        if option.state & QtWidgets.QStyle.State_Selected:
+            painter.fillRect(rect, option.palette.highlight().color().lighter(160))
+
+        text_colour = option.palette.text().color() if enabled else option.palette.color(QtGui.QPalette.Disabled,
+                                                                                          QtGui.QPalette.Text)
+        metrics = QtGui.QFontMetrics(option.font)
+        y = rect.top() + self.MARGIN
+        x = rect.left() + self.MARGIN
+        width = rect.width() - 2 * self.MARGIN
+        for text, highlight in lines:
+            painter.setPen(QtGui.QColor('red') if highlight else text_colour)
+            painter.drawText(QtCore.QRect(x, y, width, metrics.lineSpacing()),
+                             QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter, text)
+            y += metrics.lineSpacing()
+
+        if icons:
+            y += self.MARGIN
+            for i, (name, _) in enumerate(icons):
+                painter.drawPixmap(x + i * (self.ICON_SIZE + self.MARGIN), y, self.icon(name))
+            y += self.ICON_SIZE
+
+        if enabled:
+            arrow = self.icon('down_arrow.png' if details else 'right_arrow.png')
+            painter.drawPixmap(rect.right() - self.MARGIN - self.ICON_SIZE, rect.top() + self.MARGIN, arrow)
+
+        if details:
+            font = QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont)
+            monospace = QtGui.QFontMetrics(font)
+            y += 2 * self.MARGIN
+            painter.setFont(font)
+            painter.setPen(text_colour)
+            for text in details:
+                painter.drawText(QtCore.QRect(x, y, width, monospace.lineSpacing()), QtCore.Qt.AlignHCenter, text)
+                y += monospace.lineSpacing()
+
+        painter.setPen(QtGui.QColor('gray'))
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+        painter.restore()
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QtCore.QEvent.ToolTip and index.isValid():
+            _, lines, icons, _ = self.layout(index)
+            metrics = QtGui.QFontMetrics(option.font)
+            top = option.rect.top() + 2 * self.MARGIN + len(lines) * metrics.lineSpacing()
+            for i, (_, tool_tip) in enumerate(icons):
+                left = option.rect.left() + self.MARGIN + i * (self.ICON_SIZE + self.MARGIN)
+                if QtCore.QRect(left, top, self.ICON_SIZE, self.ICON_SIZE).contains(event.pos()):
+                    QtWidgets.QToolTip.showText(event.globalPos(), tool_tip, view)
+                    return True
+            QtWidgets.QToolTip.hideText()
+            return True
+
+        return super().helpEvent(event, view, option, index)
@@ -1,15 +1,18 @@
 from contextlib import suppress
 from collections import OrderedDict, namedtuple
 import json
+import logging
 import os
 import numpy as np
-from PyQt5 .QtCore import pyqtSignal, QObject
+from PyQt5.QtCore import pyqtSignal, QObject, QTimer
 from sscanss.config import settings, INSTRUMENTS_PATH
-from sscanss.core.instrument import read_instrument_description_file, Sequence, Simulation
+from sscanss.core.instrument import (read_instrument_description_file, Simulation, SimulationServer,
+                                     RemoteSimulationServer, Checkpoint, checkpoint_path)
 from sscanss.core.io import (write_project_hdf, read_project_hdf, read_3d_model, read_points, read_vectors,
-                             write_binary_stl, write_points, validate_vector_length)
+                             write_binary_stl, write_points, validate_vector_length, read_simulation_hdf)
 from sscanss.core.scene import validate_instrument_scene_size
 from sscanss.core.util import PointType, LoadVector, Attributes, POINT_DTYPE
+from sscanss.ui.util import Sequence
 
 
 IDF = namedtuple('IDF', ['name', 'path', 'version'])
@@ -36,7 +39,14 @@ class MainWindowModel(QObject):
         self.save_path = ''
         self.all_sample_key = 'All Samples'
 
-        self.simulation = None
+        self._simulation = None
+        self.saved_simulation = None
+        self.simulation_server = SimulationServer()
+        self.simulation_server_address = ''
+        self.simulation_cache = {}
+        self.simulation_timer = QTimer()
+        self.simulation_timer.setInterval(20)
+        self.simulation_timer.timeout.connect(self.checkSimulation)
         self.instruments = {}
         self.updateInstrumentList()
 
@@ -90,6 +100,55 @@ class MainWindowModel(QObject):
                 if name and version:
                     self.instruments[name] = IDF(name, idf, version)
 
+    @property
+    def simulation(self):
+        """Gets the simulation. The results saved in the project file are loaded on first access
+
+        :return: simulation
+        :rtype: Union[Simulation, None]
+        """
+        if self._simulation is None and self.saved_simulation is not None:
+            filename, self.saved_simulation = self.saved_simulation, None
+            try:
+                self._simulation = self.loadSimulation(filename)
+            except (OSError, KeyError, ValueError):
+                logging.exception(f'The simulation results could not be loaded from the project ({filename})')
+
+        return self._simulation
+
+    @simulation.setter
+    def simulation(self, value):
+        """Sets the simulation and discards the results saved in the project file
+
+        :param value: simulation
+        :type value: Union[Simulation, None]
+        """
+        self._simulation = value
+        self.saved_simulation = None
+
+    def loadSimulation(self, filename):
+        """Creates a simulation with the results saved in the project file. The results are marked as
+        stale if the project was changed since the simulation was run
+
+        :param filename: path of the project file
+        :type filename: str
+        :return: simulation
+        :rtype: Simulation
+        """
+        data = read_simulation_hdf(filename)
+        simulation = Simulation(self.instrument, self.sample, self.measurement_points, self.measurement_vectors,
+                                self.alignment, server=self.simulation_server, cache=self.simulation_cache)
+        simulation.args['align_first_order'] = data['align_first_order']
+        simulation.compute_path_length = data['compute_path_length']
+        simulation.check_collision = data['check_collision']
+        simulation.check_limits = data['check_limits']
+        if simulation.shape != data['shape'] or simulation.detector_names != data['detector_names']:
+            raise ValueError('The saved simulation results do not match the project')
+
+        simulation.restore(data['results'], data['input_digest'])
+
+        return simulation
+
     def createProjectData(self, name, instrument=None):
         """Creates a new project
 
@@ -130,7 +189,7 @@ class MainWindowModel(QObject):
         :param filename: filename
         :type filename: str
         """
-        write_project_hdf(self.project_data, filename)
+        write_project_hdf(self.project_data, filename, self.simulation)
 
     def changeInstrument(self, name):
         """Change current instrument to specified
@@ -192,6 +251,10 @@ class MainWindowModel(QObject):
         for key, value in data['settings'].items():
             settings.local[key] = value
 
+        self.simulation = None
+        if data['has_simulation'] and data['alignment'] is not None:
+            self.saved_simulation = filename
+
         self.notifyChange(Attributes.Sample)
         self.notifyChange(Attributes.Fiducials)
         self.notifyChange(Attributes.Vectors)
@@ -556,14 +619,47 @@ class MainWindowModel(QObject):
         :type check_limits: bool
         :param check_collision: flag indicates if simulation checks for collision
         :type check_collision: bool
+        :raises: OSError, ValueError
         """
+        address = settings.value(settings.Key.Server_Address)
+        if address != self.simulation_server_address:
+            # The job server for remote workers replaces the local workers when an address is set
+            server = RemoteSimulationServer(address) if address else SimulationServer()
+            self.simulation_server.stop()
+            self.simulation_server = server
+            self.simulation_server_address = address
+
         self.simulation = Simulation(self.instrument,
                                      self.sample,
                                      self.measurement_points,
                                      self.measurement_vectors,
-                                     self.alignment)
+                                     self.alignment,
+                                     server=self.simulation_server,
+                                     cache=self.simulation_cache)
         self.simulation.compute_path_length = compute_path_length
         self.simulation.render_graphics = render_graphics
         self.simulation.check_limits = check_limits
         self.simulation.check_collision = check_collision
+        self.simulation.checkpoint = Checkpoint(checkpoint_path(self.save_path if self.save_path
+                                                                else self.project_data['name']))
         self.simulation_created.emit()
+
+    def startSimulation(self, resume=False):
+        """Starts the simulation and periodically checks for results until the simulation stops
+
+        :param resume: indicates the simulation should continue from the checkpoint
+        :type resume: bool
+        """
+        self.simulation.stopped.connect(self.simulation_timer.stop)
+        self.simulation.start(resume)
+        self.simulation_timer.start()
+
+    def checkSimulation(self):
+        """Checks for new simulation results and stops the timer when the simulation is not running"""
+        if self.simulation is None:
+            self.simulation_timer.stop()
+            return
+
+        self.simulation.checkResult()
+        if not self.simulation.isRunning():
+            self.simulation_timer.stop()
@@ -12,9 +12,10 @@ from sscanss.ui.commands import (InsertPrimitive, DeleteSample, MergeSample,
                                  IgnoreJointLimits, MovePositioner, ChangePositioningStack, ChangePositionerBase,
                                  ChangeCollimator, ChangeJawAperture, RemoveVectorAlignment, InsertAlignmentMatrix)
 from sscanss.core.io import read_trans_matrix, read_fpos, read_robot_world_calibration_file
-from sscanss.core.util import TransformType, MessageSeverity, Worker, toggleActionInGroup, PointType
+from sscanss.core.util import TransformType, MessageSeverity, toggleActionInGroup, PointType
 from sscanss.core.instrument import robot_world_calibration
 from sscanss.core.math import matrix_from_pose, find_3d_correspondence, rigid_transform, check_rotation, VECTOR_EPS
+from sscanss.ui.util import Worker
 
 
 @unique
@@ -769,17 +770,13 @@ class MainWindowPresenter:
             self.view.showMessage(f'Incorrect number of joint offsets in fpos file, received {poses.shape[1]} '
                                   f'but expected {link_count}')
             return
-        q = positioner.set_points
-        end_q = q
+        end_q = positioner.set_points
         if poses.size != 0:
-            for i, pose in enumerate(poses):
-                pose = positioner.fromUserFormat(pose)
-                end_q = pose
-                matrix = (positioner.fkine(pose, ignore_locks=True) @ positioner.tool_link).inverse()
-                offset = matrix[0:3, 3].transpose()
-                points[i, :] = points[i, :] @ matrix[0:3, 0:3].transpose() + offset
-
-            positioner.fkine(q, ignore_locks=True)
+            poses = np.array([positioner.fromUserFormat(pose) for pose in poses])
+            end_q = poses[-1].tolist()
+            matrices = np.linalg.inv(positioner.fkineMany(poses, ignore_locks=True) @ positioner.tool_link[:, :])
+            count = matrices.shape[0]
+            points[:count, :] = np.einsum('nij,nj->ni', matrices[:, 0:3, 0:3], points[:count, :]) + matrices[:, 0:3, 3]
 
         enabled = self.model.fiducials[index].enabled
         result = self.rigidTransform(index, points, enabled)
@@ -864,7 +861,6 @@ class MainWindowPresenter:
             points.append(measured_points[temp, :])
             pool.append(poses[temp[0], :])
 
-        base_to_end = []
         sensor_to_tool = []
 
         link_count = len(positioner.links)
@@ -876,14 +872,11 @@ class MainWindowPresenter:
         fiducials = self.model.fiducials.points
         adj_fiducials = fiducials - np.mean(fiducials, axis=0)
 
-        q = positioner.set_points
-
         for i in range(number_of_poses):
-            pose = positioner.fromUserFormat(pool[i])
-            base_to_end.append(positioner.fkine(pose, include_base=False, ignore_locks=True))
             sensor_to_tool.append(rigid_transform(adj_fiducials[indices[i], :], points[i]).matrix)
 
-        positioner.fkine(q, ignore_locks=True)
+        pool = np.array([positioner.fromUserFormat(pose) for pose in pool])
+        base_to_end = positioner.fkineMany(pool, include_base=False, ignore_locks=True)
         try:
             tool_matrix, base_matrix = robot_world_calibration(base_to_end, sensor_to_tool)
         except np.linalg.LinAlgError as e:
@@ -937,8 +930,12 @@ class MainWindowPresenter:
         reference = self.model.fiducials[index].points
         return rigid_transform(reference[enabled], points[enabled])
 
-    def runSimulation(self):
-        """Create and start new simulation"""
+    def runSimulation(self, resume=False):
+        """Create and start new simulation
+
+        :param resume: indicates the simulation should continue from the checkpoint of an aborted simulation
+        :type resume: bool
+        """
         if self.model.alignment is None:
             self.view.showMessage('Sample must be aligned on the instrument for Simulation',
                                   MessageSeverity.Information)
@@ -970,12 +967,21 @@ class MainWindowPresenter:
         render_graphics = self.view.show_sim_graphics_action.isChecked()
         check_limits = self.view.check_limits_action.isChecked()
 
-        self.model.createSimulation(compute_path_length, render_graphics, check_limits, check_collision)
-        # Start the simulation process. This can be slow due to pickling of arguments
-        self.model.simulation.start()
+        try:
+            self.model.createSimulation(compute_path_length, render_graphics, check_limits, check_collision)
+        except (OSError, ValueError) as e:
+            self.notifyError(f'The simulation job server could not be started at the address in Preferences '
+                             f'({settings.value(settings.Key.Server_Address)}).', e)
+            return
+        # Start the simulation. Only arguments that changed since the last run are sent to the workers
+        self.model.startSimulation(resume)
 
     def stopSimulation(self):
         """Stops simulation"""
+        if self.model.saved_simulation is not None:
+            # The results saved in the project are not loaded, so no simulation is running
+            return
+
         if self.model.simulation is None or not self.model.simulation.isRunning():
             return
 
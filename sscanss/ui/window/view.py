@@ -267,7 +267,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.run_simulation_action.setStatusTip('Start new simulation')
         self.run_simulation_action.setShortcut('F5')
         self.run_simulation_action.setIcon(QtGui.QIcon(path_for('play.png')))
-        self.run_simulation_action.triggered.connect(self.presenter.runSimulation)
+        self.run_simulation_action.triggered.connect(lambda: self.presenter.runSimulation())
+
+        self.resume_simulation_action = QtWidgets.QAction('Res&ume Simulation', self)
+        self.resume_simulation_action.setStatusTip('Continue the last stopped simulation from its checkpoint')
+        self.resume_simulation_action.setShortcut('Ctrl+F5')
+        self.resume_simulation_action.triggered.connect(lambda: self.presenter.runSimulation(resume=True))
 
         self.stop_simulation_action = QtWidgets.QAction('&Stop Simulation', self)
         self.stop_simulation_action.setStatusTip('Stop active simulation')
@@ -450,6 +455,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
         simulation_menu = main_menu.addMenu('&Simulation')
         simulation_menu.addAction(self.run_simulation_action)
+        simulation_menu.addAction(self.resume_simulation_action)
         simulation_menu.addAction(self.stop_simulation_action)
         simulation_menu.addSeparator()
         simulation_menu.addAction(self.check_limits_action)
@@ -504,6 +510,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.instrument_menu.setEnabled(enable)
 
         self.run_simulation_action.setEnabled(enable)
+        self.resume_simulation_action.setEnabled(enable)
         self.stop_simulation_action.setEnabled(enable)
         self.check_limits_action.setEnabled(enable)
         self.show_sim_graphics_action.setEnabled(enable)
@@ -0,0 +1,86 @@
+"""
+Command line interface for running simulation workers for a job server on another machine. The job server is
+started by the graphical user interface when a server address is set in the preferences or by
+"python -m sscanss.simulate --listen". The workers and server must use the same authentication key which is
+set with the SSCANSS_AUTHKEY environment variable. The worker does not import Qt.
+
+Usage: python -m sscanss.worker host:port [options]
+"""
+import argparse
+import logging
+import multiprocessing
+import sys
+from sscanss.config import setup_logging
+from sscanss.core.instrument import run_worker
+from sscanss.core.instrument.remote import get_authkey, parse_address
+
+
+def create_parser():
+    """Creates the argument parser of the simulation worker
+
+    :return: argument parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog='python -m sscanss.worker',
+                                     description='Runs simulation workers for a SScanSS 2 job server.')
+    parser.add_argument('address', metavar='HOST:PORT', help='address of the job server')
+    parser.add_argument('-p', '--processes', type=int, default=1, help='number of worker processes (default: 1)')
+
+    return parser
+
+
+def work(address):
+    """Runs a simulation worker and exits with a non-zero exit code if the worker could not connect
+
+    :param address: address ("host:port") of the job server
+    :type address: str
+    """
+    try:
+        run_worker(address)
+    except (OSError, ValueError, multiprocessing.AuthenticationError) as e:
+        logging.error(f'A simulation worker could not connect to the job server ({address}): {e}')
+        sys.exit(1)
+
+
+def main(argv=None):
+    """Runs the simulation workers until the job server stops
+
+    :param argv: command line arguments
+    :type argv: Union[List[str], None]
+    :return: exit code
+    :rtype: int
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    try:
+        parse_address(args.address)
+        get_authkey()
+    except ValueError as e:
+        parser.error(str(e))
+
+    processes = [multiprocessing.Process(target=work, args=(args.address,))
+                 for _ in range(max(args.processes, 1))]
+    for process in processes:
+        process.start()
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        return 1
+
+    if any(process.exitcode != 0 for process in processes):
+        print(f'error: a simulation worker could not connect to the job server ({args.address})', file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    setup_logging('worker.log')
+    exit_status = main()
+    logging.shutdown()
+    sys.exit(exit_status)
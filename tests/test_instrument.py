@@ -1,13 +1,16 @@
 import copy
 import json
+import pathlib
+import tempfile
 import unittest
 import unittest.mock as mock
 from jsonschema.exceptions import ValidationError
 import numpy as np
-from sscanss.core.math import Matrix44
+from sscanss.core.math import Matrix44, matrix_from_xyz_eulers
 from sscanss.core.geometry import Mesh
 from sscanss.core.instrument.instrument import PositioningStack, Script
-from sscanss.core.instrument.robotics import joint_space_trajectory, Link, SerialManipulator
+from sscanss.core.instrument.reachability import direction_bins, ReachabilityMap
+from sscanss.core.instrument.robotics import joint_space_trajectory, IKBackend, IKSolver, Link, SerialManipulator
 from sscanss.core.instrument.create import (read_instrument_description_file, read_jaw_description, check,
                                             read_positioners_description, read_detector_description,
                                             read_positioning_stacks_description, read_fixed_hardware_description,
@@ -32,7 +35,16 @@ class TestInstrument(unittest.TestCase):
             self.assertRaises(ValidationError, read_instrument_description_file, '')
 
         with mock.patch('sscanss.core.instrument.create.open', mock.mock_open(read_data=SAMPLE_IDF)):
-            read_instrument_description_file('')
+            self.assertIsNone(read_instrument_description_file('').collision_decimation)
+
+        instrument['collision_decimation'] = 0
+        with mock.patch('sscanss.core.instrument.create.open', mock.mock_open(read_data=json.dumps(idf))):
+            self.assertRaises(ValidationError, read_instrument_description_file, '')
+
+        instrument['collision_decimation'] = 5000
+        with mock.patch('sscanss.core.instrument.create.open', mock.mock_open(read_data=json.dumps(idf))):
+            self.assertEqual(read_instrument_description_file('').collision_decimation, 5000)
+        instrument.pop('collision_decimation')
 
         instrument['name'] = 'None'
         self.assertRaises(ValueError, check, instrument, 'name', 'instrument', name=True)
@@ -299,6 +311,225 @@ class TestInstrument(unittest.TestCase):
         expected_result = [[1, 0, 0, 12], [0, 1, 0, 165], [0, 0, 1, 0], [0, 0, 0, 1]]
         np.testing.assert_array_almost_equal(ps.pose, expected_result, decimal=5)
 
+        ps = PositioningStack(s1.name, s1)
+        ps.addPositioner(s2)
+        ps.fkine([0, 0, 0, np.pi/4])
+        s2.links[1].locked = True
+        configurations = np.array([[100, -50, np.pi/2, np.pi/2], [10, 5, -np.pi/3, np.pi/6], [0, 0, 0, 0]])
+        poses = ps.fkineMany(configurations)
+        self.assertEqual(poses.shape, (3, 4, 4))
+        np.testing.assert_array_almost_equal(ps.configuration, [0, 0, 0, np.pi/4], decimal=5)
+        for pose, q in zip(poses, configurations):
+            np.testing.assert_array_almost_equal(pose, ps.fkine(q), decimal=5)
+        np.testing.assert_array_almost_equal(ps.configuration, [0, 0, 0, np.pi/4], decimal=5)
+
+        poses = ps.fkineMany(configurations, ignore_locks=True)
+        for pose, q in zip(poses, configurations):
+            np.testing.assert_array_almost_equal(pose, ps.fkine(q, ignore_locks=True), decimal=5)
+
+        poses = s2.fkineMany(configurations[:, 2:], start_index=1, include_base=False)
+        for pose, q in zip(poses, configurations[:, 2:]):
+            np.testing.assert_array_almost_equal(pose, s2.fkine(q, start_index=1, include_base=False), decimal=5)
+
+    def testJacobian(self):
+        q1 = Link('', [0.0, 1.0, 0.0], [0.0, 0.0, 0.0], Link.Type.Prismatic, -3.14, 3.14, 0)
+        q2 = Link('', [0.0, 0.0, 2.0], [10.0, 0.0, 0.0], Link.Type.Revolute, -3.14, 3.14, 0)
+        q3 = Link('', [1.0, 0.0, 0.0], [0.0, 5.0, 2.0], Link.Type.Revolute, -3.14, 3.14, 0)
+        q4 = Link('', [0.0, 1.0, 1.0], [3.0, 0.0, 1.0], Link.Type.Revolute, -3.14, 3.14, 0)
+
+        s1 = SerialManipulator('', [q1, q2], base=Matrix44.fromTranslation([0, 0, 5.0]))
+        s2 = SerialManipulator('', [q3, q4], tool=Matrix44.fromTranslation([1.0, 2.0, 0]))
+        ps = PositioningStack(s1.name, s1)
+        ps.addPositioner(s2)
+
+        q = np.array([20, np.pi/3, -np.pi/4, np.pi/6])
+        pose = ps.fkine(q)
+        jacobian = ps.jacobian()
+        self.assertEqual(jacobian.shape, (6, 4))
+        np.testing.assert_array_almost_equal(ps.configuration, q, decimal=5)
+        np.testing.assert_array_almost_equal(jacobian[3:6, 0], [0, 0, 0], decimal=5)
+        np.testing.assert_array_almost_equal(jacobian[3:6, 1], [0, 0, 1], decimal=5)
+
+        epsilon = 1e-6
+        for i in range(4):
+            delta = np.zeros(4)
+            delta[i] = epsilon
+            velocity = (ps.fkine(q + delta)[0:3, 3] - pose[0:3, 3]) / epsilon
+            np.testing.assert_array_almost_equal(jacobian[0:3, i], velocity, decimal=4)
+
+        for vectors in [[[0.0, 0.0, 1.0]], [[0.0, 0.0, 1.0], [0.0, 1.0, 0.0]]]:
+            ps.fkine(np.zeros(4))
+            solver = ps.ik_solver
+            solver.start = np.zeros(4)
+            solver.chain = ps.compile()
+            solver.active_joints = [True, True, False, True]
+            solver.best_result = np.inf
+            solver.current_position, solver.target_position = np.array([1.0, -2.0, 3.0]), np.array([5.0, 2.0, -1.0])
+            solver.current_orientation = np.array(vectors)
+            solver.target_orientation = np.array(vectors) @ matrix_from_xyz_eulers([0.2, -0.4, 0.7])[:, :]
+
+            analytic_gradient = np.zeros(3)
+            solver.objective(q[solver.active_joints], analytic_gradient)
+            solver.numerical_gradient = True
+            numerical_gradient = np.zeros(3)
+            solver.objective(q[solver.active_joints], numerical_gradient)
+            solver.numerical_gradient = False
+            np.testing.assert_allclose(analytic_gradient, numerical_gradient, rtol=1e-3)
+
+            x = q[solver.active_joints]
+            residuals, residual_jacobian = solver.residuals(x)
+            self.assertEqual(residual_jacobian.shape, (residuals.size, 3))
+            for i in range(3):
+                delta = np.zeros(3)
+                delta[i] = epsilon
+                # orientation rows use the angular velocity so only the position rows are exact
+                derivative = (solver.residuals(x + delta)[0] - residuals) / epsilon
+                np.testing.assert_allclose(residual_jacobian[0:3, i], derivative[0:3], atol=1e-3)
+
+    def testIKBackends(self):
+        q1 = Link('', [0.0, 0.0, 1.0], [0.0, 0.0, 0.0], Link.Type.Revolute, -np.pi, np.pi, 0)
+        q2 = Link('', [1.0, 0.0, 0.0], [0.0, 0.0, 0.0], Link.Type.Prismatic, -200.0, 200.0, 0)
+        q3 = Link('', [0.0, 1.0, 0.0], [0.0, 0.0, 0.0], Link.Type.Prismatic, -200.0, 200.0, 0)
+        q4 = Link('', [0.0, 0.0, 1.0], [0.0, 0.0, 0.0], Link.Type.Prismatic, -200.0, 200.0, 0)
+        s1 = SerialManipulator('', [q1, q2, q3, q4])
+        ps = PositioningStack(s1.name, s1)
+
+        expected = np.array([np.pi / 4, 30.0, -50.0, 20.0])
+        pose = ps.fkine(expected)
+        point = np.array([10.0, 5.0, -2.0])
+        vector = np.array([[1.0, 0.0, 0.0]])
+        current = (pose[0:3, 0:3].transpose() @ (point - pose[0:3, 3]), vector @ pose[0:3, 0:3])
+
+        for backend in IKSolver.Backend:
+            ps.fkine(np.zeros(4))
+            result = ps.ikine(current, (point, vector), backend=backend.value)
+            self.assertEqual(result.status, IKSolver.Status.Converged, backend)
+            np.testing.assert_array_almost_equal(result.q, expected, decimal=2)
+            self.assertGreater(result.evaluations, 0)
+            self.assertIs(ps.ik_solver.backend, IKSolver.backends[backend])
+
+        self.assertRaises(ValueError, ps.ikine, current, (point, vector), backend='unknown')
+        self.assertRaises(TypeError, IKBackend)
+
+        ps.fkine(np.zeros(4))
+        result = ps.ikine(current, (point, vector), decoupled=True)
+        self.assertEqual(result.status, IKSolver.Status.Converged)
+        np.testing.assert_array_almost_equal(result.q, expected, decimal=2)
+        self.assertLess(result.evaluations, 20)
+
+        # Prismatic joints out of bounds for the only orientation solution so the optimizer is used
+        ps.links[1].upper_limit = 20.0
+        ps.fkine(np.zeros(4))
+        with mock.patch.object(IKSolver.backends[IKSolver.Backend.NLopt], 'search') as search:
+            result = ps.ikine(current, (point, vector), decoupled=True)
+            search.assert_called_once()
+        self.assertNotEqual(result.status, IKSolver.Status.Converged)
+
+        # The decoupled attempts and warm started optimization share the local evaluation budget
+        ps.fkine(np.zeros(4))
+        with mock.patch.object(IKSolver.backends[IKSolver.Backend.NLopt], 'search'), \
+                mock.patch.object(ps.ik_solver, 'jointLimitCheck', return_value=False):
+            result = ps.ikine(current, (point, vector), decoupled=True, local_max_eval=4, seed=np.zeros(4))
+        self.assertEqual(result.evaluations, 4)
+
+        # Only two prismatic joints so the structure does not apply
+        s2 = SerialManipulator('', [q1, q2, q3])
+        ps = PositioningStack(s2.name, s2)
+        ps.fkine(np.zeros(3))
+        solver = ps.ik_solver
+        with mock.patch.object(solver, 'residuals', wraps=solver.residuals) as residuals:
+            result = ps.ikine(current, (point, vector), decoupled=True)
+            residuals.assert_not_called()
+        self.assertNotEqual(result.status, IKSolver.Status.Converged)
+
+    def testReachabilityMap(self):
+        vectors = np.array([[1., 0., 0.], [-1., 0., 0.], [0., 0., 1.], [0.6, 0.8, 0.], [0.6, -0.8, 0.]])
+        bins = direction_bins(vectors, 4)
+        self.assertEqual(len(set(bins)), 5)
+        self.assertTrue(np.all((bins >= 0) & (bins < 96)))
+
+        q1 = Link('', [0.0, 0.0, 1.0], [0.0, 0.0, 0.0], Link.Type.Revolute, -np.pi, np.pi, 0)
+        q2 = Link('', [1.0, 0.0, 0.0], [0.0, 0.0, 0.0], Link.Type.Prismatic, -200.0, 200.0, 0)
+        q3 = Link('', [0.0, 1.0, 0.0], [0.0, 0.0, 0.0], Link.Type.Prismatic, -200.0, 200.0, 0)
+        s1 = SerialManipulator('', [q1, q2, q3])
+        ps = PositioningStack(s1.name, s1)
+        gauge_volume = np.zeros(3)
+        q_vectors = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+        reachability_map = ReachabilityMap.build(ps, gauge_volume, q_vectors, sample_count=20000)
+
+        target = (gauge_volume, q_vectors[0:1])
+        reachable, configuration = reachability_map.query((np.array([10.0, 5.0, 0.0]), np.array([[0.0, 1.0, 0.0]])),
+                                                          target)
+        self.assertTrue(reachable)
+        pose = ps.fkine(configuration)
+        np.testing.assert_allclose(pose[0:3, 0:3] @ [0.0, 1.0, 0.0], q_vectors[0], atol=0.5)
+        np.testing.assert_allclose(pose[0:3, 0:3] @ [10.0, 5.0, 0.0] + pose[0:3, 3], gauge_volume,
+                                   atol=3 * reachability_map.voxel_size)
+
+        # The stack cannot move the point along z or tilt the vector out of the xy plane
+        self.assertFalse(reachability_map.query((np.array([10.0, 5.0, 50.0]), np.array([[0.0, 1.0, 0.0]])),
+                                                target)[0])
+        self.assertFalse(reachability_map.query((np.array([10.0, 5.0, 0.0]), np.array([[0.0, 0.0, 1.0]])),
+                                                target)[0])
+        self.assertFalse(reachability_map.query((np.array([1000.0, 5.0, 0.0]), np.array([[0.0, 1.0, 0.0]])),
+                                                target)[0])
+        # The map cannot answer for other targets
+        self.assertTupleEqual(reachability_map.query((np.array([10.0, 5.0, 50.0]), np.array([[0.0, 1.0, 0.0]])),
+                                                     (gauge_volume, np.array([[0.0, 0.0, 1.0]]))), (True, None))
+
+        ps.fkine(np.zeros(3))
+        result = ps.ikine((np.array([10.0, 5.0, 50.0]), np.array([[0.0, 1.0, 0.0]])), target,
+                          reachability_map=reachability_map)
+        self.assertEqual(result.status, IKSolver.Status.Unreachable)
+        self.assertEqual(result.evaluations, 0)
+        result = ps.ikine((np.array([10.0, 5.0, 0.0]), np.array([[0.0, 1.0, 0.0]])), target,
+                          reachability_map=reachability_map)
+        self.assertEqual(result.status, IKSolver.Status.Converged)
+
+        with tempfile.TemporaryDirectory() as test_dir:
+            filename = pathlib.Path(test_dir, 'map', 'test.npz')
+            reachability_map.save(filename)
+            loaded_map = ReachabilityMap.load(filename)
+        np.testing.assert_array_equal(loaded_map.keys, reachability_map.keys)
+        np.testing.assert_array_equal(loaded_map.configurations, reachability_map.configurations)
+        np.testing.assert_array_equal(loaded_map.shape, reachability_map.shape)
+        self.assertEqual(loaded_map.voxel_size, reachability_map.voxel_size)
+        self.assertEqual(loaded_map.resolution, reachability_map.resolution)
+
+    def testKinematicChain(self):
+        q1 = Link('', [0.0, 1.0, 0.0], [0.0, 0.0, 0.0], Link.Type.Prismatic, -3.14, 3.14, 0, self.mesh)
+        q2 = Link('', [0.0, 0.0, 1.0], [10.0, 0.0, 0.0], Link.Type.Revolute, -3.14, 3.14, 0, self.mesh)
+        q3 = Link('', [1.0, 0.0, 0.0], [0.0, 5.0, 2.0], Link.Type.Revolute, -3.14, 3.14, 0)
+        q4 = Link('', [0.0, 1.0, 1.0], [3.0, 0.0, 1.0], Link.Type.Prismatic, -3.14, 3.14, 0, self.mesh)
+
+        s1 = SerialManipulator('', [q1, q2], base=Matrix44.fromTranslation([0, 0, 5.0]), base_mesh=self.mesh,
+                               tool=Matrix44.fromTranslation([0, 2.0, 0]))
+        s2 = SerialManipulator('', [q3, q4], tool=Matrix44.fromTranslation([1.0, 2.0, 0]), base_mesh=self.mesh)
+        ps = PositioningStack(s1.name, s1)
+        ps.addPositioner(s2)
+        ps.changeBaseMatrix(s2, Matrix44.fromTranslation([0, 1.0, 1.0]))
+        ps.fkine([0, 0, np.pi/8, 0])
+        q3.locked = True
+
+        chain = ps.compile()
+        self.assertEqual(chain.numberOfLinks, 4)
+        np.testing.assert_array_almost_equal(chain.tool_link, ps.tool_link, decimal=5)
+        self.assertRaises(ValueError, chain.axes.__setitem__, 0, [1, 0, 0])
+
+        q = [20, np.pi/3, -np.pi/4, 2.0]
+        pose = chain.pose(q)
+        jacobian = chain.jacobian(q)
+        transforms = chain.modelTransforms(q)
+        np.testing.assert_array_almost_equal(ps.configuration, [0, 0, np.pi/8, 0], decimal=5)
+
+        np.testing.assert_array_almost_equal(pose, ps.fkine(q), decimal=5)
+        np.testing.assert_array_almost_equal(jacobian, ps.jacobian(), decimal=5)
+        expected_transforms = ps.model().transforms
+        self.assertEqual(len(transforms), 5)
+        self.assertEqual(len(transforms), len(expected_transforms))
+        for transform, expected in zip(transforms, expected_transforms):
+            np.testing.assert_array_almost_equal(transform, expected, decimal=5)
+
     def testScriptTemplate(self):
         template = '{{filename}}\nCount = {{count}}\n{{#script}}\n{{position}} {{mu_amps}}\n{{/script}}\n{{header}}'
         script = Script(template)
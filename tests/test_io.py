@@ -42,6 +42,7 @@ class TestIO(unittest.TestCase):
 
         writer.write_project_hdf(data, filename)
         result, instrument = reader.read_project_hdf(filename)
+        self.assertIsNone(instrument.collision_decimation)
 
         self.assertEqual(__version__, result['version'])
         self.assertEqual(data['instrument_version'], result['instrument_version'])
@@ -88,6 +89,7 @@ class TestIO(unittest.TestCase):
         instrument.positioning_stack.changeBaseMatrix(aux, base)
 
         instrument.jaws.aperture = jaw_aperture
+        instrument.collision_decimation = 5000
         instrument.jaws.positioner.fkine([-600.0])
         instrument.jaws.positioner.links[0].ignore_limits = True
         instrument.jaws.positioner.links[0].locked = True
@@ -123,6 +125,7 @@ class TestIO(unittest.TestCase):
         self.assertEqual(tuple(setting['colour']), (1, 1, 1, 1))
 
         self.assertEqual(instrument.positioning_stack.name, instrument2.positioning_stack.name)
+        self.assertEqual(instrument2.collision_decimation, 5000)
         np.testing.assert_array_almost_equal(instrument.positioning_stack.configuration,
                                              instrument2.positioning_stack.configuration, decimal=5)
         for link1, link2 in zip(instrument.positioning_stack.links, instrument2.positioning_stack.links):
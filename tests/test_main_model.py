@@ -50,11 +50,11 @@ class TestMainWindowModel(unittest.TestCase):
     def testLoadAndSaveProject(self, write_fn, load_fn, settings):
         settings.local = {}
         self.model.saveProjectData('demo.hdf')
-        write_fn.assert_called_once_with(None, 'demo.hdf')
+        write_fn.assert_called_once_with(None, 'demo.hdf', None)
         data = {'name': 'demo', 'settings': {'colour': 'w'}, 'instrument_version': '1.0.0',
                 'sample': {'sample': None}, 'fiducials': ([[0, 1, 2]], [False]),
                 'measurement_points': ([[3, 4, 5]], [True]), 'measurement_vectors': np.array([[0., 1., 0.]]),
-                'alignment': np.identity(4)}
+                'alignment': np.identity(4), 'has_simulation': True}
 
         instrument = mock.Mock()
         instrument.name = 'some_instrument'
@@ -71,6 +71,9 @@ class TestMainWindowModel(unittest.TestCase):
         np.testing.assert_equal(self.model.measurement_points.enabled, data['measurement_points'][1])
         np.testing.assert_array_almost_equal(self.model.measurement_vectors, data['measurement_vectors'], decimal=5)
         np.testing.assert_array_almost_equal(self.model.alignment, data['alignment'], decimal=5)
+        self.assertEqual(self.model.saved_simulation, 'demo.hdf')
+        self.model.simulation = None
+        self.assertIsNone(self.model.saved_simulation)
 
         self.assertFalse(self.model.checkInstrumentVersion())
         self.model.instruments = {instrument.name: IDF(instrument.name, '', '2.0.0')}
@@ -238,4 +241,21 @@ class TestMainWindowModel(unittest.TestCase):
         self.assertFalse(self.model.simulation.render_graphics)
         self.assertTrue(self.model.simulation.check_limits)
         self.assertFalse(self.model.simulation.check_collision)
+        self.assertIsNotNone(self.model.simulation.checkpoint)
         mock_fn.assert_called_once()
+
+        self.model.simulation.stopped = TestSignal()
+        self.model.simulation.isRunning.return_value = True
+        self.model.startSimulation()
+        self.model.simulation.start.assert_called_once_with(False)
+        self.assertTrue(self.model.simulation_timer.isActive())
+        self.model.checkSimulation()
+        self.model.simulation.checkResult.assert_called_once()
+        self.assertTrue(self.model.simulation_timer.isActive())
+        self.model.simulation.stopped.emit()
+        self.assertFalse(self.model.simulation_timer.isActive())
+
+        self.model.simulation_timer.start()
+        self.model.simulation.isRunning.return_value = False
+        self.model.checkSimulation()
+        self.assertFalse(self.model.simulation_timer.isActive())
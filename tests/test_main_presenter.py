@@ -18,6 +18,7 @@ class TestMainWindowPresenter(unittest.TestCase):
         self.model_mock = model_mock
         self.model_mock.return_value.project_data = {}
         self.model_mock.return_value.instruments = ['dummy']
+        self.model_mock.return_value.saved_simulation = None
         self.presenter = MainWindowPresenter(self.view_mock)
         self.notify = mock.Mock()
         self.presenter.notifyError = self.notify
@@ -443,7 +444,7 @@ class TestMainWindowPresenter(unittest.TestCase):
         self.view_mock.check_limits_action = mock.Mock()
         self.presenter.runSimulation()
         self.presenter.model.createSimulation.assert_called_once()
-        self.presenter.model.simulation.start.assert_called_once()
+        self.presenter.model.startSimulation.assert_called_once()
 
         simulation.isRunning.return_value = True
         self.presenter.resetSimulation()
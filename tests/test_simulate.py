@@ -0,0 +1,232 @@
+import csv
+import logging
+import os
+import pathlib
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import unittest.mock as mock
+import h5py
+import numpy as np
+from sscanss.config import settings, MemorySettings, SOURCE_PATH
+from sscanss.core.geometry import create_cuboid, Mesh
+from sscanss.core.instrument import read_instrument_description_file
+from sscanss.core.io import write_project_hdf, read_project_hdf, read_simulation_hdf
+from sscanss.batch import main as batch_main, batch_exit_code, find_projects, read_summary
+from sscanss.simulate import (main, ExitCode, configure_simulation, create_parser, exit_code, load_project,
+                              run_simulation)
+from tests.helpers import SAMPLE_IDF
+
+
+class TestSimulate(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.checkpoint_dir = pathlib.Path(self.test_dir, 'checkpoints')
+        patcher = mock.patch('sscanss.core.instrument.simulation.CHECKPOINT_PATH', self.checkpoint_dir)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+        self.addCleanup(logging.getLogger().setLevel, logging.getLogger().level)
+        self.addCleanup(setattr, settings, 'system', settings._system)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    @mock.patch('sscanss.core.io.writer.settings', autospec=True)
+    @mock.patch('sscanss.core.instrument.create.read_visuals', autospec=True)
+    def createProject(self, points, alignment, skip_zero_vectors, visual_fn, setting_cls, name='demo.h5',
+                      simulation=None):
+        visual_fn.return_value = Mesh(np.array([[0, 0, 0], [0, 1, 0], [0, 1, 1]]), np.array([0, 1, 2]),
+                                      np.array([[1, 0, 0], [1, 0, 0], [1, 0, 0]]))
+        setting_cls.local = {'Simulation/Skip_Zero_Vectors': skip_zero_vectors}
+        filename = os.path.join(self.test_dir, 'instrument.json')
+        with open(filename, 'w') as idf:
+            idf.write(SAMPLE_IDF)
+        instrument = read_instrument_description_file(filename)
+        instrument.loadPositioningStack('Positioning Table Only')
+
+        data = {'name': 'demo', 'instrument': instrument, 'instrument_version': '1.0',
+                'sample': {'cuboid': create_cuboid(50, 50, 50)},
+                'fiducials': np.recarray((0,), dtype=[('points', 'f4', 3), ('enabled', '?')]),
+                'measurement_points': np.rec.array(points, dtype=[('points', 'f4', 3), ('enabled', '?')]),
+                'measurement_vectors': np.zeros((len(points), 3, 1), dtype=np.float32),
+                'alignment': alignment}
+
+        filename = os.path.join(self.test_dir, name)
+        write_project_hdf(data, filename, simulation)
+        return filename
+
+    def testExitCode(self):
+        summary = {'Total': 4, 'Skipped': 1, 'Converged': 3, 'Collision': 0}
+        self.assertEqual(exit_code(summary, False), ExitCode.Success)
+        self.assertEqual(exit_code(summary, True), ExitCode.Error)
+        summary['Collision'] = 1
+        self.assertEqual(exit_code(summary, False), ExitCode.Collision)
+        summary['Converged'] = 2
+        self.assertEqual(exit_code(summary, False), ExitCode.NotConverged)
+
+    def testSimulate(self):
+        filename = self.createProject([([0., 0., 0.], True)], None, False)
+        self.assertEqual(main([filename, '-q']), ExitCode.Error)
+        self.assertEqual(main([os.path.join(self.test_dir, 'missing.h5'), '-q']), ExitCode.Error)
+
+        points = [([0., 0., 0.], True), ([10., 0., 0.], False), ([5., 5., 0.], True)]
+        filename = self.createProject(points, np.identity(4), True)
+        self.assertEqual(main([filename, '-q']), ExitCode.Error)
+
+        filename = self.createProject(points, np.identity(4), False)
+
+        prefix = os.path.join(self.test_dir, 'out')
+        code = main([filename, '-q', '-w', '1', '-o', prefix, '--path-length', '--check-collision'])
+        self.assertEqual(code, ExitCode.Collision)
+        self.assertEqual(logging.getLogger().level, logging.WARNING)
+        self.assertListEqual(list(self.checkpoint_dir.iterdir()), [])
+
+        with h5py.File(f'{prefix}_simulation.h5', 'r') as hdf_file:
+            group = hdf_file['simulation']
+            self.assertEqual(hdf_file.attrs['name'], 'demo')
+            self.assertTrue(group.attrs['compute_path_length'])
+            self.assertListEqual(list(group.attrs['joint_labels']), ['X Stage', 'Y Stage', 'Omega Stage'])
+            self.assertListEqual(group['status'][:].tolist()[1:2], [-1])
+            self.assertEqual(group['id'][1].decode(), 'Point 2')
+            np.testing.assert_array_equal(group['order'], [[0, 0], [1, 0], [2, 0]])
+            self.assertEqual(group['path_length'].shape, (3, 1))
+            self.assertEqual(group['collision_mask'].shape[0], 3)
+
+        with open(f'{prefix}_simulation.csv', newline='') as csv_file:
+            rows = list(csv.reader(csv_file))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0][:4], ['Label', 'Point', 'Alignment', 'Status'])
+        self.assertIn('Path Length Detector (mm)', rows[0])
+        self.assertEqual(rows[0][-3], 'Evaluations')
+        self.assertEqual(rows[2][-3], '')
+        self.assertEqual(rows[2][:4], ['Point 2', '2', '1', 'Skipped'])
+        self.assertEqual(rows[2][-1], 'The measurement point is disabled')
+
+        with open(f'{prefix}_script.txt') as script_file:
+            script = script_file.read()
+        self.assertIn('X Stage\tY Stage\tOmega Stage', script)
+
+        os.remove(f'{prefix}_script.txt')
+        code = main([filename, '-q', '-w', '1', '-o', prefix, '-f', 'csv', '--no-script', '--resume'])
+        self.assertEqual(code, ExitCode.Success)
+        self.assertFalse(os.path.isfile(f'{prefix}_script.txt'))
+
+    def testHeadlessSettings(self):
+        points = [([0., 0., 0.], True), ([5., 5., 0.], True)]
+        filename = self.createProject(points, np.identity(4), False)
+        argv = [filename, '-q', '-w', '1', '-f', 'csv', '--no-script']
+        script = (f'import sys\nfrom sscanss.simulate import main\nmain({argv!r})\n'
+                  f'print("PyQt5" in sys.modules)')
+        env = dict(os.environ, XDG_CONFIG_HOME=self.test_dir, APPDATA=self.test_dir)
+        output = subprocess.run([sys.executable, '-c', script], cwd=SOURCE_PATH, env=env, capture_output=True,
+                                text=True, check=True)
+        self.assertEqual(output.stdout.strip(), 'False')
+        self.assertTrue(os.path.isfile(os.path.join(self.test_dir, 'demo_simulation.csv')))
+
+        key = settings.Key.Local_Max_Eval
+        settings.system = system = MemorySettings()
+        settings.system.setValue(key.value, 500)
+        self.assertEqual(settings.value(key), 500)
+        settings.reset(True)
+        self.assertEqual(settings.value(key), settings.default(key).default)
+        settings.system.setValue(key.value, 500)
+        self.assertEqual(main(argv), ExitCode.Success)
+        self.assertIsNot(settings.system, system)
+        self.assertEqual(settings.value(key), settings.default(key).default)
+
+    def testProjectWithResults(self):
+        points = [([0., 0., 0.], True), ([10., 0., 0.], False), ([5., 5., 0.], True)]
+        filename = self.createProject(points, np.identity(4), False)
+        _, _, simulation = load_project(filename)
+        self.assertEqual(simulation.log_level, logging.INFO)
+        configure_simulation(simulation, create_parser().parse_args([filename, '-q']))
+        self.assertEqual(simulation.log_level, logging.WARNING)
+        simulation.compute_path_length = True
+        self.assertFalse(run_simulation(simulation, True))
+        simulation.server.stop()
+
+        filename = self.createProject(points, np.identity(4), False, simulation=simulation)
+        data, _ = read_project_hdf(filename)
+        self.assertTrue(data['has_simulation'])
+        data = read_simulation_hdf(filename)
+        self.assertEqual(data['input_digest'], simulation.input_digest)
+        self.assertEqual(data['shape'], simulation.shape)
+        self.assertTrue(data['compute_path_length'])
+        results = data['results']
+        self.assertEqual(len(results), 3)
+        self.assertListEqual(results.joint_labels, simulation.results.joint_labels)
+        for expected, result in zip(simulation.results, results):
+            self.assertEqual(result.id, expected.id)
+            self.assertEqual(result.note, expected.note)
+            self.assertEqual(result.skipped, expected.skipped)
+            if not result.skipped:
+                self.assertEqual(result.ik.status, expected.ik.status)
+                np.testing.assert_array_almost_equal(result.ik.q, expected.ik.q)
+                np.testing.assert_array_almost_equal(result.path_length, expected.path_length)
+        with h5py.File(filename, 'r') as hdf_file:
+            self.assertEqual(hdf_file['simulation/q'].compression, 'gzip')
+
+        _, _, restored = load_project(filename)
+        restored.compute_path_length = True
+        restored.restore(results, data['input_digest'])
+        self.assertFalse(restored.stale)
+        self.assertIs(restored.results, results)
+        self.assertEqual(len(restored.cache), len(simulation.cache))
+        restored.server.stop()
+
+        points[0] = ([0., 1., 0.], True)
+        filename = self.createProject(points, np.identity(4), False, simulation=simulation)
+        _, _, restored = load_project(filename)
+        restored.compute_path_length = True
+        restored.restore(read_simulation_hdf(filename)['results'], data['input_digest'])
+        self.assertTrue(restored.stale)
+        self.assertEqual(len(restored.cache), 0)
+        restored.server.stop()
+
+    def testBatch(self):
+        points = [([0., 0., 0.], True), ([10., 0., 0.], False), ([5., 5., 0.], True)]
+        project_dir = os.path.join(self.test_dir, 'projects')
+        os.mkdir(project_dir)
+        first = self.createProject(points, np.identity(4), False, name='projects/first.h5')
+        second = self.createProject(points[:1], np.identity(4), False, name='projects/second.h5')
+        unaligned = self.createProject(points, None, False, name='unaligned.h5')
+        list_file = os.path.join(self.test_dir, 'projects.txt')
+        with open(list_file, 'w') as text_file:
+            text_file.write(f'# project, priority\n{second}, 5\n{unaligned}\n')
+
+        jobs = find_projects([project_dir], list_file)
+        self.assertListEqual([job.filename.name for job in jobs], ['first.h5', 'second.h5', 'unaligned.h5'])
+        self.assertListEqual([job.priority for job in jobs], [0, 0, 0])
+        jobs = find_projects([], list_file)
+        self.assertListEqual([job.priority for job in jobs], [5, 0])
+        self.assertListEqual(sorted(jobs), jobs)
+
+        self.assertEqual(batch_exit_code(['Success', 'Collision']), ExitCode.Collision)
+        self.assertEqual(batch_exit_code(['NotConverged', 'Collision']), ExitCode.NotConverged)
+        self.assertEqual(batch_exit_code(['Success', 'Timeout']), ExitCode.Error)
+        self.assertEqual(batch_exit_code(['Success']), ExitCode.Success)
+
+        output_dir = os.path.join(self.test_dir, 'output')
+        args = ['-l', list_file, first, '-o', output_dir, '-q', '-j', '2', '--retries', '0']
+        self.assertEqual(batch_main(args), ExitCode.Error)
+        summary = read_summary(pathlib.Path(output_dir, 'summary.csv'))
+        self.assertEqual(len(summary), 3)
+        self.assertEqual(summary[pathlib.Path(unaligned).resolve()][1], 'Error')
+        row = summary[pathlib.Path(first).resolve()]
+        self.assertEqual(row[1], 'Success')
+        self.assertEqual(row[2], '1')
+        self.assertListEqual(row[4:6], ['3', '1'])
+        self.assertTrue(os.path.isfile(os.path.join(output_dir, 'first_simulation.h5')))
+        self.assertTrue(os.path.isfile(os.path.join(output_dir, 'second_script.txt')))
+
+        # Projects in the summary table are not simulated again
+        os.remove(os.path.join(output_dir, 'first_simulation.h5'))
+        self.assertEqual(batch_main(args), ExitCode.Error)
+        self.assertFalse(os.path.isfile(os.path.join(output_dir, 'first_simulation.h5')))
+        self.assertEqual(len(read_summary(pathlib.Path(output_dir, 'summary.csv'))), 3)
+
+        self.assertEqual(batch_main([first, '-o', output_dir, '-q', '--restart', '--timeout', '0']), ExitCode.Error)
+        row = read_summary(pathlib.Path(output_dir, 'summary.csv'))[pathlib.Path(first).resolve()]
+        self.assertEqual(row[1:3], ['Timeout', '2'])
@@ -1,13 +1,25 @@
 from collections import namedtuple
+from multiprocessing import Queue, Value, AuthenticationError
+import logging
+import pathlib
+import tempfile
+import threading
+import time
 import unittest
 import unittest.mock as mock
+import gimpact
 import numpy as np
-from PyQt5.QtWidgets import QApplication
 from sscanss.core.geometry import create_cuboid, create_cylinder
-from sscanss.core.instrument import Simulation, Instrument
-from sscanss.core.instrument.collision import CollisionManager
+from sscanss.core.instrument import Simulation, SimulationServer, Instrument, RemoteSimulationServer, run_worker
+from sscanss.core.instrument.collision import (Collider, CollisionManager, MeshCache, triangle_distance,
+                                                collider_distance, BoundingVolumeHierarchy)
 from sscanss.core.instrument.instrument import PositioningStack
-from sscanss.core.instrument.robotics import SerialManipulator, Link, IKSolver
+from sscanss.core.instrument.reachability import ReachabilityMap
+from sscanss.core.instrument.remote import parse_address
+from sscanss.core.instrument.simulation import (serve, Checkpoint, SimulationResult, SimulationResultSet,
+                                                find_path_collision, path_length_bound, populate_collision_manager,
+                                                is_reusable, BUDGET_SCALES, TIME_BUDGET_NOTE)
+from sscanss.core.instrument.robotics import SerialManipulator, Link, IKSolver, IKResult
 from sscanss.core.scene import Node
 from sscanss.core.math import Matrix44
 from sscanss.core.util import POINT_DTYPE
@@ -50,17 +62,379 @@ class TestCollisionClass(unittest.TestCase):
         manager.createAABBSets()
         self.assertListEqual(manager.collide(), [False, False, False])
 
+    def testManagerMoveColliders(self):
+        manager = CollisionManager(5)
+        manager.addColliders([create_cuboid(), create_cuboid()], movable=True, exclude=CollisionManager.Exclude.All)
+        manager.addColliders([create_cuboid()], [Matrix44.fromTranslation([0, 0, 2.])])
+        manager.createAABBSets()
+        self.assertListEqual(manager.collide(), [False, False, False])
 
-class TestSimulation(unittest.TestCase):
-    app = QApplication([])
+        moved = manager.moveColliders([0, 1], [Matrix44.fromTranslation([0, 0, 1.5]), Matrix44.identity()])
+        self.assertEqual(moved, 1)
+        self.assertEqual(manager.colliders[0].version, 1)
+        self.assertEqual(manager.colliders[1].version, 0)
+        np.testing.assert_array_almost_equal(manager.colliders[0].bounds[4:6], [1., 2.], decimal=5)
+        with mock.patch('sscanss.core.instrument.collision.gimpact.trimesh_trimesh_collision',
+                        wraps=gimpact.trimesh_trimesh_collision) as narrow_phase:
+            self.assertListEqual(manager.collide(), [True, False, True])
+            self.assertEqual(narrow_phase.call_count, 1)
+
+            # Pairs of colliders that have not moved are not tested again
+            narrow_phase.reset_mock()
+            self.assertEqual(manager.moveColliders([0, 1], [Matrix44.fromTranslation([0, 0, 1.5]),
+                                                            Matrix44.identity()]), 0)
+            self.assertListEqual(manager.collide(), [True, False, True])
+            narrow_phase.assert_not_called()
+
+            # Pairs that moved together are not tested again
+            self.assertEqual(manager.moveColliders([0, 2], [Matrix44.fromTranslation([5., 0, 1.5]),
+                                                            Matrix44.fromTranslation([5., 0, 2.])]), 2)
+            self.assertListEqual(manager.collide(), [True, False, True])
+            narrow_phase.assert_not_called()
+            self.assertTrue(manager.colliders[2].stale)
+            manager.moveColliders([2], [Matrix44.fromTranslation([0, 0, 2.])])
+
+        # The geometry is transformed from the original pose when a narrow phase test is needed. The bounding
+        # boxes intersect but the rotated cuboid does not touch the static one
+        matrix = np.identity(4)
+        matrix[1:3, 1:3] = [[np.cos(np.pi / 4), -np.sin(np.pi / 4)], [np.sin(np.pi / 4), np.cos(np.pi / 4)]]
+        matrix[1:3, 3] = [0.9, 1.0]
+        manager.moveColliders([0], [matrix])
+        self.assertTrue(manager.colliders[0].stale)
+        self.assertListEqual(manager.collide(), [False, False, False])
+        self.assertFalse(manager.colliders[0].stale)
+        np.testing.assert_array_almost_equal(manager.colliders[0].geometry.bounds[2:6],
+                                             manager.colliders[0].bounds[2:6], decimal=5)
+
+    def testManagerNarrowPhase(self):
+        geometry = [create_cuboid(), create_cuboid()]
+        transform = [Matrix44.identity(), Matrix44.fromTranslation([0, 0, 0.5])]
+        for workers in [1, 2]:
+            manager = CollisionManager(4, workers)
+            manager.addColliders(geometry, transform, movable=True)
+            manager.addColliders(geometry, [Matrix44.fromTranslation([0, 0, 0.75]),
+                                            Matrix44.fromTranslation([0, 0, 5.])])
+            manager.createAABBSets()
+
+            # The exclusion masks of the colliders are rows of the manager's matrix
+            manager.colliders[2].excludes[3] = True
+            self.assertTrue(manager.excludes[2, 3])
+            np.testing.assert_array_equal(np.diag(manager.excludes), [True, True, True, True])
+
+            with mock.patch('sscanss.core.instrument.collision.gimpact.trimesh_trimesh_collision',
+                            wraps=gimpact.trimesh_trimesh_collision) as narrow_phase:
+                # The pair of movable colliders is only tested once
+                self.assertListEqual(manager.collide(), [True, True, True, False])
+                self.assertEqual(narrow_phase.call_count, 3)
+
+                # The check stops at the pair whose result is reused
+                narrow_phase.reset_mock()
+                manager.moveColliders([0], [Matrix44.fromTranslation([0, 0, -0.25])])
+                self.assertListEqual(manager.collide(first_hit=True), [False, True, True, False])
+                narrow_phase.assert_not_called()
+
+                manager.moveColliders([1], [Matrix44.fromTranslation([0, 0, 0.3])])
+                self.assertTrue(any(manager.collide(first_hit=True)))
+                tested = narrow_phase.call_count
+                self.assertGreaterEqual(tested, 1)
+                if workers == 1:
+                    self.assertEqual(tested, 1)
+
+                # The results of the tests that were run are reused
+                narrow_phase.reset_mock()
+                self.assertListEqual(manager.collide(), [True, True, True, False])
+                self.assertEqual(narrow_phase.call_count, 3 - tested)
+
+            # A pair of movable colliders is excluded if each excludes the other
+            manager.colliders[0].excludes[1] = True
+            self.assertListEqual(manager.collide(), [True, True, True, False])
+            manager.colliders[1].excludes[0] = True
+            manager.colliders[2].excludes[0] = True
+            self.assertListEqual(manager.collide(), [False, True, True, False])
+
+            manager.clear()
+            self.assertFalse(manager.excludes.any())
+            self.assertEqual(manager.executor is not None, workers > 1)
+            executor = manager.executor
+            manager.close()
+            self.assertIsNone(manager.executor)
+            if executor is not None:
+                self.assertRaises(RuntimeError, executor.submit, print)
+
+    def testMeshCache(self):
+        mesh = create_cylinder(50., 100., 64, 64)
+        with tempfile.TemporaryDirectory() as path:
+            cache = MeshCache(path)
+            # Meshes that do not need decimation are not cached
+            collider = Collider(0, mesh.vertices, mesh.indices, decimation=len(mesh.indices), cache=cache)
+            self.assertEqual(collider.geometry.triangle_count, len(mesh.indices) // 3)
+            self.assertListEqual(list(pathlib.Path(path).iterdir()), [])
+
+            expected = gimpact.TriMesh(mesh.vertices, mesh.indices).decimate(500)
+            with mock.patch('sscanss.core.instrument.collision.gimpact.TriMesh', wraps=gimpact.TriMesh) as trimesh:
+                collider = Collider(0, mesh.vertices, mesh.indices, decimation=500, cache=cache)
+                self.assertEqual(collider.geometry.triangle_count, expected.triangle_count)
+                filename = cache.filename(mesh.vertices, mesh.indices, 500)
+                self.assertTrue(filename.is_file())
+                self.assertListEqual(list(pathlib.Path(path).iterdir()), [filename])
+                self.assertEqual(trimesh.call_count, 1)
+
+                trimesh.reset_mock()
+                collider = Collider(0, mesh.vertices, mesh.indices, decimation=500, cache=cache)
+                self.assertEqual(trimesh.call_count, 1)
+                self.assertEqual(len(trimesh.call_args[0][0]), 3 * expected.triangle_count)
+                bounds = [(aabb.min_x, aabb.max_x, aabb.min_y, aabb.max_y, aabb.min_z, aabb.max_z)
+                          for aabb in (collider.geometry.bounds, expected.bounds)]
+                np.testing.assert_array_almost_equal(bounds[0], bounds[1], decimal=5)
+                np.testing.assert_array_almost_equal(collider.geometry.triangle(1), expected.triangle(1), decimal=5)
+
+            self.assertNotEqual(cache.filename(mesh.vertices, mesh.indices, 400), filename)
+
+            # An invalid cache file is replaced
+            filename.write_bytes(b'invalid')
+            collider = Collider(0, mesh.vertices, mesh.indices, decimation=500, cache=cache)
+            self.assertEqual(collider.geometry.triangle_count, expected.triangle_count)
+            self.assertEqual(np.load(filename).shape, (3 * expected.triangle_count, 3))
+
+            manager = CollisionManager(2)
+            manager.addColliders([Node(mesh)], decimation=500, cache=cache)
+            self.assertEqual(manager.colliders[0].geometry.triangle_count, expected.triangle_count)
+            del collider, manager
+
+    def testManagerSweep(self):
+        manager = CollisionManager(3)
+        manager.addColliders([create_cuboid(), create_cuboid()], movable=True, exclude=CollisionManager.Exclude.All)
+        manager.addColliders([create_cuboid()], [Matrix44.fromTranslation([0, 0, 5.])])
+        manager.createAABBSets()
+        bounds = [collider.bounds for collider in manager.colliders]
+
+        start = [Matrix44.identity(), Matrix44.identity()]
+        self.assertFalse(manager.sweep([0, 1], start, [Matrix44.fromTranslation([0, 0, 2.])] * 2, [2., 2.]))
+        self.assertTrue(manager.sweep([0], start, [Matrix44.fromTranslation([0, 0, 10.])], [10.]))
+        # The swept box is padded by half the travelled distance
+        self.assertFalse(manager.sweep([0], start, [Matrix44.fromTranslation([0, 0, 2.5])], [2.5]))
+        self.assertTrue(manager.sweep([0], start, [Matrix44.fromTranslation([0, 0, 2.5])], [4.]))
+        self.assertTrue(manager.sweep([0], start, start, [10.]))
+
+        # The colliders are not moved
+        self.assertListEqual([collider.bounds for collider in manager.colliders], bounds)
+        self.assertListEqual(manager.collide(), [False, False, False])
+
+    def testTriangleDistance(self):
+        first = np.array([[[0., 0., 0.], [1., 0., 0.], [0., 1., 0.]]] * 4)
+        second = np.array([[[0.2, 0.2, 2.], [1., 0.2, 3.], [0.2, 1., 3.]],  # vertex above the face
+                           [[2., 0., 0.], [3., 0., 0.], [3., 1., 0.]],  # closest vertices
+                           [[0.5, 0.5, -1.], [0.5, 0.5, 1.], [-1., -1., 0.]],  # crossing
+                           [[1., 1., -1.], [1., 1., 1.], [2., 2., 0.]]])  # closest edges
+        distances, points_a, points_b = triangle_distance(first, second)
+        np.testing.assert_array_almost_equal(distances, [2., 1., 0., np.sqrt(0.5)], decimal=5)
+        np.testing.assert_array_almost_equal(np.linalg.norm(points_a - points_b, axis=1), distances, decimal=5)
+        np.testing.assert_array_almost_equal(points_a[[0, 1, 3]], [[0.2, 0.2, 0.], [1., 0., 0.], [0.5, 0.5, 0.]],
+                                             decimal=5)
+        np.testing.assert_array_almost_equal(points_b[2], [0.5, 0.5, 0.], decimal=5)
+
+    def testManagerClearance(self):
+        cylinder = create_cylinder(50., 100., 64, 64)
+        manager = CollisionManager(4)
+        manager.addColliders([cylinder], movable=True)
+        manager.addColliders([create_cuboid(20., 20., 20.), create_cuboid()],
+                             [Matrix44.fromTranslation([80., 0., 0.]), Matrix44.fromTranslation([0., 0., 200.])])
+        manager.createAABBSets()
+
+        # The farther pair is pruned by the clearance of the closer pair
+        with mock.patch('sscanss.core.instrument.collision.collider_distance',
+                        wraps=collider_distance) as distance:
+            closest = manager.minimumClearance()
+            self.assertEqual(distance.call_count, 1)
+        self.assertEqual(closest.ids, (1, 0))
+        self.assertAlmostEqual(closest.distance, 20., 4)
+        self.assertIsNone(manager.minimumClearance(ids=[3]))
+
+        clearances = manager.clearance()
+        self.assertEqual(len(clearances), 2)
+        self.assertEqual(clearances[0].ids, (1, 0))
+        self.assertAlmostEqual(clearances[0].distance, 20., 4)
+        self.assertAlmostEqual(clearances[1].distance, 149.5, 4)
+        point_a, point_b = clearances[0].points
+        self.assertAlmostEqual(point_a[0], 70., 4)
+        self.assertAlmostEqual(point_b[0], 50., 4)
+        self.assertEqual(len(manager.clearance(ids=[2])), 1)
+
+        # Only pairs closer than the threshold are returned
+        with mock.patch('sscanss.core.instrument.collision.collider_distance') as distance:
+            self.assertListEqual(manager.clearance(threshold=5.), [])
+            distance.assert_not_called()
+        clearances = manager.clearance(threshold=50.)
+        self.assertEqual(len(clearances), 1)
+        self.assertLess(clearances[0].distance, 50.)
+
+        # The clearance is reused when the relative pose of a pair does not change
+        with mock.patch('sscanss.core.instrument.collision.collider_distance') as distance:
+            self.assertAlmostEqual(manager.clearance()[0].distance, 20., 4)
+            distance.assert_not_called()
+
+        # The distance matches the distance between every pair of triangles
+        matrix = Matrix44.fromTranslation([-10., 15., 5.])
+        matrix[0:3, 0:3] = [[np.cos(0.3), 0., np.sin(0.3)], [0., 1., 0.], [-np.sin(0.3), 0., np.cos(0.3)]]
+        manager.moveColliders([0], [matrix])
+        clearance = manager.clearance(ids=[1])[0]
+        hierarchy = manager.colliders[0].hierarchy
+        self.assertEqual(len(hierarchy.triangles), manager.colliders[0].geometry.triangle_count)
+        triangles = hierarchy.triangles @ np.array(matrix[0:3, 0:3]).T + np.array(matrix[0:3, 3])
+        cuboid = manager.colliders[1].hierarchy.triangles + [80., 0., 0.]
+        expected = triangle_distance(np.repeat(triangles, len(cuboid), axis=0),
+                                     np.tile(cuboid, (len(triangles), 1, 1)))[0].min()
+        self.assertAlmostEqual(clearance.distance, expected, 3)
+        self.assertAlmostEqual(np.linalg.norm(clearance.points[0] - clearance.points[1]), clearance.distance, 3)
+
+        manager.moveColliders([0], [Matrix44.fromTranslation([40., 0., 0.])])
+        self.assertTrue(manager.collide()[0])
+        self.assertAlmostEqual(manager.clearance(ids=[1])[0].distance, 0.)
+
+        # Excluded pairs are skipped
+        manager.colliders[1].excludes[0] = True
+        self.assertListEqual([clearance.ids for clearance in manager.clearance()], [(2, 0)])
+
+        hierarchy = BoundingVolumeHierarchy(create_cuboid().vertices[create_cuboid().indices].reshape(-1, 3, 3), 4)
+        self.assertEqual(len(hierarchy.triangles), 12)
+        leaves = hierarchy.children[:, 0] < 0
+        self.assertTrue(np.all(np.diff(hierarchy.ranges[leaves], axis=1) <= 4))
+        self.assertEqual(np.diff(hierarchy.ranges[leaves], axis=1).sum(), 12)
+
+    def testPathCollision(self):
+        q1 = Link('X', [1.0, 0.0, 0.0], [0.0, 0.0, 0.0], Link.Type.Prismatic, -200., 200., 0)
+        stack = PositioningStack('', SerialManipulator('', [q1]))
+        chain = stack.compile()
+        obstacle = create_cuboid(10., 10., 10.)
+        manager = CollisionManager(2)
+        sample_ids, positioner_ids = populate_collision_manager(manager, [create_cuboid(10., 10., 10.)],
+                                                                {'Beam_stop': [Node(obstacle)]})
+        args = (manager, chain, np.identity(4), [-100.], [100.], sample_ids, positioner_ids)
+
+        with mock.patch('sscanss.core.instrument.collision.gimpact.trimesh_trimesh_collision',
+                        wraps=gimpact.trimesh_trimesh_collision) as narrow_phase:
+            # The sample first touches the obstacle when it is 10mm from the centre of the obstacle
+            fraction = find_path_collision(*args)
+            self.assertAlmostEqual(fraction, 0.45, delta=0.006)
+            self.assertGreaterEqual(fraction, 0.45)
+            self.assertLess(narrow_phase.call_count, 5)
+
+            narrow_phase.reset_mock()
+            manager.moveColliders([1], [Matrix44.fromTranslation([0., 20., 0.])])
+            self.assertIsNone(find_path_collision(*args))
+            narrow_phase.assert_not_called()
+
+        # The sample returns to its start pose by turning about Z while the stage translates, so the sample
+        # only touches the obstacle between the start and stop poses
+        q1 = Link('X', [1.0, 0.0, 0.0], [0.0, 0.0, 0.0], Link.Type.Prismatic, -400., 400., 0)
+        q2 = Link('Y', [0.0, 1.0, 0.0], [0.0, 0.0, 0.0], Link.Type.Prismatic, -400., 400., 0)
+        q3 = Link('Z', [0.0, 0.0, 1.0], [0.0, 0.0, 0.0], Link.Type.Revolute, -np.pi, np.pi, 0)
+        chain = PositioningStack('', SerialManipulator('', [q1, q2, q3])).compile()
+        sample = create_cuboid(10., 10., 10.)
+        sample.translate([0., 200., 0.])
+        obstacle.translate([-41.4, 241.4, 0.])
+        sample_ids, positioner_ids = populate_collision_manager(manager, [sample], {'Beam_stop': [Node(obstacle)]})
+        start_q, stop_q = [0., 0., 0.], [200., 200., np.pi / 2]
+        centre = [0., 200., 0., 1.]
+        np.testing.assert_array_almost_equal(chain.pose(stop_q) @ centre, chain.pose(start_q) @ centre)
+        self.assertFalse(any(manager.collide()))
+
+        points = manager.colliders[0].corners
+        origins = chain.jointOrigins(start_q)
+        bound = path_length_bound(points, origins, chain.revolute, np.subtract(stop_q, start_q))
+        path = np.array([chain.pose(q)[0:3, 0:3] @ points + chain.pose(q)[0:3, 3:4]
+                         for q in np.linspace(start_q, stop_q, 101)])
+        self.assertGreaterEqual(bound, np.linalg.norm(np.diff(path, axis=0), axis=1).sum(axis=0).max())
+
+        args = (manager, chain, np.identity(4), start_q, stop_q, sample_ids, positioner_ids)
+        with mock.patch('sscanss.core.instrument.simulation.PATH_STEPS', 2):
+            fraction = find_path_collision(*args)
+        self.assertIsNotNone(fraction)
+        self.assertGreater(fraction, 0.2)
+        self.assertLess(fraction, 0.8)
+
+
+class TestSimulationResultSet(unittest.TestCase):
+    def testResultSet(self):
+        converged = IKResult([90., 10.], IKSolver.Status.Converged, (0., 0.1, 0.), (0.1, 0., 0.), True, True, 150)
+        not_converged = IKResult([45., 5.], IKSolver.Status.NotConverged, (0., 2., 0.), (1., 1., 0.), False, False)
+        failed = IKResult([0., 0.], IKSolver.Status.Failed, (-1., -1., -1.), (-1., -1., -1.), False, False)
+
+        results = SimulationResultSet(['Z', 'Y'], 2, 3, capacity=2)
+        self.assertEqual(len(results), 0)
+        self.assertFalse(np.any(results.valid))
+        results.extend([SimulationResult('1', converged, (['Z', 'Y'], [90., 10.]), 0, (100., 120.), [0, 0, 0]),
+                        SimulationResult('2', not_converged, (['Z', 'Y'], [45., 5.]), 1, (200., 20.), [1, 0, 1]),
+                        SimulationResult('3', skipped=True, note='The measurement point is disabled'),
+                        SimulationResult('4', failed, (['Z', 'Y'], [0., 0.]), 1)])
+
+        self.assertEqual(len(results), 4)
+        self.assertListEqual(results.skipped.tolist(), [False, False, True, False])
+        self.assertListEqual(results.valid.tolist(), [True, True, False, False])
+        np.testing.assert_array_almost_equal(results.formatted[results.valid], [[90., 10.], [45., 5.]])
+
+        result = results[1]
+        self.assertEqual(result.id, '2')
+        self.assertEqual(result.alignment, 1)
+        self.assertEqual(result.ik.status, IKSolver.Status.NotConverged)
+        self.assertFalse(result.ik.position_converged)
+        np.testing.assert_array_almost_equal(result.ik.q, [45., 5.])
+        np.testing.assert_array_almost_equal(result.path_length, [200., 20.])
+        self.assertListEqual(result.collision_mask, [True, False, True])
+        self.assertListEqual(result.joint_labels, ['Z', 'Y'])
+        self.assertEqual(results[0].ik.evaluations, 150)
+        result = results[-2]
+        self.assertTrue(result.skipped)
+        self.assertEqual(result.note, 'The measurement point is disabled')
+        self.assertIsNone(results[3].path_length)
+        self.assertIsNone(results[3].collision_mask)
+        self.assertListEqual([r.id for r in results[1:3]], ['2', '3'])
+        self.assertRaises(IndexError, lambda: results[4])
+
+        np.testing.assert_array_equal(results.query(status=IKSolver.Status.Converged), [0])
+        np.testing.assert_array_equal(results.query(status=[IKSolver.Status.NotConverged,
+                                                            IKSolver.Status.Failed]), [1, 3])
+        np.testing.assert_array_equal(results.query(skipped=True), [2])
+        np.testing.assert_array_equal(results.query(skipped=False), [0, 1, 3])
+        np.testing.assert_array_equal(results.query(collision=True), [1])
+        np.testing.assert_array_equal(results.query(collision=False), [0])
+        np.testing.assert_array_equal(results.query(max_position_error=1.), [0])
+        np.testing.assert_array_equal(results.query(max_orientation_error=1.5), [0, 1])
+        np.testing.assert_array_equal(results.query(alignment=1), [1, 3])
+        np.testing.assert_array_equal(results.query(path_length_range=(50., 150.)), [0])
+        np.testing.assert_array_equal(results.query(path_length_range=(10., 250.), alignment=[1]), [1])
+
+        path_lengths = results.pathLengths((2, 2, 2), [(0, 0), (0, 1), (1, 0), (1, 1)])
+        np.testing.assert_array_almost_equal(path_lengths[:, :, 0], [[100., 120.], [0., 0.]])
+        np.testing.assert_array_almost_equal(path_lengths[:, :, 1], [[200., 20.], [0., 0.]])
+
+        results.append(SimulationResult('5', converged, (['Z', 'Y'], [90., 10.]), 0, None, [0, 0, 0],
+                                        path_collision=0.25))
+        self.assertAlmostEqual(results[4].path_collision, 0.25)
+        self.assertIsNone(results[0].path_collision)
+        np.testing.assert_array_equal(results.query(collision=True), [1, 4])
+        np.testing.assert_array_equal(results.query(collision=False), [0])
+
+        results.append(SimulationResult('6', converged, (['Z', 'Y'], [90., 10.]), 0, None, [0, 0, 0], clearance=3.))
+        self.assertAlmostEqual(results[5].clearance, 3.)
+        self.assertIsNone(results[4].clearance)
+        np.testing.assert_array_equal(results.query(max_clearance=5.), [5])
+        np.testing.assert_array_equal(results.query(max_clearance=2.), [])
 
+        results.clear()
+        self.assertEqual(len(results), 0)
+        self.assertEqual(results.query(skipped=False).size, 0)
+
+
+class TestSimulation(unittest.TestCase):
     def setUp(self):
         mock_instrument_entity = self.createMock('sscanss.core.instrument.simulation.InstrumentEntity')
         self.mock_process = self.createMock('sscanss.core.instrument.simulation.Process')
         self.mock_logging = self.createMock('sscanss.core.instrument.simulation.logging')
+        self.mock_logging.INFO = logging.INFO
         self.mock_time = self.createMock('sscanss.core.instrument.simulation.time')
 
-        self.mock_process.is_alive.return_value = False
+        self.mock_process.return_value.is_alive.return_value = False
 
         Collimator = namedtuple('Collimator', ['name'])
         Jaws = namedtuple('Jaws', ['beam_direction', 'positioner'])
@@ -73,6 +447,7 @@ class TestSimulation(unittest.TestCase):
         self.mock_instrument.detectors = {"North": Detector([0., 1., 0.], self.createPositioner(), Collimator('4mm')),
                                           "South": Detector([0., -1., 0.], None, Collimator('2mm'))}
         self.mock_instrument.beam_in_gauge_volume = True
+        self.mock_instrument.collision_decimation = None
 
         nodes = []
         for mesh, transform in self.mock_instrument.positioning_stack.model():
@@ -129,19 +504,17 @@ class TestSimulation(unittest.TestCase):
 
         simulation.execute(simulation.args)
 
-        result_q = simulation.args['results']
-        self.assertEqual(result_q.qsize(), 4)
+        buffer = simulation.args['buffer']
+        np.testing.assert_array_equal(buffer.done, [0, 0, 0, 0])
         self.assertEqual(len(simulation.results), 0)
 
-        simulation.process = self.mock_process
         self.assertFalse(simulation.has_valid_result)
         simulation.checkResult()
 
-        self.assertEqual(result_q.qsize(), 0)
         self.assertEqual(len(simulation.results), 4)
         self.assertTrue(simulation.has_valid_result)
         simulation.checkResult()
-        self.assertEqual(result_q.qsize(), 0)
+        self.assertEqual(len(simulation.results), 4)
 
         results = [[0., 90.], [0., 0.], [0., -90.]]
         for exp, result in zip(results, simulation.results[:3]):
@@ -158,27 +531,511 @@ class TestSimulation(unittest.TestCase):
         self.assertEqual(skipped_result.note, 'The measurement point is disabled')
 
         self.assertIsNone(simulation.path_lengths)
-        self.mock_process.is_alive.return_value = True
+        self.mock_process.return_value.is_alive.return_value = True
         simulation.start()
         self.mock_process.return_value.start.assert_called_once()
-        self.assertTrue(simulation.timer.isActive())
+        self.assertEqual(simulation.args['job_id'], 1)
+        self.assertEqual(simulation.server.job_queues[0].get()['job_id'], 1)
         self.assertTrue(simulation.isRunning())
 
+        stopped = mock.Mock()
+        simulation.stopped.connect(stopped)
         simulation.abort()
         self.assertFalse(simulation.isRunning())
         self.assertTrue(simulation.args['exit_event'].is_set())
-        self.assertFalse(simulation.timer.isActive())
+        stopped.assert_called_once()
         simulation.execute(simulation.args)
-        self.assertEqual(result_q.qsize(), 0)
+        np.testing.assert_array_equal(buffer.done, [-1, -1, -1, -1])
 
-        self.mock_instrument.positioning_stack.fkine = mock.Mock(side_effect=Exception)
+        # The error is only reported for the active job
+        self.mock_instrument.positioning_stack.ikine = mock.Mock(side_effect=Exception)
         simulation.execute(simulation.args)
         self.mock_logging.exception.assert_called_once()
-        self.assertEqual(result_q.get(), "Error")
-        result_q.put(-1)
+        self.assertEqual(buffer.error[0], -1)
+        simulation.server.active_job.value = simulation.args['job_id']
+        simulation.execute(simulation.args)
+        self.assertEqual(self.mock_logging.exception.call_count, 2)
+        self.assertEqual(buffer.error[0], 1)
         count = len(simulation.results)
+        error_received = mock.Mock()
+        simulation.result_updated.connect(error_received)
         simulation.checkResult()
         self.assertEqual(len(simulation.results), count)
+        error_received.assert_called_once_with(True)
+        self.assertEqual(buffer.error[0], -1)
+
+    def testSimulationWithWorkers(self):
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment)
+        simulation.worker_count = 2
+        simulation.args['chunk_size'] = 1
+
+        simulation.execute(dict(simulation.args, worker_id=1))
+        simulation.checkResult()
+        self.assertEqual(len(simulation.results), 0)
+        np.testing.assert_array_equal(simulation.args['buffer'].done, [-1, 0, -1, 0])
+
+        simulation.execute(dict(simulation.args, worker_id=0))
+        simulation.checkResult()
+        self.assertEqual(len(simulation.results), 4)
+
+        results = [[0., 90.], [0., 0.], [0., -90.]]
+        for index, (exp, result) in enumerate(zip(results, simulation.results[:3])):
+            self.assertEqual(result.id, f'Point {index + 1}')
+            self.assertTrue(result.ik.position_converged)
+            self.assertTrue(result.ik.orientation_converged)
+            np.testing.assert_array_almost_equal(exp, result.ik.q, decimal=2)
+        self.assertTrue(simulation.results[3].skipped)
+
+        simulation.worker_count = 3
+        simulation.args['chunk_size'] = 2
+        self.mock_process.return_value.is_alive.return_value = True
+        simulation.start()
+        self.assertEqual(self.mock_process.call_count, 2)
+        self.assertEqual(len(simulation.server.processes), 2)
+        self.assertIs(self.mock_process.call_args[1]['args'][0], simulation.server.job_queues[1])
+        job = simulation.server.job_queues[1].get()
+        self.assertEqual(job['worker_id'], 1)
+        self.assertEqual(job['worker_count'], 2)
+        simulation.server.job_queues[0].get()
+        simulation.abort()
+
+    def testSimulationServer(self):
+        self.mock_process.return_value.is_alive.return_value = True
+        server = SimulationServer()
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                server)
+        simulation.start()
+        self.assertEqual(self.mock_process.call_count, 1)
+        jobs = server.job_queues[0]
+        first_job = job = jobs.get()
+        for key in SimulationServer.CACHED_ARGS:
+            self.assertEqual(job[key][0], job['digests'][key])
+            self.assertIsNotNone(job[key][1])
+
+        # Unchanged arguments are not sent again and the workers are reused
+        first_event = simulation.args['exit_event']
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                server)
+        simulation.start()
+        self.assertEqual(self.mock_process.call_count, 1)
+        self.assertTrue(first_event.is_set())
+        job = jobs.get()
+        self.assertEqual(job['job_id'], 2)
+        for key in SimulationServer.CACHED_ARGS:
+            self.assertIsNone(job[key][1])
+
+        sample = {'sample': create_cuboid(50.0, 100.000, 100.000)}
+        simulation = Simulation(self.mock_instrument, sample, self.points, self.vectors, self.alignment, server)
+        simulation.start()
+        job = jobs.get()
+        self.assertIsNotNone(job['sample'][1])
+        self.assertIsNone(job['positioner'][1])
+        self.assertIsNone(job['instrument_scene'][1])
+
+        # Worker uses cached arguments and ignores results from the previous jobs
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                server)
+        simulation.check_collision = True
+        simulation.start()
+        server.buffer.done[0] = 1
+        simulation.checkResult()
+        self.assertEqual(len(simulation.results), 0)
+        worker_jobs = Queue()
+        worker_jobs.put(first_job)
+        worker_jobs.put(jobs.get())
+        worker_jobs.put(None)
+        serve(worker_jobs, server.buffer, server.active_job, Value('b', 0))
+        simulation.checkResult()
+        self.assertEqual(len(simulation.results), 4)
+        self.assertFalse(simulation.isRunning())
+        results = [[True, True, True, True], [True, True, False, True], [True, True, False, False]]
+        for exp, result in zip(results, simulation.results[:3]):
+            self.assertTrue(result.ik.position_converged)
+            self.assertListEqual(result.collision_mask, exp)
+
+        # Skipped results are not written after the job is stopped
+        simulation.args['enabled'] = np.array([False, True, True, False])
+        simulation.start()
+        job = jobs.get()
+        simulation.abort()
+        self.assertTrue(simulation.args['exit_event'].is_set())
+        worker_jobs.put(first_job)
+        worker_jobs.put(job)
+        worker_jobs.put(None)
+        serve(worker_jobs, server.buffer, server.active_job, Value('b', 0))
+        self.assertFalse(server.buffer.isDone(0, job['job_id']))
+
+        # The buffer is only reset after the worker of the previous job has finished
+        simulation.start()
+        server.buffer.done[0] = simulation.args['job_id']
+        server.busy[0].value = 1
+        self.mock_time.sleep.side_effect = lambda _: setattr(server.busy[0], 'value', 0)
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                server)
+        self.mock_time.sleep.assert_called_once()
+        self.assertEqual(server.buffer.done[0], -1)
+        self.assertEqual(server.active_job.value, -1)
+
+        server.stop()
+        self.assertEqual(len(server.processes), 0)
+        self.assertEqual(len(server.busy), 0)
+
+    def testRemoteSimulationServer(self):
+        self.assertEqual(parse_address('example.com:9000'), ('example.com', 9000))
+        self.assertEqual(parse_address(':9000'), ('localhost', 9000))
+        self.assertEqual(parse_address('example.com'), ('example.com', 8765))
+        self.assertRaises(ValueError, parse_address, 'example.com:port')
+
+        with mock.patch.dict('os.environ', {'SSCANSS_AUTHKEY': ''}):
+            self.assertRaises(ValueError, RemoteSimulationServer, 'localhost:0')
+            self.assertRaises(ValueError, run_worker, 'localhost:0')
+        with mock.patch.dict('os.environ', {'SSCANSS_AUTHKEY': 'secret'}):
+            server = RemoteSimulationServer('localhost:0')
+        self.assertEqual(server.authkey, b'secret')
+        server.stop()
+
+        # The accept loop logs failed connections and exits when the listener fails
+        listener = mock.Mock()
+        listener.accept.side_effect = [AuthenticationError, ConnectionResetError, OSError]
+        with mock.patch.object(server, 'listener', listener), \
+                mock.patch('sscanss.core.instrument.remote.logging') as mock_remote_logging:
+            server.running = True
+            server.accept()
+        self.assertEqual(listener.accept.call_count, 3)
+        mock_remote_logging.warning.assert_called_once()
+        mock_remote_logging.exception.assert_called_once()
+        server.running = False
+
+        server = RemoteSimulationServer('localhost:0', authkey='secret')
+        self.assertTrue(server.isAlive())
+        self.assertRaises(AuthenticationError, run_worker, server.address, 'wrong')
+
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                server)
+        simulation.args['chunk_size'] = 1
+        simulation.worker_count = 1
+        simulation.start()
+        self.assertListEqual(server.chunks, [[0], [1], [2], [3]])
+        # Only the given number of workers are given chunks
+        first, second = mock.Mock(), mock.Mock()
+        self.assertEqual(server.nextChunk(first, {})[0], 'job')
+        self.assertEqual(server.nextChunk(second, {}), ('wait',))
+        self.assertEqual(server.nextChunk(first, {})[2], [1])
+        server.job_workers.discard(first)
+        self.assertEqual(server.nextChunk(second, {})[2], [2])
+
+        simulation.worker_count = 2
+        simulation.start()
+        self.assertListEqual(server.chunks, [[0], [1], [2], [3]])
+        self.assertTrue(simulation.isRunning())
+
+        workers = [threading.Thread(target=run_worker, args=(server.address, 'secret', 0.01)) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+
+        end_time = time.perf_counter() + 60
+        while simulation.isRunning() and time.perf_counter() < end_time:
+            simulation.checkResult()
+            time.sleep(0.01)
+
+        self.assertEqual(len(simulation.results), 4)
+        self.assertFalse(simulation.isRunning())
+        results = [[0., 90.], [0., 0.], [0., -90.]]
+        for exp, result in zip(results, simulation.results[:3]):
+            self.assertTrue(result.ik.position_converged)
+            np.testing.assert_array_almost_equal(exp, result.ik.q, decimal=2)
+        self.assertTrue(simulation.results[3].skipped)
+
+        # Unfinished measurements of a chunk are given to another worker
+        simulation.args['reused'][:] = True
+        simulation.args['reused'][2] = False
+        event = server.submit(simulation.args, 1)
+        self.assertListEqual(server.chunks, [[2]])
+        server.chunks = []
+        server.requeue(event.job_id - 1, [2, 3])
+        self.assertListEqual(server.chunks, [])
+        server.requeue(event.job_id, [2, 3])
+        self.assertListEqual(server.chunks, [[2, 3]])
+
+        server.stop()
+        for worker in workers:
+            worker.join(10)
+            self.assertFalse(worker.is_alive())
+        self.assertFalse(server.isAlive())
+
+    def testSimulationWithCache(self):
+        self.mock_process.return_value.is_alive.return_value = True
+        self.vectors[:, 0:3, 0] = np.array(self.mock_instrument.q_vectors[0])
+        self.vectors[:, 3:6, 0] = np.array(self.mock_instrument.q_vectors[1])
+        cache = {}
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                cache=cache)
+        simulation.start()
+        simulation.server.job_queues[0].get()
+        self.assertEqual(np.count_nonzero(simulation.args['reused']), 0)
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+        self.assertEqual(len(simulation.results), 4)
+        self.assertEqual(len(cache), 4)
+        self.assertFalse(any(result.reused for result in simulation.results))
+        self.assertFalse(simulation.isRunning())
+
+        self.points.points[1] = [0., 10., 0.]
+        # The simulation ran in this process so the positioner is moved back to the start configuration
+        self.mock_instrument.positioning_stack.set_points = simulation.args['start_configuration']
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                simulation.server, cache)
+        simulation.start()
+        simulation.server.job_queues[0].get()
+        positioner = simulation.args['positioner']
+        positioner.ikine = mock.Mock(wraps=positioner.ikine)
+        np.testing.assert_array_equal(simulation.args['reused'], [True, False, True, True])
+        self.assertTrue(simulation.isRunning())
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+        self.assertEqual(positioner.ikine.call_count, 1)
+        del positioner.ikine
+        self.assertEqual(len(cache), 4)
+        self.assertListEqual([result.reused for result in simulation.results], [True, False, True, True])
+        self.assertListEqual([result.id for result in simulation.results], [f'Point {i}' for i in range(1, 5)])
+        np.testing.assert_array_almost_equal(simulation.results[1].ik.q, [0., -10.], decimal=2)
+        np.testing.assert_array_almost_equal(simulation.results[2].ik.q, [0., -90.], decimal=2)
+        self.assertTrue(simulation.results[3].skipped)
+        self.assertFalse(simulation.isRunning())
+
+        self.mock_instrument.positioning_stack.set_points = simulation.args['start_configuration']
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                simulation.server, cache)
+        job_id = simulation.server.job_id
+        simulation.start()
+        self.assertEqual(simulation.server.job_id, job_id)
+        self.assertFalse(simulation.isRunning())
+        simulation.checkResult()
+        self.assertTrue(all(result.reused for result in simulation.results))
+        self.assertTrue(simulation.has_valid_result)
+
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                simulation.server, cache)
+        simulation.check_collision = True
+        simulation.start()
+        simulation.server.job_queues[0].get()
+        self.assertEqual(np.count_nonzero(simulation.args['reused']), 0)
+        self.assertEqual(len(cache), 0)
+
+        # The results of a chunk are only reused together when the path between measurements is checked
+        simulation.check_path_collision = True
+        simulation.start()
+        simulation.server.job_queues[0].get()
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+        self.assertEqual(len(cache), 4)
+        self.points.points[2] = [0., 80., 0.]
+        self.mock_instrument.positioning_stack.set_points = simulation.args['start_configuration']
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                simulation.server, cache)
+        simulation.check_collision = True
+        simulation.check_path_collision = True
+        simulation.start()
+        simulation.server.job_queues[0].get()
+        self.assertEqual(np.count_nonzero(simulation.args['reused']), 0)
+        self.assertEqual(len(cache), 2)
+
+        self.mock_instrument.positioning_stack.links[0].locked = True
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                simulation.server, cache)
+        simulation.execute(simulation.args)
+        keys = simulation.computeKeys(simulation.server.digest(simulation.args))
+        self.mock_instrument.positioning_stack.links[0].locked = False
+        self.assertTrue(set(keys.values()).isdisjoint(simulation.computeKeys(
+            simulation.server.digest(simulation.args)).values()))
+
+        # Warm start and the start configuration change the result of every measurement
+        digests = simulation.server.digest(simulation.args)
+        keys = [key for key in simulation.computeKeys(digests).values() if key is not None]
+        simulation.args['warm_start'] = True
+        self.assertTrue(set(keys).isdisjoint(simulation.computeKeys(digests).values()))
+        simulation.args['warm_start'] = False
+        simulation.args['start_configuration'] = [10., 10.]
+        self.assertTrue(set(keys).isdisjoint(simulation.computeKeys(digests).values()))
+
+    def testSimulationCheckpoint(self):
+        self.mock_time.perf_counter.return_value = 0.0
+        self.mock_process.return_value.is_alive.return_value = True
+        self.vectors[:, 0:3, 0] = np.array(self.mock_instrument.q_vectors[0])
+        self.vectors[:, 3:6, 0] = np.array(self.mock_instrument.q_vectors[1])
+        test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(test_dir.cleanup)
+        filename = pathlib.Path(test_dir.name, 'checkpoints', 'project.ckpt')
+
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment)
+        simulation.checkpoint = Checkpoint(filename)
+        self.assertFalse(simulation.checkpoint.exists())
+        self.assertDictEqual(simulation.checkpoint.load(), {})
+        simulation.start(resume=True)
+        simulation.server.job_queues[0].get()
+        self.assertTrue(simulation.checkpoint.exists())
+        simulation.execute(dict(simulation.args, indices=[0, 1]))
+        simulation.checkResult()
+        self.assertEqual(len(simulation.results), 2)
+        simulation.abort()
+
+        # An incomplete record at the end of the checkpoint is ignored
+        with open(filename, 'ab') as checkpoint_file:
+            checkpoint_file.write(b'\x80\x04\x95')
+        saved = simulation.checkpoint.load()
+        self.assertEqual(len(saved), 2)
+        self.assertCountEqual(saved.keys(), [simulation.keys[0], simulation.keys[1]])
+
+        # The simulation ran in this process so the positioner is moved back to the start configuration
+        self.mock_instrument.positioning_stack.set_points = simulation.args['start_configuration']
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                simulation.server)
+        simulation.checkpoint = Checkpoint(filename)
+        simulation.start(resume=True)
+        simulation.server.job_queues[0].get()
+        np.testing.assert_array_equal(simulation.args['reused'], [True, True, False, False])
+        self.assertEqual(len(simulation.checkpoint.load()), 2)
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+        self.assertEqual(len(simulation.results), 4)
+        self.assertListEqual([result.reused for result in simulation.results], [True, True, False, False])
+        np.testing.assert_array_almost_equal(simulation.results[0].ik.q, [0., 90.], decimal=2)
+        self.assertFalse(simulation.checkpoint.exists())
+
+        simulation.checkpoint.open(saved)
+        simulation.checkpoint.close()
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment,
+                                simulation.server)
+        simulation.checkpoint = Checkpoint(filename)
+        simulation.start()
+        simulation.server.job_queues[0].get()
+        self.assertEqual(np.count_nonzero(simulation.args['reused']), 0)
+        self.assertEqual(len(simulation.checkpoint.load()), 0)
+        simulation.abort()
+
+    def testSimulationWithWarmStart(self):
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment)
+        simulation.args['warm_start'] = True
+        positioner = simulation.args['positioner']
+        positioner.ikine = mock.Mock(wraps=positioner.ikine)
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+
+        self.assertEqual(positioner.ikine.call_count, 3)
+        self.assertIsNone(positioner.ikine.call_args_list[0][1]['seed'])
+        np.testing.assert_array_almost_equal(positioner.ikine.call_args_list[1][1]['seed'],
+                                             simulation.results[0].ik.q, decimal=5)
+        np.testing.assert_array_almost_equal(positioner.ikine.call_args_list[2][1]['seed'],
+                                             simulation.results[1].ik.q, decimal=5)
+
+        results = [[0., 90.], [0., 0.], [0., -90.]]
+        for exp, result in zip(results, simulation.results[:3]):
+            self.assertTrue(result.ik.position_converged)
+            self.assertTrue(result.ik.orientation_converged)
+            np.testing.assert_array_almost_equal(exp, result.ik.q, decimal=2)
+
+    def testSimulationWithReachabilityMap(self):
+        test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(test_dir.cleanup)
+        path = pathlib.Path(test_dir.name, 'reachability')
+        patcher = mock.patch('sscanss.core.instrument.simulation.REACHABILITY_PATH', path)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+
+        self.points.points[1] = [0., 0., 100.]
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment)
+        simulation.args['reachability_map'] = True
+        ikine = PositioningStack.ikine
+        mock_ikine = self.createMock('sscanss.core.instrument.instrument.PositioningStack.ikine')
+        mock_ikine.side_effect = ikine
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+
+        self.assertEqual(len(list(path.glob('*.npz'))), 1)
+        self.assertIsInstance(mock_ikine.call_args_list[0][1]['reachability_map'], ReachabilityMap)
+        self.assertEqual(simulation.results[1].ik.status, IKSolver.Status.Unreachable)
+        self.assertEqual(simulation.results[1].ik.evaluations, 0)
+        for index, exp in [(0, [0., 90.]), (2, [0., -90.])]:
+            self.assertEqual(simulation.results[index].ik.status, IKSolver.Status.Converged)
+            np.testing.assert_array_almost_equal(exp, simulation.results[index].ik.q, decimal=2)
+
+        # The saved map is loaded instead of rebuilt
+        with mock.patch.object(ReachabilityMap, 'build') as build:
+            simulation.start()
+            simulation.server.job_queues[0].get()
+            simulation.execute(simulation.args)
+            simulation.checkResult()
+            build.assert_not_called()
+        self.assertEqual(simulation.results[1].ik.status, IKSolver.Status.Unreachable)
+
+        # The map is not used to reject measurements when the joint limits are not checked
+        simulation.check_limits = False
+        simulation.start()
+        simulation.server.job_queues[0].get()
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+        self.assertNotEqual(simulation.results[1].ik.status, IKSolver.Status.Unreachable)
+        self.assertGreater(simulation.results[1].ik.evaluations, 0)
+
+    def testSimulationWithAdaptiveBudget(self):
+        simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment)
+        self.assertTupleEqual(simulation.args['budget_scales'], (1,))
+        simulation.args['budget_scales'] = BUDGET_SCALES
+        not_converged = IKResult([0., 0.], IKSolver.Status.NotConverged, (0., 2., 0.), (1., 1., 0.), False, False,
+                                 evaluations=200)
+        ikine = PositioningStack.ikine
+
+        def fail_first_point(positioner, *args, **kwargs):
+            if mock_ikine.call_count == 1:
+                return not_converged
+            return ikine(positioner, *args, **kwargs)
+
+        mock_ikine = self.createMock('sscanss.core.instrument.instrument.PositioningStack.ikine')
+        mock_ikine.side_effect = fail_first_point
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+
+        self.assertEqual(mock_ikine.call_count, 4)
+        kwargs = mock_ikine.call_args_list[3][1]
+        ikine_kwargs = simulation.args['ikine_kwargs']
+        self.assertEqual(kwargs['local_max_eval'], 4 * ikine_kwargs['local_max_eval'])
+        self.assertEqual(kwargs['global_max_eval'], 4 * ikine_kwargs['global_max_eval'])
+        self.assertListEqual([result.id for result in simulation.results], [f'Point {i}' for i in range(1, 5)])
+        results = [[0., 90.], [0., 0.], [0., -90.]]
+        for exp, result in zip(results, simulation.results[:3]):
+            self.assertEqual(result.ik.status, IKSolver.Status.Converged)
+            np.testing.assert_array_almost_equal(exp, result.ik.q, decimal=2)
+            self.assertGreater(result.ik.evaluations, 0)
+        self.assertGreater(simulation.results[0].ik.evaluations, 200)
+
+        # Measurements are not escalated after the time budget is exceeded
+        simulation.time_budget = 10
+        self.mock_time.monotonic.side_effect = [0., 20.]
+        mock_ikine.reset_mock()
+        simulation.start()
+        simulation.server.job_queues[0].get()
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+        self.assertEqual(mock_ikine.call_count, 3)
+        self.assertEqual(simulation.results[0].ik.status, IKSolver.Status.NotConverged)
+        self.assertEqual(simulation.results[0].ik.evaluations, 200)
+        self.assertEqual(simulation.results[0].note, TIME_BUDGET_NOTE)
+        self.assertEqual(simulation.results[1].note, '')
+
+        # The result cut short by the time budget is never reused
+        self.assertFalse(is_reusable(simulation.results[0]))
+        self.assertTrue(is_reusable(simulation.results[1]))
+        self.assertTrue(is_reusable(simulation.results[3]))
+
+        simulation.time_budget = 0
+        simulation.args['budget_scales'] = (1,)
+        mock_ikine.reset_mock()
+        simulation.start()
+        simulation.server.job_queues[0].get()
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+        self.assertEqual(mock_ikine.call_count, 3)
+        self.assertEqual(simulation.results[0].ik.status, IKSolver.Status.NotConverged)
 
     def testSimulationWithCollision(self):
         simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment)
@@ -188,7 +1045,6 @@ class TestSimulation(unittest.TestCase):
         simulation.check_collision = True
         simulation.execute(simulation.args)
 
-        simulation.process = self.mock_process
         simulation.checkResult()
 
         results = [[True, True, True, True], [True, True, False, True], [True, True, False, False]]
@@ -198,6 +1054,46 @@ class TestSimulation(unittest.TestCase):
         skipped_result = simulation.results[3]
         self.assertTrue(skipped_result.skipped)
         self.assertIsNone(skipped_result.collision_mask)
+        self.assertIsNone(skipped_result.path_collision)
+        self.assertTrue(all(result.path_collision is None for result in simulation.results))
+
+        # The key of a measurement depends on the previous measurements when the path is checked
+        digests = simulation.server.digest(simulation.args)
+        simulation.args['skip_zero_vectors'] = True
+        keys = simulation.computeKeys(digests)
+        self.assertFalse(simulation.check_path_collision)
+        simulation.check_path_collision = True
+        path_keys = simulation.computeKeys(digests)
+        self.assertTrue(set(keys.values()).isdisjoint(path_keys.values()))
+        simulation.args['points'][0, 0] = 1.
+        changed_keys = simulation.computeKeys(digests)
+        self.assertTrue(all(changed_keys[index] != path_keys[index] for index in range(4)))
+        simulation.args['points'][0, 0] = 0.
+        simulation.args['skip_zero_vectors'] = False
+
+        # The sample rests on the positioner so every move collides at the first checked pose
+        simulation.results.clear()
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+        for result in simulation.results[:3]:
+            self.assertLess(result.path_collision, 0.1)
+        self.assertIsNone(simulation.results[3].path_collision)
+        np.testing.assert_array_equal(simulation.results.query(collision=True), [0, 1, 2])
+
+        # A measurement that does not move the positioner has no path to check
+        chain = simulation.positioner.compile()
+        self.assertIsNone(find_path_collision(None, chain, np.identity(4), [0., 90.], [0., 90.], [0], [1, 2]))
+
+        # The sample collides at every pose so has no clearance
+        self.assertFalse(simulation.check_clearance)
+        self.assertTrue(all(result.clearance is None for result in simulation.results))
+        simulation.check_path_collision = False
+        simulation.check_clearance = True
+        simulation.results.clear()
+        simulation.execute(simulation.args)
+        simulation.checkResult()
+        self.assertListEqual([result.clearance for result in simulation.results[:3]], [0., 0., 0.])
+        self.assertIsNone(simulation.results[3].clearance)
 
     def testSimulationWithPathLength(self):
         simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, self.alignment)
@@ -207,7 +1103,6 @@ class TestSimulation(unittest.TestCase):
         simulation.render_graphics = True
         simulation.execute(simulation.args)
 
-        simulation.process = self.mock_process
         simulation.checkResult()
 
         results = [[215., 35.], [125., 125.], [35., 215.], [0., 0.]]
@@ -229,7 +1124,6 @@ class TestSimulation(unittest.TestCase):
         simulation = Simulation(self.mock_instrument, self.sample, self.points, self.vectors, alignment)
         simulation.args['align_first_order'] = True
         simulation.execute(simulation.args)
-        simulation.process = self.mock_process
         simulation.checkResult()
 
         results = [(0., 100.), (0, 100.), (0, -100.), (0, -100.)]
@@ -255,7 +1149,6 @@ class TestSimulation(unittest.TestCase):
         simulation.args['align_first_order'] = False
         simulation.args['skip_zero_vectors'] = True
         simulation.execute(simulation.args)
-        simulation.process = self.mock_process
         simulation.checkResult()
         for result in simulation.results[:2]:
             self.assertTrue(result.skipped)
@@ -281,7 +1174,6 @@ class TestSimulation(unittest.TestCase):
 
         simulation = Simulation(self.mock_instrument, self.sample, points, vectors, self.alignment)
         simulation.execute(simulation.args)
-        simulation.process = self.mock_process
         simulation.checkResult()
 
         self.assertEqual(simulation.results[0].ik.status, IKSolver.Status.Converged)
@@ -299,7 +1191,6 @@ class TestSimulation(unittest.TestCase):
         self.mock_instrument.positioning_stack.links[0].locked = True
         simulation = Simulation(self.mock_instrument, self.sample, points, vectors, self.alignment)
         simulation.execute(simulation.args)
-        simulation.process = self.mock_process
         simulation.checkResult()
         self.assertEqual(simulation.results[0].ik.status, IKSolver.Status.Unreachable)
         self.assertEqual(simulation.results[1].ik.status, IKSolver.Status.HardwareLimit)
@@ -308,16 +1199,16 @@ class TestSimulation(unittest.TestCase):
         q2 = Link('Z2', [0.0, 0.0, -1.0], [0.0, 0.0, 0.0], Link.Type.Revolute, -3.14, 3.14, 0)
         q3 = Link('Y', [0.0, 1.0, 0.0], [0.0, 0.0, 0.0], Link.Type.Prismatic, -200., 200., 0)
         s = SerialManipulator('', [q1, q2, q3], custom_order=[2, 1, 0], base=Matrix44.fromTranslation([0., 0., 50.]))
-        simulation.args['positioner'] = PositioningStack(s.name, s)
-        simulation.results = []
+        self.mock_instrument.positioning_stack = PositioningStack(s.name, s)
+        simulation = Simulation(self.mock_instrument, self.sample, points, vectors, self.alignment)
         simulation.execute(simulation.args)
         simulation.checkResult()
         self.assertEqual(simulation.results[0].ik.status, IKSolver.Status.Unreachable)
 
         q2 = Link('X', [1.0, 0.0, 0.0], [0.0, 0.0, 0.0], Link.Type.Revolute, -3.14, 3.14, 0)
         s = SerialManipulator('', [q1, q2, q3], custom_order=[2, 1, 0], base=Matrix44.fromTranslation([0., 0., 50.]))
-        simulation.args['positioner'] = PositioningStack(s.name, s)
-        simulation.results = []
+        self.mock_instrument.positioning_stack = PositioningStack(s.name, s)
+        simulation = Simulation(self.mock_instrument, self.sample, points, vectors, self.alignment)
         simulation.execute(simulation.args)
         simulation.checkResult()
         self.assertEqual(simulation.results[0].ik.status, IKSolver.Status.NotConverged)
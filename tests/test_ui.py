@@ -636,7 +636,7 @@ class TestMainWindow(unittest.TestCase):
         self.assertEqual(len(self.model.simulation.results), 6)
 
         widget = self.getDockedWidget(self.window.docks, SimulationDialog.dock_flag)
-        self.assertEqual(len(widget.result_list.panes), 6)
+        self.assertEqual(widget.result_model.rowCount(), 6)
         self.assertFalse(widget._hide_skipped_results)
         QTest.mouseClick(widget.hide_skipped_button, Qt.LeftButton)
         self.assertTrue(widget._hide_skipped_results)
@@ -659,7 +659,7 @@ class TestMainWindow(unittest.TestCase):
         widget = self.getDockedWidget(self.window.docks, SimulationDialog.dock_flag)
         self.window.simulation_dialog_action.trigger()
         self.assertFalse(widget.simulation.isRunning())
-        self.assertEqual(len(widget.result_list.panes), 6)
+        self.assertEqual(widget.result_model.rowCount(), 6)
 
     def testOtherWindows(self):
         # Test the Recent project menu
@@ -1,3 +1,5 @@
+import subprocess
+import sys
 import unittest
 import unittest.mock as mock
 import numpy as np
@@ -5,7 +7,7 @@ from sscanss.core.math import Vector3, Plane, clamp, trunc, map_range, is_close
 from sscanss.core.geometry import create_plane, Colour, Mesh
 from sscanss.core.scene import (SampleEntity, PlaneEntity, MeasurementPointEntity, MeasurementVectorEntity,
                                 Camera, Scene, Node, validate_instrument_scene_size)
-from sscanss.core.util import to_float, Directions, Attributes
+from sscanss.core.util import to_float, Directions, Attributes, Signal
 
 
 class TestNode(unittest.TestCase):
@@ -211,6 +213,30 @@ class TestUtil(unittest.TestCase):
         self.assertEqual(value, None)
         self.assertFalse(ok)
 
+    def testSignal(self):
+        signal = Signal()
+        slot_1 = mock.Mock()
+        slot_2 = mock.Mock()
+        signal.connect(slot_1)
+        signal.connect(slot_2)
+        signal.emit(1, 'a')
+        slot_1.assert_called_once_with(1, 'a')
+        slot_2.assert_called_once_with(1, 'a')
+
+        signal.disconnect(slot_1)
+        signal.emit(2)
+        slot_1.assert_called_once()
+        slot_2.assert_called_with(2)
+
+        signal.disconnect()
+        signal.emit(3)
+        self.assertEqual(slot_2.call_count, 2)
+
+    def testCoreImportWithoutQt(self):
+        code = ('import sys; import sscanss.core.instrument, sscanss.core.io, sscanss.core.scene, sscanss.simulate; '
+                'sys.exit(any(name.startswith(("PyQt5", "OpenGL")) for name in sys.modules))')
+        self.assertEqual(subprocess.run([sys.executable, '-c', code]).returncode, 0)
+
     def testIsClose(self):
         self.assertTrue(is_close(2.5, 2.5))
         self.assertFalse(is_close(0.998, 0.999))
@@ -3,10 +3,10 @@ import unittest.mock as mock
 import numpy as np
 from PyQt5.QtCore import Qt, QPoint, QEvent
 from PyQt5.QtGui import QColor, QMouseEvent, QBrush
-from PyQt5.QtWidgets import QApplication, QFileDialog, QMessageBox, QLabel, QAction
+from PyQt5.QtWidgets import QApplication, QFileDialog, QMessageBox, QLabel, QAction, QStyleOptionViewItem
 from sscanss.core.util import PointType, POINT_DTYPE, CommandID, TransformType
 from sscanss.core.geometry import Mesh
-from sscanss.core.instrument.simulation import SimulationResult, Simulation
+from sscanss.core.instrument.simulation import SimulationResult, SimulationResultSet, Simulation
 from sscanss.core.instrument.robotics import IKSolver, IKResult, SerialManipulator, Link
 from sscanss.core.instrument.instrument import Script, PositioningStack
 from sscanss.ui.dialogs import (SimulationDialog, ScriptExportDialog, PathLengthPlotter, SampleExportDialog,
@@ -14,7 +14,7 @@ from sscanss.ui.dialogs import (SimulationDialog, ScriptExportDialog, PathLength
                                 PositionerControl, TransformDialog, CalibrationErrorDialog)
 from sscanss.ui.widgets import (FormGroup, FormControl, CompareValidator, StatusBar, ColourPicker, FileDialog,
                                 FilePicker, Accordion, Pane, PointModel, AlignmentErrorModel, ErrorDetailModel,
-                                GLWidget)
+                                GLWidget, SimulationResultModel)
 from sscanss.ui.window.scene_manager import SceneManager
 from sscanss.ui.window.presenter import MainWindowPresenter
 from tests.helpers import TestView, TestSignal
@@ -118,6 +118,7 @@ class TestSimulationDialog(unittest.TestCase):
         self.simulation_mock.detector_names = ['East']
         self.simulation_mock.result_updated = TestSignal()
         self.simulation_mock.render_graphics = True
+        self.simulation_mock.stale = False
 
         self.view.presenter = self.presenter
         self.view.scenes = mock.create_autospec(SceneManager)
@@ -132,13 +133,15 @@ class TestSimulationDialog(unittest.TestCase):
         unreachable = IKResult([87.8], IKSolver.Status.Unreachable, (0., 0., 0.), (1., 1., 0.), True, False)
         deformed = IKResult([87.8], IKSolver.Status.DeformedVectors, (0., 0., 0.), (1., 1., 0.), True, False)
 
-        self.simulation_mock.results = [SimulationResult('1', converged, (['X'], [90]), 0, (120,), [False, True]),
-                                        SimulationResult('2', not_converged, (['X'], [87.8]), 0, (25,), [True, True]),
-                                        SimulationResult('3', non_fatal, (['X'], [45]), 0),
-                                        SimulationResult('4', limit, (['X'], [87.8]), 0, (25,), [True, True]),
-                                        SimulationResult('5', unreachable, (['X'], [87.8]), 0, (25,), [True, True]),
-                                        SimulationResult('6', deformed, (['X'], [87.8]), 0, (25,), [True, True]),
-                                        SimulationResult('7', skipped=True, note='something happened')]
+        self.simulation_mock.results = SimulationResultSet(['X'], 1, 2)
+        self.simulation_mock.results.extend([
+            SimulationResult('1', converged, (['X'], [90]), 0, (120,), [False, True]),
+            SimulationResult('2', not_converged, (['X'], [87.8]), 0, (25,), [True, True]),
+            SimulationResult('3', non_fatal, (['X'], [45]), 0),
+            SimulationResult('4', limit, (['X'], [87.8]), 0, (25,), [True, True]),
+            SimulationResult('5', unreachable, (['X'], [87.8]), 0, (25,), [True, True]),
+            SimulationResult('6', deformed, (['X'], [87.8]), 0, (25,), [True, True]),
+            SimulationResult('7', skipped=True, note='something happened')])
         self.simulation_mock.count = len(self.simulation_mock.results)
         self.simulation_mock.scene_size = 2
 
@@ -148,20 +151,49 @@ class TestSimulationDialog(unittest.TestCase):
         self.assertTrue(self.dialog._hide_skipped_results)
         self.model_mock.return_value.simulation_created.emit()
         self.simulation_mock.result_updated.emit(False)
+        self.assertEqual(self.dialog.result_proxy.rowCount(), 6)
         self.dialog.hide_skipped_button.toggle()
         self.assertFalse(self.dialog._hide_skipped_results)
-        self.assertEqual(len(self.dialog.result_list.panes), 7)
-        actions = self.dialog.result_list.panes[0].context_menu.actions()
+        self.assertEqual(self.dialog.result_model.rowCount(), 7)
+        self.assertEqual(self.dialog.result_proxy.rowCount(), 7)
+        self.assertEqual(self.dialog.progress_bar.value(), 7)
+        self.dialog.hide_failed_button.toggle()
+        self.assertEqual(self.dialog.result_proxy.rowCount(), 6)
+        self.dialog.collisions_only_button.toggle()
+        self.assertEqual(self.dialog.result_proxy.rowCount(), 5)
+        self.dialog.hide_failed_button.toggle()
+        self.dialog.collisions_only_button.toggle()
+        self.assertEqual(self.dialog.result_proxy.rowCount(), 7)
+
+        proxy = self.dialog.result_proxy
+        actions = self.dialog.contextMenu(proxy.index(0, 0)).actions()
         actions[0].trigger()  # copy action
         self.assertEqual(self.app.clipboard().text(), '90.000')
 
-        self.assertTrue(self.dialog.result_list.panes[0].isEnabled())
-        self.assertTrue(self.dialog.result_list.panes[1].isEnabled())
-        self.assertFalse(self.dialog.result_list.panes[2].isEnabled())
-        self.assertTrue(self.dialog.result_list.panes[3].isEnabled())
-        self.assertTrue(self.dialog.result_list.panes[4].isEnabled())
-        self.assertTrue(self.dialog.result_list.panes[5].isEnabled())
-        self.assertFalse(self.dialog.result_list.panes[6].isEnabled())
+        enabled = [bool(proxy.flags(proxy.index(i, 0)) & Qt.ItemIsEnabled) for i in range(7)]
+        self.assertListEqual(enabled, [True, True, False, True, True, True, False])
+        self.assertIsNone(self.dialog.contextMenu(proxy.index(2, 0)))
+        self.assertIsNone(self.dialog.contextMenu(proxy.index(6, 0)))
+
+        delegate = self.dialog.result_list.itemDelegate()
+        option = QStyleOptionViewItem()
+        height = delegate.sizeHint(option, proxy.index(0, 0)).height()
+        self.assertFalse(proxy.index(0, 0).data(SimulationResultModel.ExpandedRole))
+        self.dialog.toggleResultDetails(proxy.index(0, 0))
+        self.assertTrue(proxy.index(0, 0).data(SimulationResultModel.ExpandedRole))
+        self.assertGreater(delegate.sizeHint(option, proxy.index(0, 0)).height(), height)
+        self.dialog.toggleResultDetails(proxy.index(0, 0))
+        self.assertEqual(delegate.sizeHint(option, proxy.index(0, 0)).height(), height)
+        self.dialog.toggleResultDetails(proxy.index(2, 0))
+        self.assertFalse(proxy.index(2, 0).data(SimulationResultModel.ExpandedRole))
+        _, lines, icons, _ = delegate.layout(proxy.index(0, 0))
+        self.assertEqual(lines[0][0], '1')
+        self.assertEqual(len(icons), 1)
+        _, lines, icons, _ = delegate.layout(proxy.index(3, 0))
+        self.assertEqual(len(icons), 2)
+        _, lines, icons, _ = delegate.layout(proxy.index(6, 0))
+        self.assertEqual(lines[1][0], 'SKIPPED: something happened.')
+        self.dialog.result_list.grab()
 
         self.model_mock.return_value.moveInstrument.reset_mock()
         self.view.scenes.renderCollision.reset_mock()
@@ -1077,10 +1109,11 @@ class TestScriptExportDialog(unittest.TestCase):
         not_converged = IKResult([87.8], IKSolver.Status.NotConverged, (0., 0., 0.), (1., 1., 0.), True, False)
         non_fatal = IKResult([45], IKSolver.Status.Failed, (-1., -1., -1.), (-1., -1., -1.), False, False)
         self.model_mock.return_value.instrument.script = self.template_mock
-        self.simulation_mock.results = [SimulationResult('1', converged, (['X'], [90]), 0, (120,), [False, True]),
-                                        SimulationResult('3', non_fatal, (['X'], [45]), 0, None, None),
-                                        SimulationResult('2', not_converged, (['X'], [87.8]), 0, (25,), [True, True]),
-                                        ]
+        self.simulation_mock.results = SimulationResultSet(['X'], 1, 2)
+        self.simulation_mock.results.extend([
+            SimulationResult('1', converged, (['X'], [90]), 0, (120,), [False, True]),
+            SimulationResult('3', non_fatal, (['X'], [45]), 0, None, None),
+            SimulationResult('2', not_converged, (['X'], [87.8]), 0, (25,), [True, True])])
 
         self.presenter = MainWindowPresenter(self.view)
         self.view.presenter = self.presenter